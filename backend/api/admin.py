@@ -0,0 +1,50 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import EmailOutbox, ImportRun
+
+
+@admin.register(ImportRun)
+class ImportRunAdmin(admin.ModelAdmin):
+    """Read-only history of seeds import runs and their telemetry."""
+
+    list_display = (
+        'started_at',
+        'translation_code',
+        'source_format',
+        'status',
+        'duration_seconds',
+        'verses_imported',
+        'peak_rss_kb',
+        'lock_wait_seconds',
+    )
+    list_filter = ('status', 'source_format', 'translation_code')
+    search_fields = ('translation_code', 'error')
+    date_hierarchy = 'started_at'
+    readonly_fields = [field.name for field in ImportRun._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Queued, sent and dead-lettered emails."""
+
+    list_display = ('created_at', 'kind', 'user', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('user__email', 'last_error')
+    readonly_fields = [field.name for field in EmailOutbox._meta.fields]
+    actions = ['retry']
+
+    @admin.action(description='Retry selected emails now')
+    def retry(self, request, queryset):
+        queryset.exclude(status=EmailOutbox.Status.SENT).update(
+            status=EmailOutbox.Status.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,94 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.utils.user_cache import user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through the per-process
+    user cache, so repeat requests skip the custom_user lookup.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            # Miss: the parent does the lookup and the active/revocation checks
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+            return user
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class LazyTokenUser:
+    """
+    Stand-in for the token's user that only hits the database when a view
+    reads a field the token does not carry.
+
+    pk/id come straight from the token claim, which is all permission checks
+    and ratelimit keys need.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, validated_token):
+        self.token = validated_token
+        self.pk = self.id = validated_token[api_settings.USER_ID_CLAIM]
+        self._user = None
+
+    def _load(self):
+        if self._user is None:
+            self._user = CachedJWTAuthentication().get_user(self.token)
+        return self._user
+
+    def __getattr__(self, name):
+        # Only called for attributes not set on the proxy itself
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __eq__(self, other):
+        return str(self.pk) == str(getattr(other, 'pk', None))
+
+    def __hash__(self):
+        return hash(str(self.pk))
+
+    def __str__(self):
+        return f"TokenUser {self.pk}"
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Validates the access token's signature and expiry without loading the user.
+
+    For read-only content endpoints that only need to know the caller holds a
+    valid token. Because the user row is not read up front, inactive users and
+    changed passwords are not rejected until their access token expires (or a
+    view touches a user field). Apply per view with @authentication_classes.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return LazyTokenUser(validated_token)
@@ -0,0 +1,257 @@
+# script to be run when manage.py bench_import is called in the terminal.
+# benchmarks each stage of the seeds import pipeline against a synthetic
+# translation and appends the results to a JSON lines file for comparison.
+
+import json
+import os
+import platform
+import resource
+import time
+import tempfile
+import tracemalloc
+from io import StringIO
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.management.commands.seeds import Command as SeedsCommand
+from api.utils.bible_source_readers import SOURCE_READERS, transform_source
+from api.utils.fetch_bible_data import SOURCE_EXTENSIONS
+from api.utils.synthetic_bible_data import (
+    count_verses,
+    generate_bible_json,
+    to_csv_text,
+    write_sqlite_source,
+)
+from api.utils.transform_bible_import_data import normalize_book_name, transform_bible_data
+
+
+class RollbackBenchmark(Exception):
+    """Raised inside the benchmark transaction to discard imported rows."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the Bible import pipeline with a synthetic translation'
+
+    STAGES = ['normalize', 'parse', 'transform', 'import', 'end_to_end']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=66, help='Books to generate (1-66)')
+        parser.add_argument('--chapters', type=int, default=25, help='Chapters per book')
+        parser.add_argument('--verses', type=int, default=30, help='Verses per chapter')
+        parser.add_argument('--words', type=int, default=25, help='Average words per verse')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for text generation')
+        parser.add_argument('--repeat', type=int, default=1, help='Times to run each stage')
+        parser.add_argument(
+            '--format',
+            choices=sorted(SOURCE_EXTENSIONS),
+            default='json',
+            help='Source format the parse and end_to_end stages read from'
+        )
+        parser.add_argument(
+            '--stages',
+            nargs='+',
+            choices=self.STAGES,
+            default=self.STAGES,
+            help='Stages to run (default: all)'
+        )
+        parser.add_argument(
+            '--output',
+            default='import_benchmarks.jsonl',
+            help='JSON lines file the run is appended to'
+        )
+        parser.add_argument(
+            '--trace-memory',
+            action='store_true',
+            help='Track Python heap peaks per stage with tracemalloc (slower)'
+        )
+        parser.add_argument(
+            '--dedup-text',
+            action='store_true',
+            help='Import into the shared verse_texts storage'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep imported rows instead of rolling them back'
+        )
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        self.trace_memory = options['trace_memory']
+        self.keep = options['keep']
+        self.dedup_text = options['dedup_text']
+
+        self.source_format = options['format']
+
+        params = {
+            'format': self.source_format,
+            'books': options['books'],
+            'chapters': options['chapters'],
+            'verses': options['verses'],
+            'words': options['words'],
+            'seed': options['seed'],
+            'dedup_text': self.dedup_text,
+        }
+
+        self.stdout.write(self.style.SUCCESS('\n=== Import Pipeline Benchmark ===\n'))
+        bible_json = generate_bible_json(
+            books=params['books'],
+            chapters_per_book=params['chapters'],
+            verses_per_chapter=params['verses'],
+            words_per_verse=params['words'],
+            seed=params['seed'],
+        )
+        verse_count = count_verses(bible_json)
+        source, source_bytes = self.build_source(bible_json)
+        self.stdout.write(
+            f'Generated {params["books"]} books, {verse_count} verses '
+            f'({source_bytes / 1024 / 1024:.1f} MB of {self.source_format})\n'
+        )
+
+        results = []
+        try:
+            for iteration in range(1, options['repeat'] + 1):
+                for stage in options['stages']:
+                    result = getattr(self, f'bench_{stage}')(bible_json, source, verse_count)
+                    result['iteration'] = iteration
+                    results.append(result)
+                    self.display_result(result)
+        finally:
+            if self.source_format == 'sqlite':
+                os.remove(source)
+
+        run = {
+            'started_at': timezone.now().isoformat(),
+            'params': params,
+            'verse_count': verse_count,
+            'source_bytes': source_bytes,
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'db_vendor': connection.vendor,
+                'machine': platform.machine(),
+            },
+            'results': results,
+        }
+
+        with open(options['output'], 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run) + '\n')
+
+        self.stdout.write(self.style.SUCCESS(f'\nResults appended to {options["output"]}\n'))
+
+    def build_source(self, bible_json):
+        """Render the synthetic translation in the selected source format"""
+        if self.source_format == 'json':
+            source = json.dumps(bible_json)
+            return source, len(source.encode('utf-8'))
+
+        if self.source_format == 'csv':
+            source = to_csv_text(bible_json)
+            return source, len(source.encode('utf-8'))
+
+        fd, source = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        os.remove(source)
+        write_sqlite_source(bible_json, source)
+        return source, os.path.getsize(source)
+
+    def parse_source(self, source):
+        """Parse the source into memory (JSON) or drain its verse rows (CSV/SQLite)"""
+        if self.source_format == 'json':
+            return json.loads(source)
+        return list(SOURCE_READERS[self.source_format](source, 'BENCH')[1])
+
+    def bench_normalize(self, bible_json, source, verse_count):
+        """Normalize every source book name once per verse, as a worst case"""
+        names = [book['name'] for book in bible_json['books']]
+        per_book = max(1, verse_count // len(names))
+
+        def run():
+            for name in names:
+                for _ in range(per_book):
+                    normalize_book_name(name)
+
+        return self.measure('normalize', per_book * len(names), run)
+
+    def bench_parse(self, bible_json, source, verse_count):
+        """Parse the raw source payload, as response.json() or a reader does"""
+        return self.measure('parse', verse_count, lambda: self.parse_source(source))
+
+    def bench_transform(self, bible_json, source, verse_count):
+        """Run transform_bible_data on already-parsed JSON"""
+        return self.measure('transform', verse_count, lambda: transform_bible_data(bible_json))
+
+    def bench_import(self, bible_json, source, verse_count):
+        """Run seeds import_data on already-transformed data"""
+        transformed = transform_bible_data(bible_json)
+        return self.measure('import', verse_count, lambda: self.run_import(transformed), database=True)
+
+    def bench_end_to_end(self, bible_json, source, verse_count):
+        """Parse, transform and import starting from the raw source payload"""
+        def run():
+            if self.source_format == 'json':
+                self.run_import(transform_bible_data(json.loads(source)))
+            else:
+                self.run_import(transform_source(self.source_format, source, 'BENCH'))
+
+        return self.measure('end_to_end', verse_count, run, database=True)
+
+    def run_import(self, transformed):
+        """Import through the seeds command so the real write path is measured"""
+        seeds = SeedsCommand(stdout=StringIO(), stderr=StringIO())
+        stats = seeds.import_data(transformed, dedup_text=self.dedup_text)
+        if stats['errors']:
+            raise RuntimeError(f'Import failed: {stats["errors"][0]}')
+        return stats
+
+    def measure(self, stage, rows, fn, database=False):
+        """Time fn() and collect throughput, memory and query metrics"""
+        if self.trace_memory:
+            tracemalloc.start()
+
+        # ru_maxrss is the process high-water mark, reported in KB on Linux
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            if database and not self.keep:
+                try:
+                    with transaction.atomic():
+                        fn()
+                        raise RollbackBenchmark()
+                except RollbackBenchmark:
+                    pass
+            else:
+                fn()
+            elapsed = time.perf_counter() - start
+
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        result = {
+            'stage': stage,
+            'rows': rows,
+            'seconds': round(elapsed, 6),
+            'rows_per_sec': round(rows / elapsed, 1) if elapsed else None,
+            'queries': len(queries),
+            'peak_rss_kb': rss_after,
+            'peak_rss_growth_kb': rss_after - rss_before,
+        }
+
+        if self.trace_memory:
+            result['peak_traced_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+
+        return result
+
+    def display_result(self, result):
+        """Display one stage result"""
+        self.stdout.write(
+            f'{result["stage"]:<12} {result["seconds"]:>9.3f}s '
+            f'{result["rows_per_sec"] or 0:>12,.0f} rows/s '
+            f'{result["queries"]:>6} queries '
+            f'peak RSS {result["peak_rss_kb"] / 1024:,.1f} MB'
+        )
@@ -0,0 +1,56 @@
+# script to be run when manage.py dedup_verse_texts is called in the terminal.
+# converts already-imported verses to (or from) the shared verse_texts storage
+# and reports table sizes so the space saving can be checked.
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.utils.verse_text_store import (
+    dedup_existing_verses,
+    inline_deduped_verses,
+    prune_unreferenced_texts,
+)
+
+
+class Command(BaseCommand):
+    help = 'Move verse text into the deduplicated verse_texts table (or back with --reverse)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reverse',
+            action='store_true',
+            help='Copy shared text back onto each verse row'
+        )
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        self.stdout.write(self.style.SUCCESS('\n=== Verse Text Storage ===\n'))
+        before = self.table_sizes()
+
+        if options['reverse']:
+            converted = inline_deduped_verses()
+            self.stdout.write(f'Verses inlined: {converted}')
+        else:
+            converted = dedup_existing_verses()
+            self.stdout.write(f'Verses deduplicated: {converted}')
+
+        pruned = prune_unreferenced_texts()
+        self.stdout.write(f'Unreferenced texts pruned: {pruned}')
+
+        after = self.table_sizes()
+        for table in before:
+            self.stdout.write(
+                f'{table}: {before[table] / 1024 / 1024:.1f} MB -> {after[table] / 1024 / 1024:.1f} MB'
+            )
+        self.stdout.write(
+            'Run VACUUM FULL on verses to return the freed space to the operating system.\n'
+        )
+
+    def table_sizes(self):
+        """Total size (heap + TOAST + indexes) of the verse tables"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_total_relation_size('verses'), pg_total_relation_size('verse_texts')"
+            )
+            verses, verse_texts = cursor.fetchone()
+        return {'verses': verses, 'verse_texts': verse_texts}
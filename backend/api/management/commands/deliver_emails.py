@@ -0,0 +1,44 @@
+# script to be run when manage.py deliver_emails is called in the terminal.
+# drains the email outbox: sends due emails in batches, retrying failures with
+# backoff. Runs once by default; --interval keeps it polling as a worker.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils.email_outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Emails claimed per batch (default: EMAIL_OUTBOX BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running, polling for due emails every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        while True:
+            # Drain everything due before sleeping
+            while True:
+                result = deliver_pending(options['batch_size'])
+                if result['claimed']:
+                    self.stdout.write(
+                        f"Claimed {result['claimed']}: {result['sent']} sent, {result['failed']} failed"
+                    )
+                if not result['claimed'] or result['failed'] == result['claimed']:
+                    break
+
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
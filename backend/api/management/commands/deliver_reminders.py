@@ -0,0 +1,58 @@
+# script to be run when manage.py deliver_reminders is called in the terminal.
+# sends queued reminders in concurrent batches through the configured
+# transport, retrying failures with backoff and pausing while the transport
+# is failing. Runs once by default; --interval keeps it polling as a worker.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils.reminder_delivery import ReminderDeliveryWorker, queue_depth
+
+
+class Command(BaseCommand):
+    help = 'Send due reminders from the reminder queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Reminders claimed per batch (default: REMINDER_DELIVERY BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Sends in flight at once (default: REMINDER_DELIVERY CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running, polling for due reminders every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        worker = ReminderDeliveryWorker(batch_size=options['batch_size'], concurrency=options['concurrency'])
+        while True:
+            # Drain everything due before sleeping
+            while True:
+                result = worker.run_batch()
+                if result['claimed']:
+                    depth = queue_depth()
+                    self.stdout.write(
+                        f"Claimed {result['claimed']}: {result['sent']} sent, {result['failed']} failed, "
+                        f"{result['expired']} expired ({result['per_second']}/s), "
+                        f"{depth['due']} due in queue"
+                    )
+                if result['pause_seconds']:
+                    self.stdout.write(f"Transport failing, pausing {result['pause_seconds']:.0f}s")
+                    time.sleep(result['pause_seconds'])
+                if not result['claimed']:
+                    break
+
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
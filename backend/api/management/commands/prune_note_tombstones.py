@@ -0,0 +1,30 @@
+# script to be run when manage.py prune_note_tombstones is called in the terminal.
+# deletes study note tombstones older than STUDY_NOTES['TOMBSTONE_DAYS'] (delta
+# syncs with older cursors resync from scratch, so they're no longer needed).
+# Run it from cron, or keep it running with --interval.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils.study_notes import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete study note tombstones no delta sync can still ask for'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running, pruning again every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        while True:
+            self.stdout.write(f'Pruned {prune_tombstones()} note tombstones')
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
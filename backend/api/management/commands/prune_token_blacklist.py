@@ -0,0 +1,70 @@
+# script to be run when manage.py prune_token_blacklist is called in the terminal.
+# deletes expired refresh tokens (and their blacklist entries) and expired token
+# families in batches so those tables, and the lookups against them, stay small.
+# Run it from cron, or keep it running with --interval.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils.refresh_tokens import prune_expired_families
+from api.utils.token_blacklist import blacklist_table_stats, prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired refresh tokens, blacklist entries and token families in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tokens deleted per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='Seconds to sleep between batches (default: 0.1)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running, pruning again every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        while True:
+            self.prune(options['batch_size'], options['pause'])
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
+
+    def prune(self, batch_size, pause):
+        """Delete batches until no expired tokens remain"""
+        total_outstanding = total_blacklisted = 0
+
+        while True:
+            outstanding, blacklisted = prune_expired_tokens(batch_size)
+            total_outstanding += outstanding
+            total_blacklisted += blacklisted
+            if outstanding < batch_size:
+                break
+            time.sleep(pause)
+
+        total_families = 0
+        while True:
+            families = prune_expired_families(batch_size)
+            total_families += families
+            if families < batch_size:
+                break
+            time.sleep(pause)
+
+        self.stdout.write(
+            f'Pruned {total_outstanding} outstanding and {total_blacklisted} blacklisted tokens'
+        )
+        self.stdout.write(f'Pruned {total_families} expired token families')
+        for table, stats in blacklist_table_stats().items():
+            self.stdout.write(f'{table}: ~{stats["rows"]} rows, {stats["bytes"] / 1024 / 1024:.1f} MB')
@@ -0,0 +1,19 @@
+# script to be run when manage.py repair_activity_counters is called in the terminal.
+# rebuilds every user's activity counters (reviews today, streaks, note count)
+# from review_logs and study_notes in one statement, for backfills or after
+# writes that bypassed the incremental updates (bulk imports, manual fixes).
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.utils.activity import repair_activity_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user activity counters from review and note history'
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        with transaction.atomic():
+            count = repair_activity_counters()
+        self.stdout.write(self.style.SUCCESS(f"Repaired activity counters for {count} users"))
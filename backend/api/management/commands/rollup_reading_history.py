@@ -0,0 +1,41 @@
+# script to be run when manage.py rollup_reading_history is called in the terminal.
+# folds newly appended reading events into the per-user reading rollups and
+# re-derives recent verses for the users involved. Runs once by default;
+# --interval keeps it running as a worker.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils.reading_history import rollup_reading_history
+
+
+class Command(BaseCommand):
+    help = 'Roll up the reading event log into per-user reading aggregates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Most events folded per run (default: READING_HISTORY ROLLUP_BATCH)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running, rolling up every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        while True:
+            result = rollup_reading_history(options['batch_size'])
+            if result['events']:
+                self.stdout.write(f"Rolled up {result['events']} events for {result['users']} users")
+
+            if options['interval'] is None:
+                break
+            # Keep going without sleeping while a backlog remains
+            if result['caught_up']:
+                time.sleep(options['interval'])
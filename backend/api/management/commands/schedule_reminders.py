@@ -0,0 +1,45 @@
+# script to be run when manage.py schedule_reminders is called in the terminal.
+# dispatches due habit and daily reading reminders: each run queues delivery
+# jobs for every minute bucket since the last run. Runs once by default;
+# --interval keeps it running as the scheduler worker, and --rebuild first
+# recreates the schedule index from habits and profiles.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils.reminders import rebuild_schedules, run_scheduler
+
+
+class Command(BaseCommand):
+    help = 'Queue reminders whose time has come for delivery'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running, checking for due reminders every N seconds'
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recreate all reminder schedules from habits and profiles first'
+        )
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        if options['rebuild']:
+            self.stdout.write(f"Rebuilt {rebuild_schedules()} reminder schedules")
+
+        while True:
+            result = run_scheduler()
+            if result['dispatched'] or result['skipped_minutes']:
+                self.stdout.write(
+                    f"Queued {result['dispatched']} reminders over {result['minutes']} minutes "
+                    f"(lag {result['lag_seconds']:.1f}s, skipped {result['skipped_minutes']} minutes)"
+                )
+
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
@@ -1,16 +1,22 @@
 # script to be run when manage.py seeds.py is called in the terminal.
 # this script will be the Import script for Bible Verses.
 
+import os
 import time
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connection, transaction
 from django.db.models import Max
 import requests
 from tqdm import tqdm
 
 from api.models import Translation, Book, Verse
-from api.utils.fetch_bible_data import fetch_bible_translation
+from api.utils.bible_source_readers import transform_source
+from api.utils.fetch_bible_data import SOURCE_EXTENSIONS, fetch_bible_source, fetch_bible_translation
+from api.utils.import_telemetry import ImportTelemetry
 from api.utils.transform_bible_import_data import transform_bible_data
+from api.utils.verse_refs import make_verse_ref
+from api.utils.verse_text_store import intern_texts
 
 
 class Command(BaseCommand):
@@ -25,8 +31,28 @@ class Command(BaseCommand):
         '5': 'Darby',
     }
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=sorted(SOURCE_EXTENSIONS),
+            default='json',
+            help='Source export to download (csv and sqlite parse faster than json)'
+        )
+        parser.add_argument(
+            '--dedup-text',
+            action='store_true',
+            default=settings.VERSE_TEXT_DEDUP,
+            help='Store verse text in the shared verse_texts table (default: VERSE_TEXT_DEDUP)'
+        )
+        parser.add_argument(
+            '--telemetry-file',
+            help='Also append the run telemetry as a JSON line to this file'
+        )
+
     def handle(self, *args, **options):
         """Main command execution"""
+        source_format = options['format']
+
         self.stdout.write(self.style.SUCCESS('\n=== Bible Translation Import ===\n'))
 
         # Get translation from user
@@ -38,31 +64,38 @@ class Command(BaseCommand):
 
         # Start timing
         start_time = time.time()
+        telemetry = ImportTelemetry(translation_filename, source_format)
 
         try:
-            # Fetch data
-            self.stdout.write(f'\nFetching translation: {translation_filename}...')
-            bible_json = fetch_bible_translation(translation_filename)
-
-            # Transform data
-            self.stdout.write('Transforming data...')
-            transformed_data = transform_bible_data(bible_json)
+            # Fetch and transform data
+            self.stdout.write(f'\nFetching translation: {translation_filename} ({source_format})...')
+            transformed_data = self.load_translation(translation_filename, source_format, telemetry)
 
             # Import to database
             self.stdout.write('\nImporting to database...\n')
-            stats = self.import_data(transformed_data)
-
-            # Display results
-            elapsed_time = time.time() - start_time
-            self.display_results(stats, elapsed_time)
+            stats = self.import_data(
+                transformed_data,
+                dedup_text=options['dedup_text'],
+                telemetry=telemetry
+            )
 
         except requests.RequestException as e:
+            self.record_telemetry(telemetry, options['telemetry_file'], error=str(e))
             self.stdout.write(self.style.ERROR(f'\nError: {str(e)}'))
         except ValueError as e:
+            self.record_telemetry(telemetry, options['telemetry_file'], error=str(e))
             self.stdout.write(self.style.ERROR(f'\nError: {str(e)}'))
         except Exception as e:
+            self.record_telemetry(telemetry, options['telemetry_file'], error=str(e))
             self.stdout.write(self.style.ERROR(f'\nUnexpected error: {str(e)}'))
             raise
+        else:
+            # Outside the try, so a telemetry failure can't record the run again as failed
+            self.record_telemetry(telemetry, options['telemetry_file'], stats=stats)
+
+            # Display results
+            elapsed_time = time.time() - start_time
+            self.display_results(stats, elapsed_time, telemetry)
 
     def get_translation_input(self):
         """Prompt user for translation selection"""
@@ -72,7 +105,7 @@ class Command(BaseCommand):
         for num, code in self.COMMON_TRANSLATIONS.items():
             self.stdout.write(f'  {num}. {code}')
 
-        self.stdout.write('\nFull list: https://github.com/scrollmapper/bible_databases/tree/master/formats/json')
+        self.stdout.write('\nFull list: https://github.com/scrollmapper/bible_databases/tree/master/formats')
         self.stdout.write('\nEnter number or custom filename (or "q" to quit): ', ending='')
 
         user_input = input().strip()
@@ -87,8 +120,51 @@ class Command(BaseCommand):
         # Otherwise, use as custom filename
         return user_input
 
-    def import_data(self, transformed_data):
+    def load_translation(self, translation_filename, source_format, telemetry=None):
+        """Fetch a translation in the given format and transform it for import"""
+        telemetry = telemetry or ImportTelemetry(translation_filename, source_format)
+
+        if source_format == 'json':
+            bible_json = fetch_bible_translation(translation_filename, telemetry=telemetry)
+            self.stdout.write('Transforming data...')
+            with telemetry.stage('transform'):
+                transformed_data = transform_bible_data(bible_json)
+        else:
+            source = fetch_bible_source(translation_filename, source_format, telemetry=telemetry)
+            translation_code = translation_filename.removesuffix(f'.{SOURCE_EXTENSIONS[source_format]}')
+
+            try:
+                self.stdout.write('Transforming data...')
+                # CSV and SQLite are parsed as they stream, so this stage includes parsing
+                with telemetry.stage('transform'):
+                    transformed_data = transform_source(source_format, source, translation_code)
+            finally:
+                if source_format == 'sqlite':
+                    os.remove(source)
+
+        telemetry.add('transform', rows=sum(len(book['verses']) for book in transformed_data['books']))
+        return transformed_data
+
+    def record_telemetry(self, telemetry, telemetry_file, stats=None, error=''):
+        """Persist the run's telemetry, print its JSON line and optionally append it to a JSON lines file"""
+        telemetry.finish(stats=stats, error=error)
+        self.stdout.write(telemetry.to_json())
+
+        if telemetry_file:
+            try:
+                with open(telemetry_file, 'a', encoding='utf-8') as f:
+                    f.write(telemetry.to_json() + '\n')
+            except OSError as e:
+                # The run is already saved; a bad path shouldn't fail the import
+                self.stdout.write(self.style.ERROR(f'Could not write telemetry to {telemetry_file}: {str(e)}'))
+
+    def import_data(self, transformed_data, dedup_text=None, telemetry=None):
         """Import transformed data into database"""
+        if dedup_text is None:
+            dedup_text = settings.VERSE_TEXT_DEDUP
+        telemetry = telemetry or ImportTelemetry(transformed_data['translation']['code'], 'json')
+        telemetry.translation_code = transformed_data['translation']['code']
+
         stats = {
             'books_created': 0,
             'books_skipped': 0,
@@ -119,6 +195,8 @@ class Command(BaseCommand):
         for book_entry in tqdm(books_data, desc='Processing books', unit='book'):
             try:
                 with transaction.atomic():
+                    self.lock_verses(telemetry)
+
                     # Create book
                     book_data = book_entry['book_data']
                     book, book_created = Book.objects.get_or_create(
@@ -144,13 +222,20 @@ class Command(BaseCommand):
 
                     # Prepare verse instances
                     verses_data = book_entry['verses']
+                    text_ids = {}
+                    if dedup_text:
+                        with telemetry.stage('intern_text', rows=len(verses_data)):
+                            text_ids = intern_texts(verse['text'] for verse in verses_data)
+
                     verse_instances = [
                         Verse(
                             translation=translation,
                             book=book,
                             chapter=verse['chapter'],
                             verse_num=verse['verse_num'],
-                            text=verse['text'],
+                            ref=make_verse_ref(book.canon_order, verse['chapter'], verse['verse_num']),
+                            text='' if dedup_text else verse['text'],
+                            text_ref_id=text_ids.get(verse['text']),
                             text_len=verse['text_len'],
                             tokens_json=verse['tokens_json']
                         )
@@ -158,7 +243,8 @@ class Command(BaseCommand):
                     ]
 
                     # Bulk create verses
-                    Verse.objects.bulk_create(verse_instances, batch_size=1000)
+                    with telemetry.stage('write', rows=len(verse_instances)):
+                        Verse.objects.bulk_create(verse_instances, batch_size=1000)
                     stats['verses_created'] += len(verse_instances)
 
                     # Update chapter_count for this book
@@ -174,9 +260,29 @@ class Command(BaseCommand):
                 stats['errors'].append(error_msg)
                 self.stdout.write(self.style.ERROR(f'\n{error_msg}'))
 
+        self.analyze_verses(telemetry)
         return stats
 
-    def display_results(self, stats, elapsed_time):
+    def lock_verses(self, telemetry):
+        """
+        Take the verses table lock the writes need up front, so time spent
+        queued behind DDL, VACUUM FULL or index builds is measured as lock wait.
+        """
+        if connection.vendor != 'postgresql':
+            return
+
+        with telemetry.lock_wait(), connection.cursor() as cursor:
+            cursor.execute('LOCK TABLE verses IN ROW EXCLUSIVE MODE')
+
+    def analyze_verses(self, telemetry):
+        """Refresh planner statistics for verses and its indexes after a bulk load"""
+        if connection.vendor != 'postgresql':
+            return
+
+        with telemetry.stage('index'), connection.cursor() as cursor:
+            cursor.execute('ANALYZE verses')
+
+    def display_results(self, stats, elapsed_time, telemetry=None):
         """Display import results"""
         self.stdout.write('\n' + '=' * 50)
         self.stdout.write(self.style.SUCCESS('\nImport Complete!\n'))
@@ -187,6 +293,16 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'Verses imported: {stats["verses_created"]}'))
         self.stdout.write(f'\nTime elapsed: {elapsed_time:.2f} seconds')
 
+        if telemetry:
+            for name, metrics in telemetry.summary().items():
+                line = f'  {name:<12} {metrics["seconds"]:>8.2f}s'
+                if metrics.get('rows_per_sec'):
+                    line += f'  {metrics["rows_per_sec"]:>12,.0f} rows/s'
+                if metrics.get('bytes_per_sec'):
+                    line += f'  {metrics["bytes_per_sec"] / 1024 / 1024:>8.1f} MB/s'
+                self.stdout.write(line)
+            self.stdout.write(f'  lock wait    {telemetry.lock_wait_seconds:>8.2f}s')
+
         if stats['errors']:
             self.stdout.write(self.style.ERROR(f'\nErrors encountered: {len(stats["errors"])}'))
             for error in stats['errors']:
@@ -0,0 +1,72 @@
+# script to be run when manage.py tune_password_hashing is called in the terminal.
+# times the password hashers on this machine and prints the cost settings that
+# keep one hash under a latency target. Run it on production hardware and put
+# the result in the environment; users are rehashed as they next log in.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils.password_hashing import TunedPBKDF2PasswordHasher, TunedScryptPasswordHasher
+
+PASSWORD = 'correct horse battery staple'
+
+
+def time_hash(hasher, **params):
+    """Seconds for one hash (best of three)"""
+    salt = hasher.salt()
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        hasher.encode(PASSWORD, salt, **params)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = 'Measure password hashing cost and suggest settings for a latency target'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target-ms',
+            type=float,
+            default=100,
+            help='Target time for one hash in milliseconds (default: 100)'
+        )
+
+    def handle(self, *args, **options):
+        """Main command execution"""
+        target = options['target_ms'] / 1000
+
+        self.stdout.write(self.style.SUCCESS('\n=== Password Hashing Cost ===\n'))
+        iterations = self.tune_pbkdf2(target)
+        work_factor = self.tune_scrypt(target)
+
+        self.stdout.write(self.style.SUCCESS('\nSuggested environment:'))
+        self.stdout.write(f'PASSWORD_PBKDF2_ITERATIONS={iterations}')
+        self.stdout.write(f'PASSWORD_SCRYPT_WORK_FACTOR={work_factor}\n')
+
+    def tune_pbkdf2(self, target):
+        """PBKDF2 time is linear in iterations, so scale from one sample"""
+        hasher = TunedPBKDF2PasswordHasher()
+        sample = 100_000
+        seconds = time_hash(hasher, iterations=sample)
+        iterations = max(int(sample * target / seconds) // 10_000 * 10_000, 10_000)
+        self.stdout.write(
+            f'pbkdf2_sha256: {seconds / sample * 1e9:.0f} ns/iteration -> {iterations} iterations'
+        )
+        return iterations
+
+    def tune_scrypt(self, target):
+        """Largest power-of-two work factor that stays under the target"""
+        hasher = TunedScryptPasswordHasher()
+        work_factor = 2 ** 12
+        while True:
+            seconds = time_hash(hasher, n=work_factor * 2)
+            if seconds > target or work_factor >= 2 ** 20:
+                break
+            work_factor *= 2
+        memory_mb = 128 * work_factor * hasher.block_size * hasher.parallelism / 1024 / 1024
+        self.stdout.write(f'scrypt: work factor {work_factor} ({memory_mb:.0f} MB per hash)')
+        return work_factor
@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-19 04:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_populate_chapter_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VerseText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.BinaryField(help_text='SHA-256 of the UTF-8 encoded text', max_length=32, unique=True)),
+                ('text', models.TextField()),
+            ],
+            options={
+                'db_table': 'verse_texts',
+            },
+        ),
+        migrations.AlterField(
+            model_name='verse',
+            name='text',
+            field=models.TextField(help_text='The actual verse text (empty when stored in text_ref)'),
+        ),
+        migrations.AddField(
+            model_name='verse',
+            name='text_ref',
+            field=models.ForeignKey(blank=True, db_column='text_id', help_text='Deduplicated text, used instead of text when VERSE_TEXT_DEDUP is on', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='verses', to='api.versetext'),
+        ),
+    ]
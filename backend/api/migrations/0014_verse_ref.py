@@ -0,0 +1,40 @@
+# Generated by Django 5.1 on 2026-10-19 04:14
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_verse_refs(apps, schema_editor):
+    """Compute the BBCCCVVV reference for existing verses, one UPDATE per book."""
+    Book = apps.get_model('api', 'Book')
+    Verse = apps.get_model('api', 'Verse')
+
+    for book in Book.objects.all():
+        Verse.objects.filter(book=book).update(
+            ref=book.canon_order * 1_000_000 + F('chapter') * 1_000 + F('verse_num')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_versetext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verse',
+            name='ref',
+            field=models.IntegerField(null=True, help_text='Stable BBCCCVVV reference, e.g. 43003016 for John 3:16'),
+        ),
+        migrations.RunPython(populate_verse_refs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='verse',
+            name='ref',
+            field=models.IntegerField(help_text='Stable BBCCCVVV reference, e.g. 43003016 for John 3:16'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='verse',
+            unique_together={('translation', 'book', 'chapter', 'verse_num'), ('translation', 'ref')},
+        ),
+    ]
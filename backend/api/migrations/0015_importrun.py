@@ -0,0 +1,37 @@
+# Generated by Django 5.1 on 2026-10-19 04:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_verse_ref'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('translation_code', models.CharField(help_text='Code or filename requested', max_length=50)),
+                ('source_format', models.CharField(help_text='json, csv or sqlite', max_length=10)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('failed', 'Failed')], max_length=10)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('duration_seconds', models.FloatField(help_text='Wall time for the whole run')),
+                ('verses_imported', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('download_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('peak_rss_kb', models.IntegerField(blank=True, help_text='Process peak resident memory', null=True)),
+                ('lock_wait_seconds', models.FloatField(default=0, help_text='Time spent waiting for table locks')),
+                ('stages', models.JSONField(default=dict, help_text='Per-stage seconds, rows/sec and bytes/sec')),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'import_runs',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['translation_code', 'started_at'], name='import_runs_transla_d2f6d1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Index token_blacklist_outstandingtoken.expires_at so prune_token_blacklist can
+# find expired tokens without scanning the table. The table belongs to simplejwt's
+# token_blacklist app, so the index is managed here with SQL.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_importrun'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS outstanding_token_expires_idx '
+            'ON token_blacklist_outstandingtoken (expires_at)',
+            'DROP INDEX IF EXISTS outstanding_token_expires_idx',
+        ),
+    ]
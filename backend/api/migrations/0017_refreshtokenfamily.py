@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-19 04:22
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_outstanding_token_expires_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefreshTokenFamily',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('generation', models.PositiveIntegerField(default=0, help_text='Generation of the currently valid refresh token')),
+                ('rotated_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the current generation was issued')),
+                ('expires_at', models.DateTimeField(help_text="Expiry of the current generation's token")),
+                ('revoked_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='refresh_token_families', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'refresh_token_families',
+                'indexes': [models.Index(fields=['expires_at'], name='refresh_tok_expires_e22a3d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-19 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_refreshtokenfamily'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitHit',
+            fields=[
+                ('endpoint', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('hits', models.BigIntegerField(default=0)),
+                ('last_hit_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'rate_limit_hits',
+            },
+        ),
+        migrations.CreateModel(
+            name='RateLimitCounter',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('count', models.IntegerField()),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'rate_limit_counters',
+                'indexes': [models.Index(fields=['expires_at'], name='rate_limit__expires_3e89ae_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1 on 2026-10-19 04:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCursor',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('next_event_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'rollup_cursors',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReadingEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('read_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reading_events', to=settings.AUTH_USER_MODEL)),
+                ('verse', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.verse')),
+            ],
+            options={
+                'db_table': 'reading_events',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReadingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chapter', models.IntegerField()),
+                ('read_count', models.IntegerField(default=0)),
+                ('first_read_at', models.DateTimeField()),
+                ('last_read_at', models.DateTimeField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.book')),
+                ('last_verse', models.ForeignKey(help_text='Most recently read verse in the chapter', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.verse')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reading_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'reading_rollups',
+                'indexes': [models.Index(fields=['user', '-last_read_at'], name='reading_rol_user_id_f5cfc6_idx')],
+                'unique_together': {('user', 'book', 'chapter')},
+            },
+        ),
+    ]
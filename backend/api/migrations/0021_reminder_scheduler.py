@@ -0,0 +1,85 @@
+# Generated by Django 5.1 on 2026-10-19 04:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_reading_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderSchedulerState',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('processed_through', models.DateTimeField(help_text='Last bucket minute dispatched')),
+                ('lag_seconds', models.FloatField(default=0, help_text='How late the last run dispatched its oldest bucket')),
+                ('max_lag_seconds', models.FloatField(default=0)),
+                ('dispatched', models.BigIntegerField(default=0, help_text='Jobs queued, all time')),
+                ('skipped_minutes', models.BigIntegerField(default=0, help_text='Buckets dropped as too far behind')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'reminder_scheduler_state',
+            },
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='time_zone',
+            field=models.CharField(default='UTC', help_text="IANA name, e.g. 'America/Chicago'; reminder times are local to it", max_length=64),
+        ),
+        migrations.CreateModel(
+            name='ReminderSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('habit', 'Habit reminder'), ('daily', 'Daily reading reminder')], max_length=10)),
+                ('local_time', models.TimeField()),
+                ('time_zone', models.CharField(default='UTC', max_length=64)),
+                ('next_fire_at', models.DateTimeField()),
+                ('bucket', models.SmallIntegerField(help_text='UTC minute of day (0-1439) of next_fire_at')),
+                ('jitter_seconds', models.SmallIntegerField(default=0, help_text='Fixed per-reminder delay that spreads deliveries across the minute(s) after the bucket')),
+                ('habit', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reminder_schedule', to='api.userhabit')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminder_schedules', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'reminder_schedules',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReminderJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('habit', 'Habit reminder'), ('daily', 'Daily reading reminder')], max_length=10)),
+                ('scheduled_for', models.DateTimeField(help_text='The bucket minute this occurrence belongs to')),
+                ('due_at', models.DateTimeField(help_text="scheduled_for plus the reminder's jitter")),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('dead', 'Dead')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminder_jobs', to=settings.AUTH_USER_MODEL)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='api.reminderschedule')),
+            ],
+            options={
+                'db_table': 'reminder_jobs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='reminderschedule',
+            index=models.Index(fields=['bucket', 'next_fire_at'], name='reminder_sc_bucket_d2151f_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reminderschedule',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'daily')), fields=('user',), name='one_daily_reminder_per_user'),
+        ),
+        migrations.AddIndex(
+            model_name='reminderjob',
+            index=models.Index(fields=['status', 'due_at'], name='reminder_jo_status_f19149_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reminderjob',
+            unique_together={('schedule', 'scheduled_for')},
+        ),
+    ]
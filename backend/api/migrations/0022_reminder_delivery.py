@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-19 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_reminder_scheduler'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminderjob',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reminderjob',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='reminderjob',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reminderjob',
+            name='due_at',
+            field=models.DateTimeField(help_text="scheduled_for plus the reminder's jitter; later the retry time and claim lease"),
+        ),
+    ]
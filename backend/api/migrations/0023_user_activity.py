@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-19 04:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_reminder_delivery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActivity',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('reviews_today', models.IntegerField(default=0)),
+                ('reviews_day', models.DateField(blank=True, help_text='Local day reviews_today counts', null=True)),
+                ('current_streak', models.IntegerField(default=0, help_text='Consecutive active days ending last_active_day')),
+                ('longest_streak', models.IntegerField(default=0)),
+                ('notes_count', models.IntegerField(default=0)),
+                ('last_active_day', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_activity',
+            },
+        ),
+    ]
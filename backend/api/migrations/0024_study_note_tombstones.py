@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-19 04:58
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_user_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudyNoteTombstone',
+            fields=[
+                ('id', models.UUIDField(help_text="The deleted note's id", primary_key=True, serialize=False)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='study_note_tombstones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'study_note_tombstones',
+                'indexes': [models.Index(fields=['user', 'deleted_at'], name='study_note__user_id_99908c_idx')],
+            },
+        ),
+    ]
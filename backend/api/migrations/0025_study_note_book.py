@@ -0,0 +1,39 @@
+# Generated by Django 5.1 on 2026-10-19 05:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_note_books(apps, schema_editor):
+    """Copy each verse note's book from its verse."""
+    StudyNote = apps.get_model('api', 'StudyNote')
+    Verse = apps.get_model('api', 'Verse')
+
+    StudyNote.objects.filter(verse__isnull=False).update(
+        book=Subquery(Verse.objects.filter(id=OuterRef('verse_id')).values('book_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_study_note_tombstones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studynote',
+            name='book',
+            field=models.ForeignKey(blank=True, help_text='Denormalized from verse for per-book listing', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.book'),
+        ),
+        migrations.RunPython(populate_note_books, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='studynote',
+            index=models.Index(fields=['user', 'verse', '-updated_at'], name='study_notes_user_id_23650e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studynote',
+            index=models.Index(fields=['user', 'book', '-updated_at'], name='study_notes_user_id_686986_idx'),
+        ),
+    ]
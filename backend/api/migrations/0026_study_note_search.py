@@ -0,0 +1,62 @@
+# Full-text search over study notes (see api/utils/note_search.py).
+# study_notes.search_vector is maintained by a trigger from the note's
+# reference, its content and the text of the verse it's on, so every write
+# path (ORM, bulk sync, raw SQL) keeps it current. The column isn't on the
+# model, so listings never load it. The GIN index leads with user_id (via
+# btree_gin) so a search only reads the searching user's entries; where
+# btree_gin isn't available the index covers search_vector alone.
+
+from django.db import migrations
+
+CREATE_SEARCH = """
+    ALTER TABLE study_notes ADD COLUMN search_vector tsvector;
+
+    CREATE FUNCTION study_notes_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', COALESCE(NEW.verse_reference, '')), 'A')
+            || setweight(to_tsvector('english', COALESCE(NEW.content, '')), 'B')
+            || setweight(to_tsvector('english', COALESCE((
+                SELECT COALESCE(vt.text, v.text)
+                FROM verses v LEFT JOIN verse_texts vt ON vt.id = v.text_id
+                WHERE v.id = NEW.verse_id
+            ), '')), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER study_notes_search_vector
+        BEFORE INSERT OR UPDATE OF content, verse_reference, verse_id ON study_notes
+        FOR EACH ROW EXECUTE FUNCTION study_notes_search_vector();
+
+    UPDATE study_notes SET content = content;
+
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gin') THEN
+            CREATE EXTENSION IF NOT EXISTS btree_gin;
+            CREATE INDEX study_notes_search_idx ON study_notes USING gin (user_id, search_vector);
+        ELSE
+            CREATE INDEX study_notes_search_idx ON study_notes USING gin (search_vector);
+        END IF;
+    END
+    $$;
+"""
+
+DROP_SEARCH = """
+    DROP INDEX IF EXISTS study_notes_search_idx;
+    DROP TRIGGER IF EXISTS study_notes_search_vector ON study_notes;
+    DROP FUNCTION IF EXISTS study_notes_search_vector();
+    ALTER TABLE study_notes DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_study_note_book'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEARCH, DROP_SEARCH),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-19 05:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_study_note_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studynote',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Incremented on every update; clients send it back to update conditionally'),
+        ),
+    ]
@@ -3,6 +3,9 @@ from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, Permis
 from django.db import models
 from django.utils import timezone
 
+from api.utils.password_hashing import hash_password
+from api.utils.verse_refs import make_verse_ref
+
 
 class CustomUserManager(BaseUserManager):
     """Custom user manager for email-based authentication."""
@@ -12,7 +15,8 @@ class CustomUserManager(BaseUserManager):
             raise ValueError('The Email field must be set')
         email = self.normalize_email(email)
         user = self.model(email=email, **extra_fields)
-        user.set_password(password)
+        # Hashed on the bounded hashing pool rather than inline
+        user.password = hash_password(password)
         user.save(using=self._db)
         return user
 
@@ -99,6 +103,11 @@ class UserProfile(models.Model):
         blank=True,
         help_text="0-23; local notifications"
     )
+    time_zone = models.CharField(
+        max_length=64,
+        default='UTC',
+        help_text="IANA name, e.g. 'America/Chicago'; reminder times are local to it"
+    )
     accessibility_json = models.JSONField(
         null=True,
         blank=True,
@@ -167,6 +176,23 @@ class Book(models.Model):
         return f"{self.name} ({self.short_name})"
 
 
+class VerseText(models.Model):
+    """Content-addressed verse text shared by every verse with identical wording."""
+
+    digest = models.BinaryField(
+        max_length=32,
+        unique=True,
+        help_text="SHA-256 of the UTF-8 encoded text"
+    )
+    text = models.TextField()
+
+    class Meta:
+        db_table = 'verse_texts'
+
+    def __str__(self):
+        return self.text[:50]
+
+
 class Verse(models.Model):
     """Individual Bible verses with text and metadata."""
 
@@ -182,7 +208,17 @@ class Verse(models.Model):
     )
     chapter = models.IntegerField()
     verse_num = models.IntegerField()
-    text = models.TextField(help_text="The actual verse text")
+    ref = models.IntegerField(help_text="Stable BBCCCVVV reference, e.g. 43003016 for John 3:16")
+    text = models.TextField(help_text="The actual verse text (empty when stored in text_ref)")
+    text_ref = models.ForeignKey(
+        VerseText,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='verses',
+        db_column='text_id',
+        help_text="Deduplicated text, used instead of text when VERSE_TEXT_DEDUP is on"
+    )
     text_len = models.IntegerField(help_text="Text length for filtering")
     tokens_json = models.JSONField(
         null=True,
@@ -192,7 +228,10 @@ class Verse(models.Model):
 
     class Meta:
         db_table = 'verses'
-        unique_together = [['translation', 'book', 'chapter', 'verse_num']]
+        unique_together = [
+            ['translation', 'book', 'chapter', 'verse_num'],
+            ['translation', 'ref'],
+        ]
         indexes = [
             models.Index(fields=['translation', 'book', 'chapter', 'verse_num']),
             models.Index(fields=['book']),
@@ -201,6 +240,19 @@ class Verse(models.Model):
     def __str__(self):
         return f"{self.book.short_name} {self.chapter}:{self.verse_num}"
 
+    def save(self, *args, **kwargs):
+        # bulk_create skips save(), so bulk importers must set ref themselves
+        if self.ref is None:
+            self.ref = make_verse_ref(self.book.canon_order, self.chapter, self.verse_num)
+        super().save(*args, **kwargs)
+
+    @property
+    def resolved_text(self):
+        """Verse text from whichever storage mode this row was imported with."""
+        if self.text_ref_id is not None:
+            return self.text_ref.text
+        return self.text
+
 
 class StudyNote(models.Model):
     """User notes on verses for study and reflection."""
@@ -223,6 +275,14 @@ class StudyNote(models.Model):
         blank=True,
         help_text="Human-readable reference like 'John 3:16'"
     )
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Denormalized from verse for per-book listing"
+    )
     content = models.TextField(help_text="The user's note content")
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
@@ -231,18 +291,55 @@ class StudyNote(models.Model):
         blank=True,
         help_text="Last time this was synced from client"
     )
+    version = models.PositiveIntegerField(
+        default=1,
+        help_text="Incremented on every update; clients send it back to update conditionally"
+    )
 
     class Meta:
         db_table = 'study_notes'
         ordering = ['-updated_at']
         indexes = [
             models.Index(fields=['user', '-updated_at']),
+            models.Index(fields=['user', 'verse', '-updated_at']),
+            models.Index(fields=['user', 'book', '-updated_at']),
             models.Index(fields=['verse']),
         ]
 
     def __str__(self):
         return f"Note by {self.user.email} on {self.verse_reference or 'general'}"
 
+    def save(self, *args, **kwargs):
+        # bulk writes skip save(), so they must set book and version themselves
+        self.book_id = self.verse.book_id if self.verse_id else None
+        if not self._state.adding:
+            self.version += 1
+        super().save(*args, **kwargs)
+
+
+class StudyNoteTombstone(models.Model):
+    """
+    A deleted study note, kept so delta syncs (api.utils.study_notes) can tell
+    other devices to drop it. Pruned after STUDY_NOTES['TOMBSTONE_DAYS'].
+    """
+
+    id = models.UUIDField(primary_key=True, help_text="The deleted note's id")
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='study_note_tombstones'
+    )
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'study_note_tombstones'
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"Deleted note {self.id}"
+
 
 class Deck(models.Model):
     """Collection of verses for study."""
@@ -415,3 +512,351 @@ class RecentVerse(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.book.short_name} {self.chapter}"
+
+
+class ImportRun(models.Model):
+    """Telemetry for one run of the seeds import command."""
+
+    class Status(models.TextChoices):
+        SUCCESS = 'success', 'Success'
+        FAILED = 'failed', 'Failed'
+
+    translation_code = models.CharField(max_length=50, help_text="Code or filename requested")
+    source_format = models.CharField(max_length=10, help_text="json, csv or sqlite")
+    status = models.CharField(max_length=10, choices=Status.choices)
+    started_at = models.DateTimeField(default=timezone.now)
+    duration_seconds = models.FloatField(help_text="Wall time for the whole run")
+    verses_imported = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    download_bytes = models.BigIntegerField(null=True, blank=True)
+    peak_rss_kb = models.IntegerField(null=True, blank=True, help_text="Process peak resident memory")
+    lock_wait_seconds = models.FloatField(default=0, help_text="Time spent waiting for table locks")
+    stages = models.JSONField(
+        default=dict,
+        help_text="Per-stage seconds, rows/sec and bytes/sec"
+    )
+    error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'import_runs'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['translation_code', 'started_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.translation_code} ({self.source_format}) at {self.started_at}: {self.status}"
+
+
+class RefreshTokenFamily(models.Model):
+    """
+    The chain of rotated refresh tokens issued from one login.
+
+    Only the token carrying the current generation is valid; presenting an
+    older one (outside a short grace window) is treated as token theft and
+    revokes the whole family.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='refresh_token_families')
+    generation = models.PositiveIntegerField(default=0, help_text="Generation of the currently valid refresh token")
+    rotated_at = models.DateTimeField(default=timezone.now, help_text="When the current generation was issued")
+    expires_at = models.DateTimeField(help_text="Expiry of the current generation's token")
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'refresh_token_families'
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} family {self.id} (generation {self.generation})"
+
+
+class RateLimitCounter(models.Model):
+    """
+    One django_ratelimit window counter, shared by every worker process.
+
+    Written by api.utils.rate_limits.DatabaseRateLimitCache with atomic
+    upserts; expired rows are culled as new windows are added.
+    """
+
+    key = models.CharField(max_length=255, primary_key=True)
+    count = models.IntegerField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'rate_limit_counters'
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.key}: {self.count}"
+
+
+class RateLimitHit(models.Model):
+    """How many requests each endpoint has rejected for exceeding its rate limit."""
+
+    endpoint = models.CharField(max_length=100, primary_key=True)
+    hits = models.BigIntegerField(default=0)
+    last_hit_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'rate_limit_hits'
+
+    def __str__(self):
+        return f"{self.endpoint}: {self.hits}"
+
+
+class EmailOutbox(models.Model):
+    """
+    An email waiting to be (or already) delivered by the deliver_emails worker.
+
+    Rows are written in the same transaction as the change that triggers the
+    email, so an email is queued if and only if that change commits.
+    """
+
+    class Kind(models.TextChoices):
+        VERIFICATION = 'verification', 'Email verification'
+        PASSWORD_RESET = 'password_reset', 'Password reset'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        DEAD = 'dead', 'Dead'
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='outbox_emails')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    payload = models.JSONField(default=dict, blank=True, help_text="Kind-specific data, e.g. the reset URL")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the worker may (re)try; also the claim lease while sending"
+    )
+    last_error = models.TextField(blank=True)
+    provider_message_id = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.user_id} ({self.status})"
+
+
+class ReadingEvent(models.Model):
+    """
+    Append-only log of verse views.
+
+    Rows are bulk-inserted by api.utils.reading_history and folded into
+    ReadingRollup by the rollup_reading_history worker; nothing reads this
+    table on a request path. Kept narrow: the verse is not a constrained
+    foreign key, and book/chapter are resolved when rolling up.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='reading_events')
+    verse = models.ForeignKey(
+        Verse,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    read_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'reading_events'
+
+    def __str__(self):
+        return f"{self.user_id} read {self.verse_id} at {self.read_at}"
+
+
+class ReadingRollup(models.Model):
+    """Per-user reading aggregate for one book chapter, maintained from ReadingEvent."""
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='reading_rollups')
+    book = models.ForeignKey(Book, on_delete=models.CASCADE)
+    chapter = models.IntegerField()
+    read_count = models.IntegerField(default=0)
+    first_read_at = models.DateTimeField()
+    last_read_at = models.DateTimeField()
+    last_verse = models.ForeignKey(
+        Verse,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Most recently read verse in the chapter"
+    )
+
+    class Meta:
+        db_table = 'reading_rollups'
+        unique_together = [['user', 'book', 'chapter']]
+        indexes = [
+            models.Index(fields=['user', '-last_read_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.book_id} {self.chapter} ({self.read_count})"
+
+
+class RollupCursor(models.Model):
+    """
+    Progress of an incremental rollup over an append-only table.
+
+    Events up to last_event_id have been rolled up. next_event_id is the
+    highest id seen on the previous run; the next run stops there, so every
+    event it reads was inserted a full run interval earlier and is committed.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    last_event_id = models.BigIntegerField(default=0)
+    next_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'rollup_cursors'
+
+    def __str__(self):
+        return f"{self.name} at {self.last_event_id}"
+
+
+class ReminderSchedule(models.Model):
+    """
+    A recurring local-time reminder, indexed by the UTC minute of day of its
+    next occurrence so the scheduler only reads the current minute's bucket.
+
+    One row per habit (at UserHabit.time) and one per user with a
+    UserProfile.notif_hour (daily reading reminder). Rows are kept in step
+    with their source by api.utils.reminders.
+    """
+
+    class Kind(models.TextChoices):
+        HABIT = 'habit', 'Habit reminder'
+        DAILY = 'daily', 'Daily reading reminder'
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='reminder_schedules')
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    habit = models.OneToOneField(
+        UserHabit,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='reminder_schedule'
+    )
+    local_time = models.TimeField()
+    time_zone = models.CharField(max_length=64, default='UTC')
+    next_fire_at = models.DateTimeField()
+    bucket = models.SmallIntegerField(help_text="UTC minute of day (0-1439) of next_fire_at")
+    jitter_seconds = models.SmallIntegerField(
+        default=0,
+        help_text="Fixed per-reminder delay that spreads deliveries across the minute(s) after the bucket"
+    )
+
+    class Meta:
+        db_table = 'reminder_schedules'
+        indexes = [
+            models.Index(fields=['bucket', 'next_fire_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(kind='daily'),
+                name='one_daily_reminder_per_user'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} reminder for {self.user_id} at {self.local_time} {self.time_zone}"
+
+
+class ReminderJob(models.Model):
+    """
+    One reminder occurrence handed off by the scheduler for delivery.
+
+    (schedule, scheduled_for) is unique, so re-running a minute never queues
+    a reminder twice.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        DEAD = 'dead', 'Dead'
+
+    schedule = models.ForeignKey(ReminderSchedule, on_delete=models.CASCADE, related_name='jobs')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='reminder_jobs')
+    kind = models.CharField(max_length=10, choices=ReminderSchedule.Kind.choices)
+    scheduled_for = models.DateTimeField(help_text="The bucket minute this occurrence belongs to")
+    due_at = models.DateTimeField(
+        help_text="scheduled_for plus the reminder's jitter; later the retry time and claim lease"
+    )
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'reminder_jobs'
+        unique_together = [['schedule', 'scheduled_for']]
+        indexes = [
+            models.Index(fields=['status', 'due_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} reminder for {self.user_id} due {self.due_at} ({self.status})"
+
+
+class ReminderSchedulerState(models.Model):
+    """Progress and lag of the reminder scheduler (a single row)."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    processed_through = models.DateTimeField(help_text="Last bucket minute dispatched")
+    lag_seconds = models.FloatField(default=0, help_text="How late the last run dispatched its oldest bucket")
+    max_lag_seconds = models.FloatField(default=0)
+    dispatched = models.BigIntegerField(default=0, help_text="Jobs queued, all time")
+    skipped_minutes = models.BigIntegerField(default=0, help_text="Buckets dropped as too far behind")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'reminder_scheduler_state'
+
+    def __str__(self):
+        return f"{self.name} through {self.processed_through}"
+
+
+class UserActivity(models.Model):
+    """
+    Per-user activity counters, kept current by the review, note and habit
+    write paths (api.utils.activity) so reads never scan history.
+
+    Days are the user's local days (UserProfile.time_zone). reviews_today and
+    current_streak are as of reviews_day / last_active_day; readers treat
+    them as 0 once those days have passed.
+    """
+
+    user = models.OneToOneField(
+        CustomUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='activity'
+    )
+    reviews_today = models.IntegerField(default=0)
+    reviews_day = models.DateField(null=True, blank=True, help_text="Local day reviews_today counts")
+    current_streak = models.IntegerField(default=0, help_text="Consecutive active days ending last_active_day")
+    longest_streak = models.IntegerField(default=0)
+    notes_count = models.IntegerField(default=0)
+    last_active_day = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_activity'
+
+    def __str__(self):
+        return f"Activity for {self.user_id}: {self.current_streak} day streak"
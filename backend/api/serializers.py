@@ -1,7 +1,25 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from .models import CustomUser, UserHabit, RecentVerse, StudyNote, UserProfile, Translation, Book, Verse
+from .utils.password_hashing import authenticate_user
+from .utils.activity import get_activity
+from .utils.reminders import is_valid_time_zone
+from .utils.study_notes import parse_content_patch
+from .utils.verse_refs import parse_verse_ref
+
+
+def resolve_verse_ref(verse_ref, translation_code):
+    """Look up the Verse for a BBCCCVVV reference in a translation."""
+    if not translation_code:
+        raise serializers.ValidationError({'translation': 'Translation is required with verse_ref.'})
+
+    try:
+        return Verse.objects.select_related('book').get(
+            translation__code=translation_code,
+            ref=verse_ref
+        )
+    except Verse.DoesNotExist:
+        raise serializers.ValidationError({'verse_ref': f'Verse {verse_ref} not found in {translation_code}.'})
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -38,7 +56,7 @@ class UserLoginSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         if email and password:
-            user = authenticate(email=email, password=password)
+            user = authenticate_user(email, password)
             if not user:
                 raise serializers.ValidationError('Invalid credentials.')
             if not user.is_active:
@@ -67,13 +85,14 @@ class HabitSerializer(serializers.ModelSerializer):
 
 
 class RecentVerseSerializer(serializers.ModelSerializer):
-    verse_text = serializers.CharField(source='verse.text', read_only=True)
+    verse_text = serializers.CharField(source='verse.resolved_text', read_only=True)
+    verse_ref = serializers.IntegerField(source='verse.ref', read_only=True)
     verse_reference = serializers.SerializerMethodField()
     book_name = serializers.CharField(source='book.short_name', read_only=True)
 
     class Meta:
         model = RecentVerse
-        fields = ['id', 'verse', 'verse_text', 'verse_reference', 'book_name', 'chapter', 'last_accessed']
+        fields = ['id', 'verse', 'verse_ref', 'verse_text', 'verse_reference', 'book_name', 'chapter', 'last_accessed']
         read_only_fields = ['id', 'last_accessed']
 
     def get_verse_reference(self, obj):
@@ -88,10 +107,27 @@ class DashboardSerializer(serializers.Serializer):
 class StudyNoteSerializer(serializers.ModelSerializer):
     """Serializer for study notes with offline sync support."""
 
+    # Alternative to verse: a BBCCCVVV key plus translation code, resolved server-side
+    verse_ref = serializers.IntegerField(required=False, allow_null=True)
+    translation = serializers.CharField(required=False, write_only=True)
+
     class Meta:
         model = StudyNote
-        fields = ['id', 'verse', 'verse_reference', 'content', 'created_at', 'updated_at', 'synced_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'verse', 'verse_ref', 'translation', 'verse_reference', 'content', 'created_at', 'updated_at', 'synced_at', 'version']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'version']
+
+    def validate(self, attrs):
+        verse_ref = attrs.pop('verse_ref', None)
+        translation_code = attrs.pop('translation', None)
+
+        if verse_ref is not None:
+            attrs['verse'] = resolve_verse_ref(verse_ref, translation_code)
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['verse_ref'] = instance.verse.ref if instance.verse_id else None
+        return data
 
     def create(self, validated_data):
         # Auto-assign the logged-in user
@@ -99,6 +135,37 @@ class StudyNoteSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class ContentPatchField(serializers.Field):
+    """A list of {at, delete, insert} splices (see parse_content_patch)."""
+
+    def to_internal_value(self, data):
+        try:
+            return parse_content_patch(data)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+
+class StudyNotePatchSerializer(StudyNoteSerializer):
+    """
+    A conditional edit of a study note. `version` is the version the edit is
+    based on; send either the new content or a content_patch against that
+    version's text. Fields left out are unchanged.
+    """
+
+    version = serializers.IntegerField(min_value=1)
+    content = serializers.CharField(required=False)
+    content_patch = ContentPatchField(required=False)
+
+    class Meta(StudyNoteSerializer.Meta):
+        fields = ['verse', 'verse_ref', 'translation', 'verse_reference', 'content', 'content_patch', 'version']
+        read_only_fields = []
+
+    def validate(self, attrs):
+        if 'content' in attrs and 'content_patch' in attrs:
+            raise serializers.ValidationError('Send content or content_patch, not both.')
+        return super().validate(attrs)
+
+
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile with nested user data."""
@@ -108,6 +175,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
     avatar_url = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(source='user.created_at', read_only=True)
     last_login = serializers.DateTimeField(source='user.last_login', read_only=True)
+    activity = serializers.SerializerMethodField()
 
     class Meta:
         model = UserProfile
@@ -119,9 +187,11 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'default_translation',
             'review_goal_per_day',
             'notif_hour',
+            'time_zone',
             'accessibility_json',
             'created_at',
-            'last_login'
+            'last_login',
+            'activity'
         ]
 
     def get_avatar_url(self, obj):
@@ -132,6 +202,10 @@ class UserProfileSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.user.avatar.url)
         return None
 
+    def get_activity(self, obj):
+        """Streaks and counters from the user's activity row."""
+        return get_activity(obj.user_id)
+
     def validate_review_goal_per_day(self, value):
         """Validate review goal is between 1 and 100."""
         if value < 1 or value > 100:
@@ -144,6 +218,12 @@ class UserProfileSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Notification hour must be between 0 and 23.')
         return value
 
+    def validate_time_zone(self, value):
+        """Validate the time zone is a known IANA name."""
+        if not is_valid_time_zone(value):
+            raise serializers.ValidationError('Unknown time zone.')
+        return value
+
 
 class TranslationSerializer(serializers.ModelSerializer):
     """Serializer for Bible translations."""
@@ -176,17 +256,34 @@ class VerseQueryParamsSerializer(serializers.Serializer):
         'required': 'Translation parameter is required.',
         'blank': 'Translation parameter cannot be blank.'
     })
-    book = serializers.IntegerField(required=True, error_messages={
-        'required': 'Book parameter is required.',
+    book = serializers.IntegerField(required=False, error_messages={
         'invalid': 'Book parameter must be a valid integer.'
     })
-    chapter = serializers.IntegerField(required=True, error_messages={
-        'required': 'Chapter parameter is required.',
+    chapter = serializers.IntegerField(required=False, error_messages={
         'invalid': 'Chapter parameter must be a valid integer.'
     })
     verse = serializers.IntegerField(required=False, allow_null=True, error_messages={
         'invalid': 'Verse parameter must be a valid integer.'
     })
+    ref = serializers.IntegerField(required=False, error_messages={
+        'invalid': 'Ref parameter must be a valid integer.'
+    })
+
+    def validate_ref(self, value):
+        try:
+            parse_verse_ref(value)
+        except ValueError:
+            raise serializers.ValidationError('Ref parameter must be a BBCCCVVV verse reference.')
+        return value
+
+    def validate(self, attrs):
+        # A ref identifies the verse on its own; otherwise book and chapter are required
+        if attrs.get('ref') is None:
+            if attrs.get('book') is None:
+                raise serializers.ValidationError({'book': 'Book parameter is required.'})
+            if attrs.get('chapter') is None:
+                raise serializers.ValidationError({'chapter': 'Chapter parameter is required.'})
+        return attrs
 
 
 class VerseSerializer(serializers.ModelSerializer):
@@ -194,8 +291,9 @@ class VerseSerializer(serializers.ModelSerializer):
 
     translation = TranslationSerializer(read_only=True)
     book = BookSerializer(read_only=True)
+    text = serializers.CharField(source='resolved_text', read_only=True)
 
     class Meta:
         model = Verse
-        fields = ['id', 'translation', 'book', 'chapter', 'verse_num', 'text']
+        fields = ['id', 'ref', 'translation', 'book', 'chapter', 'verse_num', 'text']
         read_only_fields = ['id']
\ No newline at end of file
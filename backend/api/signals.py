@@ -0,0 +1,106 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from api.models import (
+    CustomUser, RecentVerse, ReviewLog, StudyNote, StudyNoteTombstone, UserHabit, UserProfile, UserVerseState
+)
+from api.utils.activity import note_deleted, record_activity
+from api.utils.dashboard import invalidate_dashboard
+from api.utils.reminders import sync_habit_reminder, sync_profile_reminders
+from api.utils.study_notes import record_tombstones
+from api.utils.user_cache import user_cache
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drop the user from every process's auth cache once the change commits
+    (before that, another process could reload and cache the old row).
+    """
+    # Deleting clears instance.pk before the transaction commits
+    user_id = instance.pk
+    transaction.on_commit(lambda: user_cache.invalidate(user_id))
+
+
+@receiver(post_save, sender=UserHabit)
+@receiver(post_delete, sender=UserHabit)
+@receiver(post_save, sender=RecentVerse)
+@receiver(post_delete, sender=RecentVerse)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=ReviewLog)
+@receiver(post_delete, sender=ReviewLog)
+@receiver(post_save, sender=UserVerseState)
+@receiver(post_delete, sender=UserVerseState)
+def invalidate_cached_dashboard(sender, instance, **kwargs):
+    """Drop the owner's dashboard snapshot when anything it summarizes changes."""
+    invalidate_dashboard(instance.user_id)
+
+
+@receiver(post_save, sender=UserHabit)
+def schedule_habit_reminder(sender, instance, **kwargs):
+    """Keep the habit's reminder in the scheduler's bucket index."""
+    sync_habit_reminder(instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def schedule_profile_reminders(sender, instance, **kwargs):
+    """Follow notif_hour and time zone changes."""
+    sync_profile_reminders(instance)
+
+
+@receiver(post_save, sender=ReviewLog)
+def count_review(sender, instance, created, **kwargs):
+    """Add the review to the user's activity counters."""
+    if created:
+        record_activity(instance.user_id, instance.ts, reviews=1)
+
+
+@receiver(post_save, sender=StudyNote)
+def count_note(sender, instance, created, **kwargs):
+    """Creating a note counts as activity; edits don't."""
+    if created:
+        record_activity(instance.user_id, instance.created_at, notes=1)
+
+
+@receiver(post_delete, sender=StudyNote)
+def uncount_note(sender, instance, **kwargs):
+    note_deleted(instance.user_id)
+
+
+@receiver(pre_save, sender=UserHabit)
+def remember_habit_skipped(sender, instance, raw=False, **kwargs):
+    """Keep the stored skipped flag so count_habit_check_in can see it change."""
+    instance.was_skipped = bool(
+        not raw and instance.pk is not None
+        and UserHabit.objects.filter(pk=instance.pk).values_list('skipped', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=UserHabit)
+def count_habit_check_in(sender, instance, created, **kwargs):
+    """
+    Checking back in to a skipped habit (skipped going from True to False)
+    marks the day active. Creating a habit or editing its details doesn't.
+    """
+    if not created and instance.was_skipped and not instance.skipped:
+        record_activity(instance.user_id)
+
+
+@receiver(post_delete, sender=StudyNote)
+def tombstone_note(sender, instance, origin=None, **kwargs):
+    """
+    Leave a tombstone for delta syncs, unless the note goes with its user
+    (the tombstone would go too).
+    """
+    if isinstance(origin, StudyNote) or getattr(origin, 'model', None) is StudyNote:
+        record_tombstones(instance.user_id, [instance.id])
+
+
+@receiver(post_save, sender=StudyNote)
+def clear_note_tombstone(sender, instance, created, **kwargs):
+    """A note recreated under a deleted note's id (offline sync) is live again."""
+    if created:
+        StudyNoteTombstone.objects.filter(id=instance.id, user_id=instance.user_id).delete()
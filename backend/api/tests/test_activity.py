@@ -0,0 +1,181 @@
+"""
+Tests for the incrementally maintained per-user activity counters.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_activity
+"""
+
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import (
+    Book, CustomUser, ReviewLog, StudyNote, Translation, UserActivity, UserHabit, UserProfile, Verse
+)
+from api.utils.activity import get_activity
+
+
+class ActivityTestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.profile = UserProfile.objects.create(user=self.user, review_goal_per_day=5)
+
+        translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        book = Book.objects.create(id=43, name='John', short_name='John', canon_order=43, testament='NT', chapter_count=21)
+        self.verse = Verse.objects.create(
+            translation=translation, book=book, chapter=3, verse_num=16, text='For God so loved', text_len=16
+        )
+        self.now = timezone.now()
+        self.reviews = 0
+
+    def review(self, days_ago=0, save=True):
+        # (user, verse, ts) is unique, so each review is a microsecond apart
+        self.reviews += 1
+        review = ReviewLog(
+            user=self.user, verse=self.verse, ts=self.now - timedelta(days=days_ago, microseconds=self.reviews),
+            mode='recall', grade=5, duration_ms=1000
+        )
+        if save:
+            review.save()
+        return review
+
+    def row(self):
+        return UserActivity.objects.get(user=self.user)
+
+
+class TestIncrementalCounters(ActivityTestCase):
+    """Each write should update the counters row in place"""
+
+    def test_reviews_today_and_goal(self):
+        for _ in range(3):
+            self.review()
+
+        activity = get_activity(self.user.pk)
+        self.assertEqual(activity['reviews_today'], 3)
+        self.assertEqual(activity['review_goal_per_day'], 5)
+        self.assertEqual(activity['current_streak'], 1)
+
+    def test_consecutive_days_build_a_streak(self):
+        for days_ago in (4, 3, 1, 0):
+            self.review(days_ago)
+
+        activity = get_activity(self.user.pk)
+        self.assertEqual(activity['current_streak'], 2)
+        self.assertEqual(activity['longest_streak'], 2)
+        self.assertEqual(activity['reviews_today'], 1)
+
+    def test_late_event_does_not_move_counters_back(self):
+        """An offline review synced after newer ones only counts where it belongs"""
+        self.review(1)
+        self.review(0)
+        self.review(5)
+
+        activity = get_activity(self.user.pk)
+        self.assertEqual(activity['current_streak'], 2)
+        self.assertEqual(activity['reviews_today'], 1)
+        self.assertEqual(activity['last_active_day'], self.now.date().isoformat())
+
+    def test_stale_counters_read_as_zero(self):
+        self.review(3)
+        self.review(2)
+
+        activity = get_activity(self.user.pk)
+        self.assertEqual(activity['reviews_today'], 0)
+        self.assertEqual(activity['current_streak'], 0)
+        self.assertEqual(activity['longest_streak'], 2)
+
+    def test_days_are_local_to_the_user(self):
+        self.profile.time_zone = 'America/New_York'
+        self.profile.save()
+        ReviewLog.objects.create(
+            user=self.user, verse=self.verse, ts=datetime(2024, 3, 5, 3, 0, tzinfo=dt_timezone.utc),
+            mode='recall', grade=5, duration_ms=1000
+        )
+
+        self.assertEqual(self.row().reviews_day, date(2024, 3, 4))
+
+    def test_notes_and_habits(self):
+        note = StudyNote.objects.create(user=self.user, content='Grace')
+        StudyNote.objects.create(user=self.user, content='Faith')
+        note.delete()
+        UserHabit.objects.create(
+            user=self.user, habit='Read', frequency='Daily', purpose='Growth', time=time(7, 0)
+        )
+
+        activity = get_activity(self.user.pk)
+        self.assertEqual(activity['notes_count'], 1)
+        self.assertEqual(activity['current_streak'], 1)
+        self.assertEqual(activity['reviews_today'], 0)
+
+    def test_only_habit_check_ins_count(self):
+        habit = UserHabit.objects.create(
+            user=self.user, habit='Read', frequency='Daily', purpose='Growth', time=time(7, 0)
+        )
+        habit.time = time(8, 0)
+        habit.save()
+        habit.skipped = True
+        habit.save()
+        self.assertFalse(UserActivity.objects.filter(user=self.user).exists())
+
+        habit.skipped = False
+        habit.save()
+        self.assertEqual(get_activity(self.user.pk)['current_streak'], 1)
+
+    def test_note_endpoint_counts_note(self):
+        response = self.client.post('/api/study-notes/', {'content': 'Grace'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.row().notes_count, 1)
+
+
+class TestActivityReads(ActivityTestCase):
+
+    def test_read_is_one_query(self):
+        self.review()
+        with self.assertNumQueries(1):
+            get_activity(self.user.pk)
+
+    def test_profile_includes_activity(self):
+        self.review()
+        response = self.client.get('/api/profile/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['activity'], get_activity(self.user.pk))
+
+    def test_user_without_activity(self):
+        activity = get_activity(self.user.pk)
+        self.assertEqual(activity['current_streak'], 0)
+        self.assertEqual(activity['notes_count'], 0)
+        self.assertIsNone(activity['last_active_day'])
+
+
+class TestRepair(ActivityTestCase):
+    """The repair command should rebuild what the write paths maintain"""
+
+    def test_repair_matches_incremental_counters(self):
+        for days_ago in (6, 5, 4, 1, 0, 0):
+            self.review(days_ago)
+        StudyNote.objects.create(user=self.user, content='Grace')
+        expected = get_activity(self.user.pk)
+
+        UserActivity.objects.all().delete()
+        call_command('repair_activity_counters', stdout=StringIO())
+
+        self.assertEqual(get_activity(self.user.pk), expected)
+        self.assertEqual(self.row().longest_streak, 3)
+
+    def test_repair_fixes_drift(self):
+        self.review()
+        # bulk_create skips the signals that keep the counters current
+        ReviewLog.objects.bulk_create([self.review(save=False) for _ in range(4)])
+        self.assertEqual(get_activity(self.user.pk)['reviews_today'], 1)
+
+        call_command('repair_activity_counters', stdout=StringIO())
+        self.assertEqual(get_activity(self.user.pk)['reviews_today'], 5)
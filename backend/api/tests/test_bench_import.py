@@ -0,0 +1,108 @@
+"""
+Tests for the synthetic translation generator and bench_import command.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_bench_import
+"""
+
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.models import Verse
+from api.utils.synthetic_bible_data import count_verses, generate_bible_json
+from api.utils.transform_bible_import_data import transform_bible_data
+
+
+class TestGenerateBibleJson(TestCase):
+    """Test synthetic translation generator"""
+
+    def test_generates_requested_size(self):
+        """Should generate books x chapters x verses verses"""
+        bible_json = generate_bible_json(books=3, chapters_per_book=2, verses_per_chapter=4)
+
+        self.assertEqual(len(bible_json['books']), 3)
+        self.assertEqual(count_verses(bible_json), 3 * 2 * 4)
+
+    def test_is_deterministic_for_seed(self):
+        """Same seed should produce identical text"""
+        first = generate_bible_json(books=1, chapters_per_book=1, verses_per_chapter=5, seed=7)
+        second = generate_bible_json(books=1, chapters_per_book=1, verses_per_chapter=5, seed=7)
+
+        self.assertEqual(first, second)
+
+    def test_output_transforms_cleanly(self):
+        """Every generated book name should normalize to known metadata"""
+        bible_json = generate_bible_json(books=66, chapters_per_book=1, verses_per_chapter=1)
+        result = transform_bible_data(bible_json)
+
+        self.assertEqual(result['translation']['code'], 'BENCH')
+        self.assertEqual(len(result['books']), 66)
+
+    def test_rejects_invalid_book_count(self):
+        """Should raise ValueError for book counts outside 1-66"""
+        with self.assertRaises(ValueError):
+            generate_bible_json(books=0)
+        with self.assertRaises(ValueError):
+            generate_bible_json(books=67)
+
+
+class TestBenchImportCommand(TestCase):
+    """Integration tests for bench_import command"""
+
+    def setUp(self):
+        fd, self.output_path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.output_path)
+
+    def run_bench(self, *args):
+        call_command(
+            'bench_import',
+            '--books', '2', '--chapters', '2', '--verses', '3',
+            '--output', self.output_path,
+            *args,
+            stdout=StringIO()
+        )
+        with open(self.output_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_records_every_stage(self):
+        """Should append one run with metrics for each stage"""
+        runs = self.run_bench()
+
+        self.assertEqual(len(runs), 1)
+        run = runs[0]
+        self.assertEqual(run['verse_count'], 12)
+        self.assertEqual(
+            [r['stage'] for r in run['results']],
+            ['normalize', 'parse', 'transform', 'import', 'end_to_end']
+        )
+        for result in run['results']:
+            self.assertIn('rows_per_sec', result)
+            self.assertIn('peak_rss_kb', result)
+            self.assertIn('queries', result)
+
+        import_result = next(r for r in run['results'] if r['stage'] == 'import')
+        self.assertGreater(import_result['queries'], 0)
+
+    def test_rolls_back_imported_rows(self):
+        """Imported verses should be discarded unless --keep is passed"""
+        self.run_bench('--stages', 'import')
+        self.assertEqual(Verse.objects.count(), 0)
+
+        self.run_bench('--stages', 'import', '--keep')
+        self.assertEqual(Verse.objects.count(), 12)
+
+    def test_appends_runs(self):
+        """Subsequent runs should be appended, not overwrite earlier ones"""
+        self.run_bench('--stages', 'parse')
+        runs = self.run_bench('--stages', 'parse', '--repeat', '2', '--trace-memory')
+
+        self.assertEqual(len(runs), 2)
+        self.assertEqual(len(runs[1]['results']), 2)
+        self.assertIn('peak_traced_kb', runs[1]['results'][0])
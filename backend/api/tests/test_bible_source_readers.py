@@ -0,0 +1,113 @@
+"""
+Unit tests for the CSV and SQLite source readers.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_bible_source_readers
+"""
+
+import os
+import tempfile
+
+from django.test import TestCase
+
+from api.utils.bible_source_readers import (
+    read_csv_source,
+    read_sqlite_source,
+    transform_source,
+)
+from api.utils.synthetic_bible_data import generate_bible_json, to_csv_text, write_sqlite_source
+from api.utils.transform_bible_import_data import transform_bible_data, transform_verse_rows
+
+
+class TestTransformVerseRows(TestCase):
+    """Test transform_verse_rows function"""
+
+    def test_groups_rows_by_book(self):
+        """Rows should be grouped into normalized books in first-seen order"""
+        rows = [
+            ('Genesis', '1', '1', 'In the beginning.'),
+            ('Genesis', '1', '2', 'And the earth.'),
+            ('I Samuel', '1', '1', 'Now there was.'),
+        ]
+        result = transform_verse_rows('KJV: King James Version', rows)
+
+        self.assertEqual(result['translation'], {'code': 'KJV', 'name': 'King James Version'})
+        self.assertEqual([b['book_data']['name'] for b in result['books']], ['Genesis', '1 Samuel'])
+        self.assertEqual(result['books'][1]['book_data']['canon_order'], 9)
+
+        verse = result['books'][0]['verses'][1]
+        self.assertEqual(verse['chapter'], 1)
+        self.assertEqual(verse['verse_num'], 2)
+        self.assertEqual(verse['text_len'], len('And the earth.'))
+
+    def test_unknown_book_skipped(self):
+        """Rows for books without metadata should be skipped"""
+        rows = [
+            ('Unknown Book Name', 1, 1, 'Test'),
+            ('Genesis', 1, 1, 'Test'),
+        ]
+        result = transform_verse_rows('TEST: Test', rows)
+
+        self.assertEqual(len(result['books']), 1)
+        self.assertEqual(result['books'][0]['book_data']['name'], 'Genesis')
+
+    def test_variant_spellings_share_a_book(self):
+        """Different source spellings of one book should be merged"""
+        rows = [
+            ('Psalm', 1, 1, 'Blessed is the man.'),
+            ('Psalms', 1, 2, 'But his delight.'),
+        ]
+        result = transform_verse_rows('TEST: Test', rows)
+
+        self.assertEqual(len(result['books']), 1)
+        self.assertEqual(len(result['books'][0]['verses']), 2)
+
+
+class TestSourceReaders(TestCase):
+    """Test that every format produces the same transformed data as JSON"""
+
+    def setUp(self):
+        self.bible_json = generate_bible_json(
+            code='KJV', books=3, chapters_per_book=2, verses_per_chapter=3
+        )
+        self.expected = transform_bible_data(self.bible_json)
+
+    def test_csv_matches_json(self):
+        """CSV source should transform to the same books and verses"""
+        result = transform_source('csv', to_csv_text(self.bible_json), 'KJV')
+
+        self.assertEqual(result['translation']['code'], 'KJV')
+        self.assertEqual(result['books'], self.expected['books'])
+
+    def test_sqlite_matches_json(self):
+        """SQLite source should transform to the same data, including the title"""
+        fd, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        os.remove(db_path)
+        try:
+            write_sqlite_source(self.bible_json, db_path)
+            result = transform_source('sqlite', db_path, 'KJV')
+        finally:
+            os.remove(db_path)
+
+        self.assertEqual(result, self.expected)
+
+    def test_csv_missing_column_raises(self):
+        """CSV without a text column should raise ValueError"""
+        with self.assertRaises(ValueError) as context:
+            read_csv_source('Book,Chapter,Verse\nGenesis,1,1\n', 'KJV')
+        self.assertIn('text', str(context.exception))
+
+    def test_sqlite_missing_tables_raises(self):
+        """SQLite file without the translation's tables should raise ValueError"""
+        fd, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            with self.assertRaises(ValueError):
+                read_sqlite_source(db_path, 'KJV')
+        finally:
+            os.remove(db_path)
+
+    def test_unsupported_format_raises(self):
+        """Unknown formats should raise ValueError"""
+        with self.assertRaises(ValueError):
+            transform_source('xml', '', 'KJV')
@@ -0,0 +1,69 @@
+"""
+Tests for claims-only JWT authentication on read-only endpoints.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_claims_authentication
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import LazyTokenUser
+from api.models import CustomUser, Translation, Book, Verse
+from api.utils.user_cache import user_cache
+
+
+class TestClaimsJWTAuthentication(TestCase):
+    """Content endpoints should authenticate without reading custom_user"""
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        book = Book.objects.create(id=1, name='Genesis', short_name='Gen', canon_order=1, testament='OT', chapter_count=50)
+        Verse.objects.create(
+            translation=translation, book=book, chapter=1, verse_num=1,
+            text='In the beginning God created the heaven and the earth.', text_len=56
+        )
+
+    def test_content_endpoints_skip_user_table(self):
+        """Valid tokens should be accepted with zero user-table queries"""
+        requests = [
+            ('/api/translations/', {}),
+            ('/api/books/', {'translation': 'KJV'}),
+            ('/api/chapters/', {'translation': 'KJV', 'book': '1'}),
+            ('/api/verses/', {'translation': 'KJV', 'book': '1', 'chapter': '1'}),
+        ]
+        for path, params in requests:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, path)
+            self.assertEqual(
+                [q['sql'] for q in queries.captured_queries if 'custom_user' in q['sql']], [], path
+            )
+
+    def test_invalid_token_returns_401(self):
+        """Signature validation still applies"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}x')
+        response = self.client.get('/api/verses/', {'translation': 'KJV', 'book': '1', 'chapter': '1'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_lazy_user_loads_on_field_access(self):
+        """Touching a user field should load the user once (invalidation polls aside)"""
+        lazy_user = LazyTokenUser(self.token)
+        self.assertEqual(str(lazy_user.pk), str(self.user.pk))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(lazy_user.email, 'test@example.com')
+            self.assertEqual(lazy_user.email, 'test@example.com')
+        self.assertEqual(lazy_user, self.user)
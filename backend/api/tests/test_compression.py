@@ -0,0 +1,130 @@
+"""
+Tests for negotiated response compression and gzipped request bodies.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_compression
+"""
+
+import gzip
+import json
+import unittest
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Book, CustomUser, StudyNote, Translation, Verse
+from api.utils.compression import (
+    CompressionMiddleware, accepted_encodings, brotli, choose_encoding, compression_stats
+)
+
+
+class TestNegotiation(unittest.TestCase):
+
+    def test_accept_encoding_parsing(self):
+        self.assertEqual(accepted_encodings('gzip, br;q=0.5, deflate;q=0'), {'gzip': 1.0, 'br': 0.5})
+        self.assertIsNone(choose_encoding(''))
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertEqual(choose_encoding('gzip;q=1, br;q=0.1'), 'gzip')
+
+    @unittest.skipUnless(brotli, 'brotli is not installed')
+    def test_brotli_preferred(self):
+        self.assertEqual(choose_encoding('gzip, deflate, br'), 'br')
+        self.assertEqual(choose_encoding('*'), 'br')
+
+
+class CompressionTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        book = Book.objects.create(id=43, name='John', short_name='John', canon_order=43, testament='NT', chapter_count=21)
+        for verse_num in range(1, 41):
+            Verse.objects.create(
+                translation=translation, book=book, chapter=1, verse_num=verse_num,
+                text='In the beginning was the Word, and the Word was with God, and the Word was God.', text_len=80
+            )
+
+    def chapter(self, encoding):
+        return self.client.get(
+            '/api/verses/', {'translation': 'KJV', 'book': 43, 'chapter': 1}, HTTP_ACCEPT_ENCODING=encoding
+        )
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class TestResponseCompression(CompressionTestCase):
+
+    def test_gzip_response(self):
+        plain = self.chapter('identity')
+        compressed = self.chapter('gzip')
+
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed['Vary'])
+        self.assertLess(len(compressed.content), len(plain.content) / 5)
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertNotIn('Content-Encoding', plain)
+
+    @unittest.skipUnless(brotli, 'brotli is not installed')
+    def test_brotli_response(self):
+        plain = self.chapter('identity')
+        compressed = self.chapter('gzip, br')
+
+        self.assertEqual(compressed['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(compressed.content), plain.content)
+
+    def test_content_variants_are_cached(self):
+        self.assertIn('max-age', self.chapter('gzip')['Cache-Control'])
+
+        hits = compression_stats.cache_hits
+        self.chapter('gzip')
+        self.assertEqual(compression_stats.cache_hits, hits + 1)
+
+    def test_small_and_auth_responses_are_not_compressed(self):
+        small = self.client.get('/api/translations/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', small)
+
+        request = RequestFactory().post('/api/auth/login/', HTTP_ACCEPT_ENCODING='gzip')
+        response = CompressionMiddleware(lambda request: JsonResponse({'access': 'x' * 5000}))(request)
+        self.assertNotIn('Content-Encoding', response)
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class TestCompressedRequests(CompressionTestCase):
+
+    def post_gzip(self, body, encoding='gzip'):
+        return self.client.generic(
+            'POST', '/api/study-notes/batch/', body,
+            content_type='application/json', HTTP_CONTENT_ENCODING=encoding
+        )
+
+    def test_gzipped_batch_sync(self):
+        operations = [{'id': str(uuid.uuid4()), 'content': f'Note {i} ' * 20} for i in range(50)]
+        response = self.post_gzip(gzip.compress(json.dumps({'operations': operations}).encode()))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(StudyNote.objects.filter(user=self.user).count(), 50)
+
+    def test_inflated_size_is_capped(self):
+        bomb = gzip.compress(json.dumps({'operations': [], 'padding': ' ' * 50000}).encode())
+        self.assertLess(len(bomb), 1000)
+
+        with override_settings(COMPRESSION={**settings.COMPRESSION, 'MAX_REQUEST_BYTES': 10000}):
+            response = self.post_gzip(bomb)
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_bad_bodies_and_encodings(self):
+        self.assertEqual(self.post_gzip(b'not gzip at all').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.post_gzip(gzip.compress(b'{"operations": []}')[:-10]).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.post_gzip(b'{"operations": []}', encoding='compress').status_code,
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        )
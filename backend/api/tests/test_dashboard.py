@@ -0,0 +1,107 @@
+"""
+Tests for the cached single-query dashboard.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_dashboard
+"""
+
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Book, CustomUser, RecentVerse, Translation, UserHabit, Verse
+from api.serializers import DashboardSerializer
+from api.utils.activity import get_activity
+from api.utils.dashboard import SECTIONS, DashboardSection, build_dashboard, get_dashboard, register_dashboard_section
+
+# The default DatabaseCache costs a query per lookup; query counts use memory
+LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class TestDashboard(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        book = Book.objects.create(id=43, name='John', short_name='John', canon_order=43, testament='NT', chapter_count=21)
+        for chapter in (1, 2, 3):
+            verse = Verse.objects.create(
+                translation=translation, book=book, chapter=chapter, verse_num=16,
+                text=f'Verse text {chapter}', text_len=12
+            )
+            RecentVerse.objects.create(user=self.user, verse=verse, book=book, chapter=chapter)
+
+        self.habit = UserHabit.objects.create(
+            user=self.user, habit='Read', frequency='Daily', purpose='Growth', time=time(7, 30)
+        )
+
+    def expected(self):
+        """What the serializer-based dashboard returned"""
+        return {
+            **DashboardSerializer({
+                'current_habit': UserHabit.objects.filter(user=self.user).first(),
+                'recent_verses': RecentVerse.objects.filter(user=self.user).order_by('-last_accessed')[:2],
+            }).data,
+            'activity': get_activity(self.user.pk),
+        }
+
+    def test_matches_serializer_output(self):
+        response = self.client.get('/api/dashboard/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), self.expected())
+        self.assertEqual(response.json()['recent_verses'][0]['verse_reference'], 'John 3:16')
+
+    def test_empty_dashboard(self):
+        other = CustomUser.objects.create_user(email='other@example.com', password='testpass123')
+        self.assertEqual(build_dashboard(other.pk), {
+            'current_habit': None,
+            'recent_verses': [],
+            'activity': {
+                'reviews_today': 0, 'review_goal_per_day': 10, 'current_streak': 0,
+                'longest_streak': 0, 'notes_count': 0, 'last_active_day': None,
+            },
+        })
+
+    @override_settings(RATELIMIT_ENABLE=False, CACHES=LOCAL_CACHES)
+    def test_miss_is_one_query_and_hit_is_none(self):
+        # Rate-limit counters and cache lookups are queries of their own, so
+        # they're switched off here
+        with self.assertNumQueries(1):
+            self.client.get('/api/dashboard/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/dashboard/')
+
+    def test_writes_invalidate_snapshot(self):
+        before = self.client.get('/api/dashboard/').json()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.habit.habit = 'Memorize'
+            self.habit.save()
+            # Until the write commits, the snapshot stays (a rebuild now would read the old rows)
+            self.assertEqual(get_dashboard(self.user.pk)['current_habit']['habit'], before['current_habit']['habit'])
+        self.assertEqual(self.client.get('/api/dashboard/').json()['current_habit']['habit'], 'Memorize')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RecentVerse.objects.filter(user=self.user).order_by('-last_accessed').first().delete()
+        self.assertEqual(self.client.get('/api/dashboard/').json(), self.expected())
+
+    def test_registered_sections_share_the_query(self):
+        section = DashboardSection(
+            name='habit_count',
+            sql='SELECT count(*) FROM user_habit WHERE user_id = %(user_id)s',
+        )
+        register_dashboard_section(section)
+        try:
+            with self.assertNumQueries(1):
+                snapshot = build_dashboard(self.user.pk)
+        finally:
+            SECTIONS.remove(section)
+
+        self.assertEqual(snapshot['habit_count'], 1)
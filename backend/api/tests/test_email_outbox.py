@@ -0,0 +1,135 @@
+"""
+Tests for the transactional email outbox and its delivery worker.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_email_outbox
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, EmailOutbox
+from api.utils.email import fake_provider
+from api.utils.email_outbox import (
+    deliver_pending,
+    enqueue_password_reset_email,
+    enqueue_verification_email,
+)
+
+
+@override_settings(EMAIL_PROVIDER='fake')
+class TestEmailOutbox(TestCase):
+
+    def setUp(self):
+        fake_provider.reset()
+        self.client = APIClient()
+
+    def tearDown(self):
+        fake_provider.reset()
+
+    def create_user(self):
+        return CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+
+    def test_register_queues_instead_of_sending(self):
+        """Signup should not wait on the email provider"""
+        fake_provider.latency = 5
+        response = self.client.post('/api/auth/register/', {
+            'email': 'new@example.com',
+            'password': 'Str0ng-passw0rd!',
+            'password_confirm': 'Str0ng-passw0rd!',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(fake_provider.sent, [])
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.kind, EmailOutbox.Kind.VERIFICATION)
+        self.assertEqual(email.status, EmailOutbox.Status.PENDING)
+
+    def test_outbox_row_rolls_back_with_user(self):
+        """No email is queued if the surrounding transaction fails"""
+        try:
+            with transaction.atomic():
+                enqueue_verification_email(self.create_user())
+                raise RuntimeError('boom')
+        except RuntimeError:
+            pass
+
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_worker_sends_and_records_timestamp(self):
+        user = self.create_user()
+        enqueue_verification_email(user)
+
+        self.assertEqual(deliver_pending(), {'claimed': 1, 'sent': 1, 'failed': 0})
+
+        self.assertEqual(fake_provider.sent[0]['to'], 'test@example.com')
+        self.assertIn('/verify-email?token=', fake_provider.sent[0]['text'])
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.status, EmailOutbox.Status.SENT)
+        self.assertEqual(email.provider_message_id, 'fake-1')
+        user.refresh_from_db()
+        self.assertIsNotNone(user.last_verification_email_sent)
+
+    def test_password_reset_email(self):
+        enqueue_password_reset_email(self.create_user(), 'http://localhost:3000/reset?token=abc')
+        deliver_pending()
+
+        self.assertEqual(fake_provider.sent[0]['subject'], 'Reset your password')
+        self.assertIn('http://localhost:3000/reset?token=abc', fake_provider.sent[0]['text'])
+
+    def test_failure_backs_off(self):
+        enqueue_verification_email(self.create_user())
+        fake_provider.failures = 1
+
+        self.assertEqual(deliver_pending()['failed'], 1)
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.status, EmailOutbox.Status.PENDING)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=20))
+
+        # Not due yet
+        self.assertEqual(deliver_pending()['claimed'], 0)
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_pending()['sent'], 1)
+
+    @override_settings(EMAIL_OUTBOX={
+        'BATCH_SIZE': 50, 'MAX_ATTEMPTS': 2, 'BACKOFF_SECONDS': 0,
+        'MAX_BACKOFF_SECONDS': 0, 'LEASE_SECONDS': 300,
+    })
+    def test_dead_letter_after_max_attempts(self):
+        enqueue_verification_email(self.create_user())
+        fake_provider.failures = 5
+
+        deliver_pending()
+        deliver_pending()
+
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.status, EmailOutbox.Status.DEAD)
+        self.assertEqual(email.last_error, 'Fake provider failure')
+        self.assertEqual(deliver_pending()['claimed'], 0)
+
+    def test_resend_verification_does_not_duplicate_pending(self):
+        self.create_user()
+        for _ in range(2):
+            response = self.client.post('/api/auth/resend-verification/', {'email': 'test@example.com'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_command_drains_outbox(self):
+        user = self.create_user()
+        enqueue_verification_email(user)
+        enqueue_password_reset_email(user, 'http://localhost:3000/reset')
+        out = StringIO()
+
+        call_command('deliver_emails', batch_size=1, stdout=out)
+
+        self.assertEqual(len(fake_provider.sent), 2)
+        self.assertFalse(EmailOutbox.objects.filter(status=EmailOutbox.Status.PENDING).exists())
@@ -4,10 +4,11 @@ Unit tests for fetch_bible_data module.
 Run with: docker compose exec backend python manage.py test api.tests.test_fetch_bible_data
 """
 
+import os
 from django.test import TestCase
 from unittest.mock import patch, Mock
 import requests
-from api.utils.fetch_bible_data import fetch_bible_translation
+from api.utils.fetch_bible_data import fetch_bible_source, fetch_bible_translation
 
 
 class TestFetchBibleTranslation(TestCase):
@@ -116,3 +117,56 @@ class TestFetchBibleTranslation(TestCase):
 
             expected_url = f"https://raw.githubusercontent.com/scrollmapper/bible_databases/refs/heads/master/formats/json/{expected_filename}"
             mock_get.assert_called_once_with(expected_url, timeout=30)
+
+
+class TestFetchBibleSource(TestCase):
+    """Test fetch_bible_source function"""
+
+    @patch('api.utils.fetch_bible_data.requests.get')
+    def test_fetches_csv_text(self, mock_get):
+        """Should fetch the CSV export and return its text"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.text = "Book,Chapter,Verse,Text\n"
+        mock_get.return_value = mock_response
+
+        result = fetch_bible_source("KJV.csv", "csv")
+
+        expected_url = "https://raw.githubusercontent.com/scrollmapper/bible_databases/refs/heads/master/formats/csv/KJV.csv"
+        mock_get.assert_called_once_with(expected_url, timeout=30, stream=False)
+        self.assertEqual(result, "Book,Chapter,Verse,Text\n")
+
+    @patch('api.utils.fetch_bible_data.requests.get')
+    def test_streams_sqlite_to_temp_file(self, mock_get):
+        """Should stream the SQLite export to a temporary file"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_content.return_value = [b"SQLite ", b"data"]
+        mock_get.return_value = mock_response
+
+        path = fetch_bible_source("KJV", "sqlite")
+        try:
+            expected_url = "https://raw.githubusercontent.com/scrollmapper/bible_databases/refs/heads/master/formats/sqlite/KJV.db"
+            mock_get.assert_called_once_with(expected_url, timeout=30, stream=True)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), b"SQLite data")
+        finally:
+            os.remove(path)
+
+    @patch('api.utils.fetch_bible_data.requests.get')
+    def test_404_error_raises_value_error(self, mock_get):
+        """Should raise ValueError with helpful message on 404"""
+        mock_response = Mock()
+        mock_response.status_code = 404
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError()
+        mock_get.return_value = mock_response
+
+        with self.assertRaises(ValueError) as context:
+            fetch_bible_source("INVALID", "csv")
+
+        self.assertIn("not found", str(context.exception))
+
+    def test_unsupported_format_raises(self):
+        """Should reject formats other than csv and sqlite"""
+        with self.assertRaises(ValueError):
+            fetch_bible_source("KJV", "xml")
@@ -0,0 +1,197 @@
+"""
+Tests for the cached Google certificate verifier, using a local key server.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_google_certs
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.test import TestCase, override_settings
+from google.auth import crypt, jwt
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import CustomUser
+from api.utils.google_certs import GoogleCertCache, google_cert_cache, parse_max_age
+
+CLIENT_ID = 'test-client-id.apps.googleusercontent.com'
+
+
+def make_key_pair():
+    """RSA private key (PEM) and a self-signed certificate (PEM) for it"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'test-key-server')])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class KeyServer:
+    """Local stand-in for https://www.googleapis.com/oauth2/v1/certs"""
+
+    def __init__(self, certs, max_age=3600):
+        self.certs = certs
+        self.max_age = max_age
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                body = json.dumps(server.certs).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Cache-Control', f'public, max-age={server.max_age}, must-revalidate')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}/certs'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class GoogleCertTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_pem, cls.cert_pem = make_key_pair()
+        cls.server = KeyServer({'key-1': cls.cert_pem})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests = 0
+        self.server.max_age = 3600
+        self.server.certs = {'key-1': self.cert_pem}
+
+    def make_token(self, kid='key-1', **claims):
+        now = int(time.time())
+        payload = {
+            'iss': 'https://accounts.google.com',
+            'aud': CLIENT_ID,
+            'sub': '1234567890',
+            'email': 'google@example.com',
+            'iat': now,
+            'exp': now + 3600,
+        }
+        payload.update(claims)
+        signer = crypt.RSASigner.from_string(self.private_pem, kid)
+        return jwt.encode(signer, payload).decode()
+
+
+class TestGoogleCertCache(GoogleCertTestCase):
+    """Certificates should be fetched once and reused until max-age expires"""
+
+    def test_parse_max_age(self):
+        self.assertEqual(parse_max_age('public, max-age=19845, must-revalidate'), 19845)
+        self.assertIsNone(parse_max_age('no-cache'))
+        self.assertIsNone(parse_max_age(None))
+
+    def test_repeat_verifications_use_cached_certs(self):
+        cache = GoogleCertCache(self.server.url)
+        for _ in range(3):
+            idinfo = cache.verify(self.make_token(), CLIENT_ID)
+
+        self.assertEqual(idinfo['email'], 'google@example.com')
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def test_expired_certs_are_refetched(self):
+        self.server.max_age = 0
+        cache = GoogleCertCache(self.server.url)
+        cache.verify(self.make_token(), CLIENT_ID)
+        cache.verify(self.make_token(), CLIENT_ID)
+
+        self.assertEqual(self.server.requests, 2)
+
+    def test_background_refresh_before_expiry(self):
+        """Certs inside the refresh margin are served while a refresh runs"""
+        self.server.max_age = 30
+        cache = GoogleCertCache(self.server.url)
+        cache.get_certs()
+        cache.get_certs()
+
+        for _ in range(50):
+            if cache.stats()['background_refreshes']:
+                break
+            time.sleep(0.02)
+        self.assertEqual(cache.stats()['background_refreshes'], 1)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_unknown_kid_triggers_refetch(self):
+        cache = GoogleCertCache(self.server.url)
+        cache.get_certs()
+        cache.last_fetch = 0.0
+        self.server.certs = {'key-2': self.cert_pem}
+
+        cache.verify(self.make_token(kid='key-2'), CLIENT_ID)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_rejects_wrong_audience_and_issuer(self):
+        cache = GoogleCertCache(self.server.url)
+        with self.assertRaises(ValueError):
+            cache.verify(self.make_token(aud='someone-else'), CLIENT_ID)
+        with self.assertRaises(ValueError):
+            cache.verify(self.make_token(iss='https://evil.example.com'), CLIENT_ID)
+
+
+class TestGoogleLoginView(GoogleCertTestCase):
+    """POST /api/auth/google/ should verify against the cached certificates"""
+
+    def setUp(self):
+        super().setUp()
+        google_cert_cache.clear()
+        self.client = APIClient()
+
+    def tearDown(self):
+        google_cert_cache.clear()
+
+    def test_login_without_outbound_request_after_first(self):
+        with override_settings(GOOGLE_CERTS_URL=self.server.url, GOOGLE_CLIENT_ID=CLIENT_ID):
+            first = self.client.post('/api/auth/google/', {'token': self.make_token()})
+            second = self.client.post('/api/auth/google/', {'token': self.make_token()})
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.server.requests, 1)
+        self.assertTrue(CustomUser.objects.filter(email='google@example.com').exists())
+
+    def test_invalid_token_returns_400(self):
+        with override_settings(GOOGLE_CERTS_URL=self.server.url, GOOGLE_CLIENT_ID=CLIENT_ID):
+            response = self.client.post('/api/auth/google/', {'token': self.make_token(aud='other')})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,103 @@
+"""
+Tests for full-text search over a user's study notes.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_note_search
+"""
+
+import uuid
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Book, CustomUser, StudyNote, Translation, Verse
+from api.utils.note_search import search_notes
+from api.utils.study_notes import NoteOperation, apply_note_batch
+
+
+class TestNoteSearch(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        book = Book.objects.create(id=43, name='John', short_name='John', canon_order=43, testament='NT', chapter_count=21)
+        self.verse = Verse.objects.create(
+            translation=translation, book=book, chapter=3, verse_num=16,
+            text='For God so loved the world, that he gave his only begotten Son', text_len=62
+        )
+
+    def note(self, content, user=None, **fields):
+        return StudyNote.objects.create(user=user or self.user, content=content, **fields)
+
+    def search(self, query):
+        return [match['note'].content for match in search_notes(self.user.pk, query)]
+
+    def test_matches_are_ranked(self):
+        self.note('Grace is mentioned once here.')
+        self.note('Grace upon grace: grace is the theme of this grace-filled chapter.')
+        self.note('Nothing relevant.')
+
+        self.assertEqual(self.search('grace'), [
+            'Grace upon grace: grace is the theme of this grace-filled chapter.',
+            'Grace is mentioned once here.',
+        ])
+
+    def test_stemming_and_web_syntax(self):
+        self.note('Praying for patience every morning.')
+        self.note('Prayer list for the week.')
+
+        self.assertEqual(len(self.search('prayed')), 1)
+        self.assertEqual(len(self.search('praying OR prayer')), 2)
+        self.assertEqual(self.search('pray -patience'), [])
+        self.assertEqual(self.search('"prayer list"'), ['Prayer list for the week.'])
+
+    def test_only_own_notes(self):
+        other = CustomUser.objects.create_user(email='other@example.com', password='testpass123')
+        self.note('Faith without works', user=other)
+        self.assertEqual(self.search('faith'), [])
+
+    def test_verse_text_matches_with_verse_snippet(self):
+        self.note('My favourite verse.', verse=self.verse)
+
+        matches = search_notes(self.user.pk, 'begotten')
+        self.assertEqual(len(matches), 1)
+        self.assertIn('<mark>begotten</mark>', matches[0]['verse_snippet'])
+
+        self.assertIsNone(search_notes(self.user.pk, 'favourite')[0]['verse_snippet'])
+
+    def test_snippets_are_escaped(self):
+        self.note('<script>alert(1)</script> love one another')
+
+        snippet = search_notes(self.user.pk, 'love')[0]['snippet']
+        self.assertIn('<mark>love</mark>', snippet)
+        self.assertNotIn('<script>', snippet)
+
+    def test_search_follows_every_write_path(self):
+        note = self.note('Original words')
+        note.content = 'Rewritten with mercy'
+        note.save()
+        apply_note_batch(self.user.pk, [NoteOperation(uuid.uuid4(), 'upsert', content='Batch about mercy')])
+
+        self.assertEqual(len(self.search('mercy')), 2)
+        self.assertEqual(self.search('original'), [])
+
+    def test_one_query_for_matches_plus_one_for_notes(self):
+        for i in range(10):
+            self.note(f'Hope note {i}', verse=self.verse)
+        with self.assertNumQueries(2):
+            search_notes(self.user.pk, 'hope')
+
+    def test_endpoint(self):
+        self.note('Peace that passes understanding', verse=self.verse)
+
+        response = self.client.get('/api/study-notes/search/', {'q': 'peace'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.json()['results'][0]
+        self.assertEqual(result['note']['verse_ref'], 43003016)
+        self.assertIn('<mark>Peace</mark>', result['snippet'])
+
+        for params in ({}, {'q': '  '}, {'q': 'x' * 201}, {'q': 'peace', 'limit': 'all'}):
+            self.assertEqual(self.client.get('/api/study-notes/search/', params).status_code, status.HTTP_400_BAD_REQUEST)
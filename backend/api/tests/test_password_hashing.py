@@ -0,0 +1,94 @@
+"""
+Tests for pooled password hashing and rehash on login.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_password_hashing
+"""
+
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import CustomUser
+from api.utils.password_hashing import (
+    HashingExecutor,
+    PasswordHashingBusy,
+    authenticate_user,
+    hashing_executor,
+)
+
+
+def hashing_settings(**overrides):
+    return {**settings.PASSWORD_HASHING, **overrides}
+
+
+class TestRehashOnLogin(TestCase):
+    """Stored hashes should follow the configured algorithm and cost"""
+
+    def setUp(self):
+        with override_settings(PASSWORD_HASHING=hashing_settings(PBKDF2_ITERATIONS=1000)):
+            self.user = CustomUser.objects.create_user(
+                email='test@example.com', password='testpass123', email_verified=True
+            )
+
+    def test_cost_change_rehashes(self):
+        self.assertIn('$1000$', self.user.password)
+
+        with override_settings(PASSWORD_HASHING=hashing_settings(PBKDF2_ITERATIONS=2000)):
+            self.assertEqual(authenticate_user('test@example.com', 'testpass123'), self.user)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+
+    def test_algorithm_change_rehashes_to_scrypt(self):
+        hashers = list(reversed(settings.PASSWORD_HASHERS))
+        with override_settings(PASSWORD_HASHERS=hashers, PASSWORD_HASHING=hashing_settings(SCRYPT_WORK_FACTOR=2 ** 10)):
+            response = APIClient().post('/api/auth/login/', {'email': 'test@example.com', 'password': 'testpass123'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('scrypt$'))
+            self.assertTrue(self.user.check_password('testpass123'))
+
+    def test_wrong_password_and_unknown_email(self):
+        self.assertIsNone(authenticate_user('test@example.com', 'wrong'))
+        self.assertIsNone(authenticate_user('nobody@example.com', 'testpass123'))
+
+
+class TestHashingExecutor(TestCase):
+    """The pool should reject work beyond its capacity"""
+
+    def test_rejects_when_full(self):
+        executor = HashingExecutor(max_concurrent=1, max_pending=0)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_hash():
+            started.set()
+            release.wait()
+            return 'done'
+
+        results = []
+        worker = threading.Thread(target=lambda: results.append(executor.run(slow_hash)))
+        worker.start()
+        started.wait()
+
+        with self.assertRaises(PasswordHashingBusy):
+            executor.run(lambda: 'rejected')
+
+        release.set()
+        worker.join()
+        self.assertEqual(results, ['done'])
+        self.assertEqual(executor.stats()['rejected'], 1)
+        self.assertEqual(executor.run(lambda: 'again'), 'again')
+
+    def test_login_returns_503_when_busy(self):
+        CustomUser.objects.create_user(email='test@example.com', password='testpass123', email_verified=True)
+
+        with mock.patch.object(hashing_executor, 'run', side_effect=PasswordHashingBusy):
+            response = APIClient().post('/api/auth/login/', {'email': 'test@example.com', 'password': 'testpass123'})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
@@ -0,0 +1,86 @@
+"""
+Tests for the shared rate-limit store and per-endpoint hit counters.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_rate_limits
+"""
+
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import RateLimitCounter, RateLimitHit
+from api.utils.rate_limits import DatabaseRateLimitCache, LimitHitCounter, limit_hits
+
+
+class TestDatabaseRateLimitCache(TestCase):
+    """Counters should be shared by every backend instance (worker)"""
+
+    def setUp(self):
+        self.worker_a = DatabaseRateLimitCache('rate_limit_counters', {})
+        self.worker_b = DatabaseRateLimitCache('rate_limit_counters', {})
+
+    def test_add_then_incr_across_workers(self):
+        self.assertTrue(self.worker_a.add('rl:key', 1, 60))
+        self.assertFalse(self.worker_b.add('rl:key', 1, 60))
+        self.assertEqual(self.worker_b.incr('rl:key'), 2)
+        self.assertEqual(self.worker_a.incr('rl:key'), 3)
+        self.assertEqual(self.worker_a.get('rl:key'), 3)
+
+    def test_timeout_sets_expiry(self):
+        self.worker_a.add('rl:key', 1, 60)
+        expires_at = RateLimitCounter.objects.get().expires_at
+        self.assertAlmostEqual((expires_at - timezone.now()).total_seconds(), 60, delta=5)
+
+    def test_expired_window_restarts(self):
+        self.worker_a.add('rl:key', 5, 60)
+        RateLimitCounter.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertIsNone(self.worker_b.get('rl:key'))
+        with self.assertRaises(ValueError):
+            self.worker_b.incr('rl:key')
+        self.assertTrue(self.worker_b.add('rl:key', 1, 60))
+        self.assertEqual(self.worker_a.get('rl:key'), 1)
+
+    def test_cull_removes_expired(self):
+        self.worker_a.set('rl:old', 1, 60)
+        self.worker_a.set('rl:new', 1, 60)
+        RateLimitCounter.objects.filter(key__endswith='old').update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.worker_a.cull()
+        self.assertEqual(RateLimitCounter.objects.count(), 1)
+
+
+class TestRateLimitHits(TestCase):
+    """Rejected requests should be counted per endpoint"""
+
+    def setUp(self):
+        caches['ratelimit'].clear()
+        limit_hits.flush()
+        RateLimitHit.objects.all().delete()
+
+    def test_limit_is_enforced_and_counted(self):
+        client = APIClient()
+        responses = [
+            client.post('/api/auth/resend-verification/', {'email': 'nobody@example.com'})
+            for _ in range(4)
+        ]
+
+        self.assertEqual([r.status_code for r in responses[:3]], [status.HTTP_200_OK] * 3)
+        self.assertEqual(responses[3].status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(limit_hits.stats()['resend_verification']['hits'], 1)
+
+    def test_hits_flush_in_batches(self):
+        counter = LimitHitCounter(flush_every=3, flush_seconds=3600)
+        counter.record('habits')
+        counter.record('habits')
+        self.assertFalse(RateLimitHit.objects.exists())
+
+        counter.record('dashboard_view')
+        self.assertEqual(
+            dict(RateLimitHit.objects.values_list('endpoint', 'hits')),
+            {'habits': 2, 'dashboard_view': 1}
+        )
@@ -0,0 +1,201 @@
+"""
+Tests for the reading event log, its rollups and the derived recent verses.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_reading_history
+"""
+
+import threading
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Book, CustomUser, ReadingEvent, ReadingRollup, RecentVerse, Translation, Verse
+from api.utils.reading_history import ReadingEventBuffer, reading_events, rollup_reading_history
+from api.utils.recent_verses import ViewEvent
+
+
+class ReadingHistoryTestCase(TestCase):
+
+    def setUp(self):
+        reading_events.flush()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.other = CustomUser.objects.create_user(email='other@example.com', password='testpass123')
+
+        translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        self.john = Book.objects.create(id=43, name='John', short_name='John', canon_order=43, testament='NT', chapter_count=21)
+        self.acts = Book.objects.create(id=44, name='Acts', short_name='Acts', canon_order=44, testament='NT', chapter_count=28)
+        self.verses = {}
+        for book in (self.john, self.acts):
+            for chapter in (1, 2, 3):
+                for verse_num in (1, 2):
+                    self.verses[book.id, chapter, verse_num] = Verse.objects.create(
+                        translation=translation, book=book, chapter=chapter, verse_num=verse_num,
+                        text=f'{book.name} {chapter}:{verse_num}', text_len=10
+                    )
+
+    def tearDown(self):
+        reading_events.flush()
+
+    def view(self, user, book, chapter, verse_num, minutes_ago=0):
+        return user, ViewEvent(
+            verse_id=self.verses[book.id, chapter, verse_num].id,
+            viewed_at=timezone.now() - timedelta(minutes=minutes_ago)
+        )
+
+    def append(self, *views):
+        buffer = ReadingEventBuffer(flush_every=1000, flush_seconds=3600)
+        for user, event in views:
+            buffer.record(user.pk, [event])
+        return buffer.flush()
+
+    def rollup(self):
+        """Two runs: the first only notes the newest event id"""
+        rollup_reading_history()
+        return rollup_reading_history()
+
+
+class TestReadingEventBuffer(ReadingHistoryTestCase):
+    """Buffered views should be written with one insert per flush"""
+
+    def test_flush_is_one_query(self):
+        buffer = ReadingEventBuffer(flush_every=1000, flush_seconds=3600)
+        for chapter in (1, 2, 3):
+            buffer.record(self.user.pk, [self.view(self.user, self.john, chapter, 1)[1]])
+        self.assertEqual(ReadingEvent.objects.count(), 0)
+
+        # One insert (inside a test the savepoint around it shows up too)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(buffer.flush(), 3)
+        self.assertEqual([query['sql'].split()[0] for query in queries if 'SAVEPOINT' not in query['sql']], ['INSERT'])
+        self.assertEqual(buffer.stats(), {'pending': 0, 'flushes': 1, 'written': 3, 'dropped': 0})
+
+    def test_flushes_when_full(self):
+        buffer = ReadingEventBuffer(flush_every=2, flush_seconds=3600)
+        buffer.record(self.user.pk, [self.view(self.user, self.john, 1, 1)[1]])
+        buffer.record(self.user.pk, [self.view(self.user, self.john, 1, 2)[1]])
+
+        self.assertEqual(ReadingEvent.objects.count(), 2)
+
+    def test_idle_buffer_flushes_on_a_timer(self):
+        buffer = ReadingEventBuffer(flush_every=1000, flush_seconds=0.05)
+        flushed = threading.Event()
+        buffer.flush = flushed.set
+        buffer.record(self.user.pk, [self.view(self.user, self.john, 1, 1)[1]])
+
+        # No further views arrive, yet the buffer is flushed
+        self.assertTrue(flushed.wait(5))
+
+    def test_failed_flush_does_not_raise_into_record(self):
+        buffer = ReadingEventBuffer(flush_every=2, flush_seconds=3600)
+        buffer.record(self.user.pk, [self.view(self.user, self.john, 1, 1)[1]])
+        with self.assertLogs('api.utils.reading_history', level='ERROR'):
+            buffer.record(self.other.pk, [ViewEvent(translation='KJV', ref=99999999999)])
+
+        self.assertEqual(buffer.stats()['dropped'], 2)
+        self.assertEqual(ReadingEvent.objects.count(), 0)
+
+    def test_resolves_refs_and_drops_unknown_verses(self):
+        self.append(
+            (self.user, ViewEvent(translation='KJV', ref=43001002)),
+            (self.user, ViewEvent(translation='KJV', ref=43099001)),
+            (self.user, ViewEvent(verse_id=999999999)),
+        )
+
+        self.assertEqual(
+            list(ReadingEvent.objects.values_list('verse_id', flat=True)),
+            [self.verses[43, 1, 2].id]
+        )
+
+
+class TestRollup(ReadingHistoryTestCase):
+    """Rollups should aggregate new events incrementally"""
+
+    def test_aggregates_per_chapter(self):
+        self.append(
+            self.view(self.user, self.john, 1, 1, minutes_ago=10),
+            self.view(self.user, self.john, 1, 2, minutes_ago=5),
+            self.view(self.user, self.acts, 2, 1, minutes_ago=1),
+            self.view(self.other, self.john, 1, 1),
+        )
+        result = self.rollup()
+
+        self.assertEqual(result, {'events': 4, 'users': 2, 'caught_up': True})
+        rollup = ReadingRollup.objects.get(user=self.user, book=self.john, chapter=1)
+        self.assertEqual(rollup.read_count, 2)
+        self.assertEqual(rollup.last_verse_id, self.verses[43, 1, 2].id)
+
+    def test_runs_are_incremental(self):
+        self.append(self.view(self.user, self.john, 1, 1, minutes_ago=10))
+        self.rollup()
+        self.append(self.view(self.user, self.john, 1, 2, minutes_ago=20))
+        self.rollup()
+
+        rollup = ReadingRollup.objects.get(user=self.user, book=self.john, chapter=1)
+        self.assertEqual(rollup.read_count, 2)
+        # The late event is older, so the last verse stays put
+        self.assertEqual(rollup.last_verse_id, self.verses[43, 1, 1].id)
+        self.assertEqual(self.rollup()['events'], 0)
+
+    def test_batch_size_leaves_backlog(self):
+        self.append(*[self.view(self.user, self.john, 1, 1, minutes_ago=n) for n in range(5)])
+        rollup_reading_history()
+
+        self.assertEqual(rollup_reading_history(max_events=3), {'events': 3, 'users': 1, 'caught_up': False})
+        self.assertTrue(rollup_reading_history(max_events=3)['caught_up'])
+        self.assertEqual(ReadingRollup.objects.get().read_count, 5)
+
+    def test_derives_recent_verses(self):
+        self.append(
+            self.view(self.user, self.john, 1, 1, minutes_ago=30),
+            self.view(self.user, self.john, 2, 2, minutes_ago=20),
+            self.view(self.user, self.acts, 3, 1, minutes_ago=10),
+        )
+        self.rollup()
+
+        self.assertEqual(
+            list(RecentVerse.objects.filter(user=self.user).order_by('-last_accessed').values_list('book', 'chapter', 'verse')),
+            [(44, 3, self.verses[44, 3, 1].id), (43, 2, self.verses[43, 2, 2].id)]
+        )
+
+    def test_newer_interactive_entry_survives(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.post('/api/recent-verses/', {'verse_id': self.verses[43, 3, 1].id}, format='json')
+        self.append(
+            self.view(self.user, self.acts, 1, 1, minutes_ago=30),
+            self.view(self.user, self.acts, 2, 1, minutes_ago=20),
+        )
+        self.rollup()
+
+        self.assertEqual(
+            list(RecentVerse.objects.filter(user=self.user).order_by('-last_accessed').values_list('book', 'chapter')),
+            [(43, 3), (44, 2)]
+        )
+
+
+class TestReadingHistoryView(ReadingHistoryTestCase):
+
+    def test_history_by_book(self):
+        self.append(
+            self.view(self.user, self.john, 1, 1, minutes_ago=30),
+            self.view(self.user, self.john, 2, 1, minutes_ago=25),
+            self.view(self.user, self.john, 2, 2, minutes_ago=20),
+            self.view(self.user, self.acts, 1, 1, minutes_ago=10),
+        )
+        self.rollup()
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get('/api/reading-history/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        history = [
+            (book['book_name'], book['chapters_read'], book['reads'], book['last_chapter'])
+            for book in response.json()
+        ]
+        self.assertEqual(history, [('Acts', 1, 1, 1), ('John', 2, 3, 2)])
@@ -0,0 +1,173 @@
+"""
+Tests for the set-based recent verse upsert and the batch view endpoint.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_recent_verses
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Book, CustomUser, RecentVerse, Translation, Verse
+from api.utils.reading_history import reading_events, rollup_reading_history
+from api.utils.recent_verses import ViewEvent, record_views
+
+
+class RecentVersesTestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        self.translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        self.john = Book.objects.create(id=43, name='John', short_name='John', canon_order=43, testament='NT', chapter_count=21)
+        self.verses = {}
+        for chapter in (1, 2, 3):
+            for verse_num in (1, 16):
+                self.verses[chapter, verse_num] = Verse.objects.create(
+                    translation=self.translation, book=self.john, chapter=chapter, verse_num=verse_num,
+                    text=f'John {chapter}:{verse_num}', text_len=10
+                )
+
+    def tearDown(self):
+        # Views posted here are buffered for the event log
+        reading_events.flush()
+
+    def chapters(self):
+        return list(
+            RecentVerse.objects.filter(user=self.user).order_by('-last_accessed').values_list('chapter', 'verse__verse_num')
+        )
+
+
+class TestRecordViews(RecentVersesTestCase):
+    """record_views() should upsert and trim in a single statement"""
+
+    def test_one_query_per_batch(self):
+        events = [ViewEvent(verse_id=verse.id) for verse in self.verses.values()]
+        with self.assertNumQueries(1):
+            record_views(self.user.pk, events)
+
+        self.assertEqual(len(self.chapters()), 2)
+
+    def test_keeps_newest_chapters(self):
+        now = timezone.now()
+        record_views(self.user.pk, [
+            ViewEvent(verse_id=self.verses[1, 1].id, viewed_at=now - timedelta(minutes=3)),
+            ViewEvent(verse_id=self.verses[2, 1].id, viewed_at=now - timedelta(minutes=2)),
+        ])
+        record_views(self.user.pk, [ViewEvent(verse_id=self.verses[3, 1].id, viewed_at=now)])
+
+        self.assertEqual(self.chapters(), [(3, 1), (2, 1)])
+
+    def test_same_chapter_updates_verse(self):
+        record_views(self.user.pk, [ViewEvent(verse_id=self.verses[1, 1].id)])
+        record_views(self.user.pk, [ViewEvent(verse_id=self.verses[1, 16].id)])
+
+        self.assertEqual(self.chapters(), [(1, 16)])
+
+    def test_older_event_does_not_override(self):
+        """A late-arriving offline view must not replace a newer one"""
+        record_views(self.user.pk, [ViewEvent(verse_id=self.verses[1, 16].id)])
+        entries = record_views(self.user.pk, [
+            ViewEvent(verse_id=self.verses[1, 1].id, viewed_at=timezone.now() - timedelta(hours=1)),
+        ])
+
+        self.assertEqual(entries, [])
+        self.assertEqual(self.chapters(), [(1, 16)])
+
+    @override_settings(RECENT_VERSES={'KEEP': 2, 'MAX_BATCH': 100})
+    def test_old_event_beyond_limit_is_dropped(self):
+        now = timezone.now()
+        record_views(self.user.pk, [
+            ViewEvent(verse_id=self.verses[1, 1].id, viewed_at=now - timedelta(minutes=1)),
+            ViewEvent(verse_id=self.verses[2, 1].id, viewed_at=now),
+        ])
+        record_views(self.user.pk, [
+            ViewEvent(verse_id=self.verses[3, 1].id, viewed_at=now - timedelta(days=1)),
+        ])
+
+        self.assertEqual(self.chapters(), [(2, 1), (1, 1)])
+
+    def test_lookup_by_ref_and_unknown_verses(self):
+        entries = record_views(self.user.pk, [
+            ViewEvent(translation='KJV', ref=43003016),
+            ViewEvent(translation='KJV', ref=43099001),
+            ViewEvent(verse_id=999999999),
+        ])
+
+        self.assertEqual([entry['verse_reference'] for entry in entries], ['John 3:16'])
+
+
+class TestRecentVersesEndpoints(RecentVersesTestCase):
+
+    def test_post_returns_serialized_entry(self):
+        response = self.client.post('/api/recent-verses/', {'verse_id': self.verses[3, 16].id}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json(), self.client.get('/api/recent-verses/').json()[0])
+        self.assertEqual(response.json()['verse_reference'], 'John 3:16')
+
+    def test_post_validation(self):
+        missing = self.client.post('/api/recent-verses/', {}, format='json')
+        unknown = self.client.post('/api/recent-verses/', {'verse_id': 999999999}, format='json')
+
+        self.assertEqual(missing.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(unknown.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_post_of_an_older_view(self):
+        now = timezone.now()
+        newer = self.client.post('/api/recent-verses/', {'verse_id': self.verses[3, 16].id}, format='json').json()
+        self.client.post('/api/recent-verses/', {'verse_id': self.verses[2, 1].id}, format='json')
+
+        # Same chapter, viewed before the stored entry: that entry is current
+        response = self.client.post('/api/recent-verses/', {
+            'verse_id': self.verses[3, 1].id, 'viewed_at': (now - timedelta(hours=1)).isoformat()
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), newer)
+
+        # Older than the kept chapters: nothing to show, but the view is logged
+        pending = len(reading_events.pending)
+        response = self.client.post('/api/recent-verses/', {
+            'verse_id': self.verses[1, 1].id, 'viewed_at': (now - timedelta(hours=1)).isoformat()
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(len(reading_events.pending), pending + 1)
+        self.assertEqual(self.chapters(), [(2, 1), (3, 16)])
+
+    def test_batch_is_appended_and_rolled_up(self):
+        now = timezone.now()
+        response = self.client.post('/api/recent-verses/batch/', {'events': [
+            {'verse_id': self.verses[1, 1].id, 'viewed_at': (now - timedelta(minutes=5)).isoformat()},
+            {'verse_ref': 43002016, 'translation': 'KJV', 'viewed_at': (now - timedelta(minutes=4)).isoformat()},
+            {'verse_id': self.verses[3, 1].id},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json(), {'received': 3})
+
+        reading_events.flush()
+        rollup_reading_history()
+        rollup_reading_history()
+        self.assertEqual(self.chapters(), [(3, 1), (2, 16)])
+
+    def test_batch_validation(self):
+        for body in ({}, {'events': []}, {'events': [{'viewed_at': 'yesterday'}]},
+                     {'events': [{'verse_id': 1, 'viewed_at': 'yesterday'}]},
+                     {'events': [{'verse_ref': 99999999999, 'translation': 'KJV'}]},
+                     {'events': [{'verse_ref': 43000016, 'translation': 'KJV'}]},
+                     {'events': [{'verse_id': 2 ** 63}]}, {'events': [{'verse_id': -1}]}):
+            response = self.client.post('/api/recent-verses/batch/', body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(RECENT_VERSES={'KEEP': 2, 'MAX_BATCH': 2}):
+            response = self.client.post('/api/recent-verses/batch/', {'events': [{'verse_id': 1}] * 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_future_timestamps_are_clamped(self):
+        event = ViewEvent.from_data({'verse_id': 1, 'viewed_at': '2999-01-01T00:00:00Z'})
+        self.assertLessEqual(event.viewed_at, timezone.now())
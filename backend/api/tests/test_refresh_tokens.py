@@ -0,0 +1,117 @@
+"""
+Tests for refresh-token families.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_refresh_tokens
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import CustomUser, RefreshTokenFamily
+
+
+class TestRefreshTokenFamilies(TestCase):
+    """POST /api/auth/refresh/ should rotate within a token family"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email='test@example.com', password='testpass123', email_verified=True
+        )
+        response = self.client.post('/api/auth/login/', {'email': 'test@example.com', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.first_token = response.cookies['refresh_token'].value
+        self.family = RefreshTokenFamily.objects.get(user=self.user)
+
+    def refresh(self, token):
+        self.client.cookies['refresh_token'] = token
+        return self.client.post('/api/auth/refresh/')
+
+    def age_rotation(self):
+        """Move the last rotation outside the reuse grace window"""
+        RefreshTokenFamily.objects.filter(id=self.family.id).update(
+            rotated_at=timezone.now() - timedelta(minutes=1)
+        )
+
+    def test_refresh_rotates_generation(self):
+        """Each refresh advances the family and returns a new token"""
+        response = self.refresh(self.first_token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access_token', response.data)
+        self.assertNotEqual(response.cookies['refresh_token'].value, self.first_token)
+        self.family.refresh_from_db()
+        self.assertEqual(self.family.generation, 1)
+
+    def test_refresh_is_a_single_statement(self):
+        """Rotation should not read custom_user or the blacklist tables"""
+        self.client.cookies['refresh_token'] = self.first_token
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/auth/refresh/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statements = [q['sql'] for q in queries.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 1)
+        self.assertIn('refresh_token_families', statements[0])
+
+    def test_reuse_revokes_family(self):
+        """Presenting a rotated-out token revokes every token in the family"""
+        second_token = self.refresh(self.first_token).cookies['refresh_token'].value
+        self.age_rotation()
+
+        response = self.refresh(self.first_token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.family.refresh_from_db()
+        self.assertIsNotNone(self.family.revoked_at)
+        self.assertEqual(self.refresh(second_token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_concurrent_refresh_within_grace(self):
+        """A burst of refreshes with the same token should all succeed"""
+        first = self.refresh(self.first_token)
+        second = self.refresh(self.first_token)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.family.refresh_from_db()
+        self.assertEqual(self.family.generation, 1)
+        self.assertIsNone(self.family.revoked_at)
+
+    def test_logout_revokes_family(self):
+        """Logging out should invalidate the refresh token"""
+        self.client.force_authenticate(user=self.user)
+        self.client.cookies['refresh_token'] = self.first_token
+        self.client.post('/api/auth/logout/')
+
+        self.assertEqual(self.refresh(self.first_token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_legacy_token_is_upgraded(self):
+        """Tokens from before families existed are blacklisted and replaced"""
+        legacy = str(RefreshToken.for_user(self.user))
+
+        response = self.refresh(legacy)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertEqual(RefreshTokenFamily.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(self.refresh(legacy).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_prune_expired_families(self):
+        """The prune command should delete expired families"""
+        RefreshTokenFamily.objects.filter(id=self.family.id).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+        out = StringIO()
+        call_command('prune_token_blacklist', pause=0, stdout=out)
+
+        self.assertIn('Pruned 1 expired token families', out.getvalue())
+        self.assertFalse(RefreshTokenFamily.objects.exists())
@@ -0,0 +1,164 @@
+"""
+Tests for the batched reminder delivery worker, using the in-memory sink.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_reminder_delivery
+"""
+
+import asyncio
+import time
+from datetime import time as dt_time, timedelta
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.models import CustomUser, ReminderJob, ReminderSchedule, UserHabit, UserProfile
+from api.utils.email import fake_provider
+from api.utils.reminder_delivery import (
+    EmailReminderTransport,
+    ReminderDeliveryWorker,
+    build_reminder,
+    queue_depth,
+    reminder_sink,
+    send_all,
+)
+
+
+class ConcurrencyProbe:
+    """Async transport that records the most sends it saw in flight"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def send(self, user, message):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+
+class ReminderDeliveryTestCase(TestCase):
+
+    def setUp(self):
+        reminder_sink.reset()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        UserProfile.objects.create(user=self.user, notif_hour=7)
+        self.habit = UserHabit.objects.create(
+            user=self.user, habit='Pray', frequency='Daily', purpose='Peace', time=dt_time(8, 0)
+        )
+
+    def tearDown(self):
+        reminder_sink.reset()
+
+    def queue(self, count=1, kind=ReminderSchedule.Kind.HABIT, minutes_ago=1):
+        schedule = ReminderSchedule.objects.get(kind=kind)
+        now = timezone.now()
+        return [
+            ReminderJob.objects.create(
+                schedule=schedule, user=self.user, kind=kind,
+                scheduled_for=now - timedelta(minutes=minutes_ago, seconds=n),
+                due_at=now - timedelta(minutes=minutes_ago, seconds=n)
+            )
+            for n in range(count)
+        ]
+
+
+class TestReminderDelivery(ReminderDeliveryTestCase):
+
+    def test_sends_batch(self):
+        self.queue(3)
+        self.queue(1, kind=ReminderSchedule.Kind.DAILY)
+        result = ReminderDeliveryWorker(transport=reminder_sink, batch_size=10).run_batch()
+
+        self.assertEqual((result['claimed'], result['sent'], result['failed']), (4, 4, 0))
+        self.assertEqual(ReminderJob.objects.filter(status=ReminderJob.Status.SENT).count(), 4)
+        subjects = sorted(message['subject'] for message in reminder_sink.sent)
+        self.assertEqual(subjects, ["Reminder: Pray"] * 3 + ["Time for today's reading"])
+
+    def test_batch_size_and_future_jobs(self):
+        self.queue(3)
+        self.queue(1, minutes_ago=-10)
+        worker = ReminderDeliveryWorker(transport=reminder_sink, batch_size=2)
+
+        self.assertEqual(worker.run_batch()['sent'], 2)
+        self.assertEqual(queue_depth(), {'due': 1, 'later': 1})
+        self.assertEqual(worker.run_batch()['sent'], 1)
+        self.assertEqual(worker.run_batch()['claimed'], 0)
+
+    def test_failures_retry_with_backoff_then_dead_letter(self):
+        job, = self.queue(1)
+        reminder_sink.failures = 10
+        worker = ReminderDeliveryWorker(transport=reminder_sink)
+
+        worker.run_batch()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), ('pending', 1, 'Sink failure'))
+        self.assertGreater(job.due_at, timezone.now() + timedelta(seconds=50))
+
+        with override_settings(REMINDER_DELIVERY={**settings.REMINDER_DELIVERY, 'MAX_ATTEMPTS': 2}):
+            ReminderJob.objects.filter(id=job.id).update(due_at=timezone.now())
+            ReminderDeliveryWorker(transport=reminder_sink).run_batch()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReminderJob.Status.DEAD)
+
+    def test_pauses_while_transport_fails(self):
+        self.queue(4)
+        reminder_sink.failures = 4
+        worker = ReminderDeliveryWorker(transport=reminder_sink)
+
+        self.assertEqual(worker.run_batch()['pause_seconds'], 5)
+        ReminderJob.objects.update(due_at=timezone.now())
+        reminder_sink.failures = 4
+        self.assertEqual(worker.run_batch()['pause_seconds'], 10)
+        ReminderJob.objects.update(due_at=timezone.now())
+        self.assertEqual(worker.run_batch()['pause_seconds'], 0)
+
+    def test_stale_reminders_expire(self):
+        self.queue(1, minutes_ago=3 * 60)
+        result = ReminderDeliveryWorker(transport=reminder_sink).run_batch()
+
+        self.assertEqual((result['expired'], result['sent']), (1, 0))
+        self.assertEqual(ReminderJob.objects.get().status, ReminderJob.Status.DEAD)
+        self.assertEqual(reminder_sink.sent, [])
+
+    def test_email_transport(self):
+        fake_provider.reset()
+        self.queue(1)
+        with override_settings(EMAIL_PROVIDER='fake'):
+            ReminderDeliveryWorker(transport=EmailReminderTransport()).run_batch()
+
+        self.assertEqual(fake_provider.sent[0]['to'], 'test@example.com')
+        fake_provider.reset()
+
+    def test_habit_text_is_escaped_in_html(self):
+        self.habit.habit = '<script>alert(1)</script>'
+        self.habit.purpose = 'Faith & hope'
+        self.habit.save()
+        [job] = self.queue(1)
+
+        message = build_reminder(ReminderJob.objects.select_related('schedule__habit').get(id=job.id))
+        self.assertEqual(message['text'], "It's time for <script>alert(1)</script>. Faith & hope")
+        self.assertIn('&lt;script&gt;alert(1)&lt;/script&gt;. Faith &amp; hope', message['html'])
+        self.assertNotIn('<script>', message['html'])
+
+
+class TestSendAll(ReminderDeliveryTestCase):
+    """Sends should overlap, but never beyond the concurrency limit"""
+
+    def test_async_transport_is_bounded(self):
+        jobs = self.queue(20)
+        probe = ConcurrencyProbe()
+        errors = asyncio.run(send_all([(job, {}) for job in jobs], probe, concurrency=5))
+
+        self.assertEqual(errors, [None] * 20)
+        self.assertEqual(probe.peak, 5)
+
+    def test_sync_transport_runs_concurrently(self):
+        jobs = self.queue(10)
+        reminder_sink.latency = 0.05
+        start = time.perf_counter()
+        asyncio.run(send_all([(job, {}) for job in jobs], reminder_sink, concurrency=10))
+
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(len(reminder_sink.sent), 10)
@@ -0,0 +1,172 @@
+"""
+Tests for the bucketed habit and daily reading reminder scheduler.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_reminders
+"""
+
+from datetime import datetime, time, timedelta, timezone
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, ReminderJob, ReminderSchedule, ReminderSchedulerState, UserHabit, UserProfile
+from api.utils.reminders import next_occurrence, rebuild_schedules, run_scheduler
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class ReminderTestCase(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.profile = UserProfile.objects.create(user=self.user, time_zone='America/New_York')
+
+    def add_habit(self, at=time(9, 0), **fields):
+        return UserHabit.objects.create(
+            user=self.user, habit='Read', frequency='Daily', purpose='Growth', time=at, **fields
+        )
+
+    def place(self, schedule, next_fire_at):
+        """Pin a schedule's next occurrence (sync computes it from the real clock)"""
+        schedule.next_fire_at = next_fire_at
+        schedule.bucket = next_fire_at.hour * 60 + next_fire_at.minute
+        schedule.save()
+
+
+class TestScheduleIndex(ReminderTestCase):
+    """Schedules should follow their habit or profile into the right bucket"""
+
+    def test_next_occurrence_across_dst(self):
+        # US clocks spring forward on 2026-03-08
+        self.assertEqual(
+            next_occurrence(time(9, 0), 'America/New_York', utc(2026, 3, 6, 20, 0)),
+            utc(2026, 3, 7, 14, 0)
+        )
+        self.assertEqual(
+            next_occurrence(time(9, 0), 'America/New_York', utc(2026, 3, 7, 20, 0)),
+            utc(2026, 3, 8, 13, 0)
+        )
+
+    def test_habit_save_and_skip(self):
+        habit = self.add_habit(at=time(9, 30, 15))
+        schedule = ReminderSchedule.objects.get(habit=habit)
+
+        self.assertEqual(schedule.local_time, time(9, 30))
+        self.assertEqual(schedule.time_zone, 'America/New_York')
+        self.assertEqual(schedule.bucket, schedule.next_fire_at.hour * 60 + schedule.next_fire_at.minute)
+        self.assertLess(schedule.jitter_seconds, 300)
+
+        habit.skipped = True
+        habit.save()
+        self.assertFalse(ReminderSchedule.objects.exists())
+
+    def test_profile_daily_reminder_and_time_zone_change(self):
+        habit = self.add_habit()
+        self.profile.notif_hour = 20
+        self.profile.save()
+        daily = ReminderSchedule.objects.get(kind=ReminderSchedule.Kind.DAILY)
+        self.assertEqual(daily.local_time, time(20, 0))
+
+        self.profile.time_zone = 'Asia/Tokyo'
+        self.profile.save()
+        self.assertEqual(
+            set(ReminderSchedule.objects.values_list('time_zone', flat=True)), {'Asia/Tokyo'}
+        )
+        # 09:00 in Tokyo is always 00:00 UTC
+        self.assertEqual(ReminderSchedule.objects.get(habit=habit).bucket, 0)
+
+        self.profile.notif_hour = None
+        self.profile.save()
+        self.assertEqual(ReminderSchedule.objects.count(), 1)
+
+    def test_rebuild(self):
+        self.add_habit()
+        ReminderSchedule.objects.all().delete()
+        self.assertEqual(rebuild_schedules(), 1)
+        self.assertEqual(ReminderSchedule.objects.count(), 1)
+
+    def test_profile_rejects_unknown_time_zone(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        for name in ('Mars/Olympus_Mons', 'right/UTC', 'posixrules', 'localtime'):
+            response = client.patch('/api/profile/', {'notif_hour': 8, 'time_zone': name}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(UserProfile.objects.get(user=self.user).time_zone, 'America/New_York')
+
+
+class TestScheduler(ReminderTestCase):
+    """Each run should read only the due buckets and queue jobs once"""
+
+    def setUp(self):
+        super().setUp()
+        self.habit = self.add_habit()
+        self.schedule = ReminderSchedule.objects.get(habit=self.habit)
+        # 09:00 in New York on 2026-03-07 (EST) is 14:00 UTC
+        self.place(self.schedule, utc(2026, 3, 7, 14, 0))
+
+    def test_dispatches_due_bucket_with_jitter(self):
+        result = run_scheduler(now=utc(2026, 3, 7, 14, 0, 5))
+
+        self.assertEqual(result['dispatched'], 1)
+        self.assertEqual(result['lag_seconds'], 5)
+        job = ReminderJob.objects.get()
+        self.assertEqual(job.scheduled_for, utc(2026, 3, 7, 14, 0))
+        self.assertEqual(job.due_at, job.scheduled_for + timedelta(seconds=self.schedule.jitter_seconds))
+        self.assertEqual(job.status, ReminderJob.Status.PENDING)
+
+    def test_advances_to_next_local_occurrence(self):
+        run_scheduler(now=utc(2026, 3, 7, 14, 0, 5))
+        self.schedule.refresh_from_db()
+
+        # DST started overnight, so 09:00 local is now 13:00 UTC
+        self.assertEqual(self.schedule.next_fire_at, utc(2026, 3, 8, 13, 0))
+        self.assertEqual(self.schedule.bucket, 13 * 60)
+
+    def test_other_buckets_and_future_occurrences_wait(self):
+        self.assertEqual(run_scheduler(now=utc(2026, 3, 7, 13, 59, 30))['dispatched'], 0)
+        # Same bucket, but the occurrence is tomorrow
+        self.place(self.schedule, utc(2026, 3, 8, 14, 0))
+        self.assertEqual(run_scheduler(now=utc(2026, 3, 7, 14, 0, 5))['dispatched'], 0)
+
+    def test_catches_up_missed_minutes_once(self):
+        ReminderSchedulerState.objects.create(name='reminders', processed_through=utc(2026, 3, 7, 13, 50))
+        result = run_scheduler(now=utc(2026, 3, 7, 14, 3, 10))
+
+        self.assertEqual(result['minutes'], 13)
+        self.assertEqual(result['dispatched'], 1)
+        self.assertEqual(result['lag_seconds'], 12 * 60 + 10)
+
+        # Replaying the minute (e.g. a restored state row) queues nothing new
+        ReminderSchedulerState.objects.update(processed_through=utc(2026, 3, 7, 13, 59))
+        self.place(self.schedule, utc(2026, 3, 7, 14, 0))
+        run_scheduler(now=utc(2026, 3, 7, 14, 0, 30))
+        self.assertEqual(ReminderJob.objects.count(), 1)
+
+    @override_settings(REMINDERS={'JITTER_SECONDS': 300, 'MAX_CATCHUP_MINUTES': 10})
+    def test_skips_minutes_beyond_catchup(self):
+        ReminderSchedulerState.objects.create(name='reminders', processed_through=utc(2026, 3, 7, 13, 0))
+        result = run_scheduler(now=utc(2026, 3, 7, 14, 30))
+
+        self.assertEqual(result['skipped_minutes'], 80)
+        self.assertEqual(result['minutes'], 10)
+        self.assertEqual(result['dispatched'], 0)
+        self.assertEqual(ReminderSchedulerState.objects.get().skipped_minutes, 80)
+
+    def test_failing_minute_does_not_block_the_others(self):
+        # A zone Postgres doesn't know, saved before validation caught it
+        other = CustomUser.objects.create_user(email='other@example.com', password='testpass123')
+        poisoned = ReminderSchedule.objects.create(
+            user=other, kind=ReminderSchedule.Kind.DAILY, local_time=time(8, 0), time_zone='right/UTC',
+            next_fire_at=utc(2026, 3, 7, 13, 59), bucket=13 * 60 + 59, jitter_seconds=0
+        )
+        ReminderSchedulerState.objects.create(name='reminders', processed_through=utc(2026, 3, 7, 13, 58))
+
+        with self.assertLogs('api.utils.reminders', level='ERROR'):
+            result = run_scheduler(now=utc(2026, 3, 7, 14, 0, 5))
+        self.assertEqual(result['dispatched'], 1)
+        self.assertEqual(ReminderJob.objects.get().schedule_id, self.schedule.id)
+        self.assertFalse(ReminderJob.objects.filter(schedule=poisoned).exists())
+        self.assertEqual(ReminderSchedulerState.objects.get().processed_through, utc(2026, 3, 7, 14, 0))
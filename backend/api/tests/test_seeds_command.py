@@ -8,9 +8,12 @@ from django.test import TestCase
 from django.core.management import call_command
 from unittest.mock import patch, Mock
 from io import StringIO
+import json
+import os
 import requests
+import tempfile
 
-from api.models import Translation, Book, Verse
+from api.models import ImportRun, Translation, Book, Verse
 
 
 class TestSeedsCommand(TestCase):
@@ -76,6 +79,7 @@ class TestSeedsCommand(TestCase):
         self.assertEqual(genesis.testament, 'OT')
 
         self.assertEqual(Verse.objects.count(), 3)  # 2 Genesis + 1 Exodus
+        self.assertEqual(Verse.objects.get(book=genesis, verse_num=2).ref, 1001002)
 
         # Verify output
         output = out.getvalue()
@@ -226,6 +230,36 @@ class TestSeedsCommand(TestCase):
         verse = Verse.objects.first()
         self.assertEqual(verse.text_len, len(verse.text))
 
+    @patch('api.utils.fetch_bible_data.requests.get')
+    @patch('builtins.input')
+    def test_csv_format_import(self, mock_input, mock_get):
+        """Should import from the CSV export when --format csv is passed"""
+        mock_input.return_value = 'TEST'
+
+        mock_response = Mock()
+        mock_response.text = (
+            "Book,Chapter,Verse,Text\n"
+            "Genesis,1,1,In the beginning.\n"
+            "Genesis,1,2,\"And the earth was without form, and void.\"\n"
+            "Exodus,1,1,Now these are the names.\n"
+        )
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+
+        out = StringIO()
+        call_command('seeds', '--format', 'csv', stdout=out)
+
+        expected_url = "https://raw.githubusercontent.com/scrollmapper/bible_databases/refs/heads/master/formats/csv/TEST.csv"
+        mock_get.assert_called_once_with(expected_url, timeout=30, stream=False)
+
+        self.assertEqual(Translation.objects.get().code, 'TEST')
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(
+            Verse.objects.get(book__name='Genesis', verse_num=2).text,
+            'And the earth was without form, and void.'
+        )
+        self.assertIn('Verses imported: 3', out.getvalue())
+
 
 class TestSeedsCommandModelCompatibility(TestCase):
     """
@@ -285,3 +319,89 @@ class TestSeedsCommandModelCompatibility(TestCase):
         self.assertTrue(hasattr(verse, 'text'))
         self.assertTrue(hasattr(verse, 'text_len'))
         self.assertTrue(hasattr(verse, 'tokens_json'))
+
+
+class TestSeedsCommandTelemetry(TestCase):
+    """Tests for structured import telemetry"""
+
+    def setUp(self):
+        self.bible_json = {
+            "translation": "TEST: Test Bible Translation",
+            "books": [
+                {
+                    "name": "Genesis",
+                    "chapters": [
+                        {"chapter": 1, "verses": [{"verse": 1, "text": "In the beginning."}]}
+                    ]
+                }
+            ]
+        }
+
+    @patch('api.utils.fetch_bible_data.requests.get')
+    @patch('builtins.input')
+    def test_successful_import_records_run(self, mock_input, mock_get):
+        """Should persist an ImportRun with per-stage metrics"""
+        mock_input.return_value = '1'
+        mock_response = Mock()
+        mock_response.json.return_value = self.bible_json
+        mock_response.content = json.dumps(self.bible_json).encode()
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+
+        fd, telemetry_path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        out = StringIO()
+        try:
+            call_command('seeds', '--telemetry-file', telemetry_path, stdout=out)
+            with open(telemetry_path) as f:
+                lines = [json.loads(line) for line in f]
+        finally:
+            os.remove(telemetry_path)
+
+        run = ImportRun.objects.get()
+        self.assertEqual(run.status, ImportRun.Status.SUCCESS)
+        self.assertEqual(run.translation_code, 'TEST')
+        self.assertEqual(run.verses_imported, 1)
+        self.assertEqual(run.download_bytes, len(mock_response.content))
+        self.assertIsNotNone(run.peak_rss_kb)
+        for stage in ('download', 'parse', 'transform', 'write', 'index'):
+            self.assertIn(stage, run.stages)
+        self.assertEqual(run.stages['write']['rows'], 1)
+        self.assertIn('bytes_per_sec', run.stages['download'])
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]['event'], 'import_run')
+        self.assertEqual(lines[0]['stages'], run.stages)
+        # The same line is printed, file or not
+        self.assertIn(json.dumps(lines[0]), out.getvalue().splitlines())
+
+    @patch('api.utils.fetch_bible_data.requests.get')
+    @patch('builtins.input')
+    def test_bad_telemetry_file_records_run_once(self, mock_input, mock_get):
+        """Should keep the one successful ImportRun when the telemetry file can't be written"""
+        mock_input.return_value = '1'
+        mock_response = Mock()
+        mock_response.json.return_value = self.bible_json
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+
+        out = StringIO()
+        call_command('seeds', '--telemetry-file', '/nonexistent/dir/telemetry.jsonl', stdout=out)
+
+        self.assertEqual(ImportRun.objects.get().status, ImportRun.Status.SUCCESS)
+        self.assertIn('Could not write telemetry', out.getvalue())
+        self.assertIn('Import Complete!', out.getvalue())
+
+    @patch('api.utils.fetch_bible_data.requests.get')
+    @patch('builtins.input')
+    def test_failed_import_records_error(self, mock_input, mock_get):
+        """Should persist a failed ImportRun when the download fails"""
+        mock_input.return_value = '1'
+        mock_get.side_effect = requests.RequestException("Network error")
+
+        call_command('seeds', stdout=StringIO())
+
+        run = ImportRun.objects.get()
+        self.assertEqual(run.status, ImportRun.Status.FAILED)
+        self.assertEqual(run.translation_code, 'KJV')
+        self.assertIn('Network error', run.error)
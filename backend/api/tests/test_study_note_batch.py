@@ -0,0 +1,177 @@
+"""
+Tests for the batched offline study note sync endpoint.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_study_note_batch
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Book, CustomUser, StudyNote, StudyNoteTombstone, Translation, UserActivity, Verse
+from api.utils.activity import record_activity
+from api.utils.study_notes import NoteOperation, apply_note_batch
+
+
+class StudyNoteBatchTestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        book = Book.objects.create(id=43, name='John', short_name='John', canon_order=43, testament='NT', chapter_count=21)
+        self.verse = Verse.objects.create(
+            translation=translation, book=book, chapter=3, verse_num=16, text='For God so loved', text_len=16
+        )
+        self.now = timezone.now()
+
+    def ago(self, minutes):
+        return (self.now - timedelta(minutes=minutes)).isoformat()
+
+    def sync(self, *operations):
+        response = self.client.post('/api/study-notes/batch/', {'operations': list(operations)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['results']
+
+    def statuses(self, results):
+        return [result['status'] for result in results]
+
+
+class TestBatchApply(StudyNoteBatchTestCase):
+
+    def test_creates_with_client_ids(self):
+        first, second = uuid.uuid4(), uuid.uuid4()
+        results = self.sync(
+            {'id': str(first), 'content': 'Grace', 'updated_at': self.ago(10)},
+            {'id': str(second), 'content': 'Love', 'verse_ref': 43003016, 'translation': 'KJV'},
+        )
+
+        self.assertEqual(self.statuses(results), ['created', 'created'])
+        self.assertEqual(results[1]['note']['verse'], self.verse.id)
+        self.assertEqual(results[1]['note']['verse_ref'], 43003016)
+        self.assertEqual(StudyNote.objects.get(id=first).synced_at.isoformat(), self.ago(10))
+        self.assertEqual(UserActivity.objects.get(user=self.user).notes_count, 2)
+
+    def test_offline_notes_count_on_the_days_they_were_written(self):
+        record_activity(self.user.pk, self.now - timedelta(days=4), notes=1)
+        self.sync(*[
+            {'id': str(uuid.uuid4()), 'content': f'Day {days}', 'created_at': (self.now - timedelta(days=days)).isoformat()}
+            for days in (1, 3, 2, 3)
+        ])
+
+        activity = UserActivity.objects.get(user=self.user)
+        self.assertEqual(activity.notes_count, 5)
+        self.assertEqual(activity.current_streak, 4)
+        self.assertEqual(activity.last_active_day, (self.now - timedelta(days=1)).date())
+
+    def test_last_write_wins(self):
+        note = StudyNote.objects.create(user=self.user, content='Server', synced_at=self.now - timedelta(minutes=5))
+
+        stale = self.sync({'id': str(note.id), 'content': 'Older', 'updated_at': self.ago(10)})
+        self.assertEqual(self.statuses(stale), ['stale'])
+        self.assertEqual(stale[0]['note']['content'], 'Server')
+
+        newer = self.sync({'id': str(note.id), 'content': 'Newer', 'updated_at': self.ago(1)})
+        self.assertEqual(self.statuses(newer), ['updated'])
+        note.refresh_from_db()
+        self.assertEqual(note.content, 'Newer')
+
+    def test_deletes_leave_tombstones(self):
+        note = StudyNote.objects.create(user=self.user, content='Grace', synced_at=self.now - timedelta(minutes=5))
+
+        self.assertEqual(self.statuses(self.sync({'id': str(note.id), 'op': 'delete', 'updated_at': self.ago(10)})), ['stale'])
+        self.assertEqual(self.statuses(self.sync({'id': str(note.id), 'op': 'delete'})), ['deleted'])
+        self.assertFalse(StudyNote.objects.filter(id=note.id).exists())
+        self.assertTrue(StudyNoteTombstone.objects.filter(id=note.id, user=self.user).exists())
+
+        # An edit made offline before the deletion doesn't bring the note back
+        revived = self.sync({'id': str(note.id), 'content': 'Grace', 'updated_at': self.ago(1)})
+        self.assertEqual(self.statuses(revived), ['stale'])
+        self.assertFalse(StudyNote.objects.filter(id=note.id).exists())
+
+    def test_latest_change_in_batch_wins(self):
+        note_id = str(uuid.uuid4())
+        results = self.sync(
+            {'id': note_id, 'content': 'First', 'updated_at': self.ago(3)},
+            {'id': note_id, 'content': 'Third', 'updated_at': self.ago(1)},
+            {'id': note_id, 'content': 'Second', 'updated_at': self.ago(2)},
+        )
+
+        self.assertEqual(self.statuses(results), ['superseded', 'created', 'superseded'])
+        self.assertEqual(StudyNote.objects.get(id=note_id).content, 'Third')
+
+    def test_conflicts_and_unknown_verses(self):
+        other = CustomUser.objects.create_user(email='other@example.com', password='testpass123')
+        theirs = StudyNote.objects.create(user=other, content='Not yours')
+
+        results = self.sync(
+            {'id': str(theirs.id), 'content': 'Mine now'},
+            {'id': str(uuid.uuid4()), 'content': 'Grace', 'verse': 999999999},
+        )
+        self.assertEqual(self.statuses(results), ['conflict', 'invalid'])
+        theirs.refresh_from_db()
+        self.assertEqual(theirs.content, 'Not yours')
+
+    def test_other_users_deleted_id(self):
+        other = CustomUser.objects.create_user(email='other@example.com', password='testpass123')
+        note_id = StudyNote.objects.create(user=other, content='Deleted').id
+        StudyNote.objects.get(id=note_id).delete()
+
+        results = self.sync({'id': str(note_id), 'content': 'Mine now'})
+        self.assertEqual(self.statuses(results), ['conflict'])
+        self.assertFalse(StudyNote.objects.filter(id=note_id).exists())
+        self.assertEqual(StudyNoteTombstone.objects.get(id=note_id).user_id, other.pk)
+
+        # A note saved under the id directly leaves the other user's tombstone alone
+        StudyNote.objects.create(id=note_id, user=self.user, content='Mine')
+        self.assertEqual(StudyNoteTombstone.objects.get(id=note_id).user_id, other.pk)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        def run(size):
+            notes = StudyNote.objects.bulk_create([
+                StudyNote(user=self.user, content='Old', synced_at=self.now - timedelta(hours=1)) for _ in range(size)
+            ])
+            operations = (
+                [NoteOperation(uuid.uuid4(), 'upsert', content='New', verse_id=self.verse.id) for _ in range(size)]
+                + [NoteOperation(note.id, 'upsert', content='Edited') for note in notes[:size // 2]]
+                + [NoteOperation(note.id, 'delete') for note in notes[size // 2:]]
+            )
+            with CaptureQueriesContext(connection) as queries:
+                apply_note_batch(self.user.pk, operations)
+            return len(queries)
+
+        self.assertEqual(run(4), run(40))
+
+
+class TestBatchEndpoint(StudyNoteBatchTestCase):
+
+    def test_validation(self):
+        for body in ({}, {'operations': []}, {'operations': [{'content': 'No id'}]},
+                     {'operations': [{'id': str(uuid.uuid4()), 'op': 'rename'}]},
+                     {'operations': [{'id': str(uuid.uuid4()), 'content': ''}]},
+                     {'operations': [{'id': str(uuid.uuid4()), 'content': 'x', 'updated_at': 'yesterday'}]}):
+            response = self.client.post('/api/study-notes/batch/', body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(STUDY_NOTES={'MAX_BATCH': 1}):
+            response = self.client.post('/api/study-notes/batch/', {'operations': [
+                {'id': str(uuid.uuid4()), 'content': 'x'}, {'id': str(uuid.uuid4()), 'content': 'y'},
+            ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_changes_reach_delta_sync(self):
+        note_id = str(uuid.uuid4())
+        self.sync({'id': note_id, 'content': 'Grace'})
+        self.sync({'id': note_id, 'op': 'delete'})
+
+        changes = self.client.get('/api/study-notes/changes/').json()
+        self.assertEqual(changes['notes'], [])
+        self.assertEqual([item['id'] for item in changes['deleted']], [note_id])
@@ -0,0 +1,99 @@
+"""
+Tests for keyset-paginated study note listing.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_study_note_pages
+"""
+
+import re
+import uuid
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Book, CustomUser, StudyNote, Translation, Verse
+from api.utils.study_notes import NoteOperation, apply_note_batch, list_notes
+
+
+class TestStudyNotePages(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        self.john = Book.objects.create(id=43, name='John', short_name='John', canon_order=43, testament='NT', chapter_count=21)
+        self.romans = Book.objects.create(id=45, name='Romans', short_name='Rom', canon_order=45, testament='NT', chapter_count=16)
+        self.john_3_16 = Verse.objects.create(
+            translation=translation, book=self.john, chapter=3, verse_num=16, text='For God so loved', text_len=16
+        )
+        self.romans_8_28 = Verse.objects.create(
+            translation=translation, book=self.romans, chapter=8, verse_num=28, text='All things', text_len=10
+        )
+
+    def note(self, content, verse=None):
+        return StudyNote.objects.create(user=self.user, content=content, verse=verse)
+
+    def pages(self, **params):
+        """Follow the Link headers, returning each page's note ids"""
+        pages, url = [], '/api/study-notes/'
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([note['id'] for note in response.json()])
+            link = re.match(r'<http://testserver(.*)>; rel="next"', response.get('Link', ''))
+            url, params = (link.group(1), None) if link else (None, None)
+        return pages
+
+    def test_pages_are_newest_first_and_complete(self):
+        notes = [self.note(f'Note {i}') for i in range(5)]
+
+        pages = self.pages(limit=2)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), [str(note.id) for note in reversed(notes)])
+
+    def test_order_is_stable_for_equal_timestamps(self):
+        for i in range(5):
+            self.note(f'Note {i}')
+        StudyNote.objects.update(updated_at=timezone.now())
+
+        ids = sum(self.pages(limit=2), [])
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_filters_by_verse_and_book(self):
+        on_john = self.note('John', self.john_3_16)
+        on_romans = self.note('Romans', self.romans_8_28)
+        self.note('General')
+
+        self.assertEqual(self.pages(verse=self.john_3_16.id), [[str(on_john.id)]])
+        self.assertEqual(self.pages(book=self.romans.id), [[str(on_romans.id)]])
+
+    def test_book_follows_verse(self):
+        note = self.note('John', self.john_3_16)
+        self.assertEqual(note.book_id, self.john.id)
+
+        note.verse = None
+        note.save()
+        self.assertIsNone(note.book_id)
+
+        apply_note_batch(self.user.pk, [NoteOperation(note.id, 'upsert', content='Romans', verse_id=self.romans_8_28.id)])
+        apply_note_batch(self.user.pk, [NoteOperation(uuid.uuid4(), 'upsert', content='Also Romans', verse_id=self.romans_8_28.id)])
+        self.assertEqual(StudyNote.objects.filter(book=self.romans).count(), 2)
+
+    def test_deep_pages_cost_the_same(self):
+        for i in range(30):
+            self.note(f'Note {i}')
+        first, cursor = list_notes(self.user.pk, limit=5)
+
+        for _ in range(4):
+            with self.assertNumQueries(1):
+                page, cursor = list_notes(self.user.pk, cursor, limit=5)
+            self.assertEqual(len(page), 5)
+
+    def test_bad_parameters(self):
+        for params in ({'cursor': 'nonsense'}, {'limit': '0'}, {'verse': 'john'}, {'book': '-1'}):
+            response = self.client.get('/api/study-notes/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
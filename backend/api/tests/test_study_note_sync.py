@@ -0,0 +1,134 @@
+"""
+Tests for the cursor-based study note delta sync and its tombstones.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_study_note_sync
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, StudyNote, StudyNoteTombstone
+from api.utils.study_notes import encode_cursor, note_changes, prune_tombstones
+
+SYNC_SETTINGS = {**settings.STUDY_NOTES, 'SETTLE_SECONDS': 0}
+
+
+@override_settings(STUDY_NOTES=SYNC_SETTINGS)
+class TestNoteChanges(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+    def note(self, content):
+        return StudyNote.objects.create(user=self.user, content=content)
+
+    def sync(self, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get('/api/study-notes/changes/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_first_sync_returns_everything(self):
+        first, second = self.note('Grace'), self.note('Faith')
+
+        changes = self.sync()
+        self.assertEqual([note['id'] for note in changes['notes']], [str(first.id), str(second.id)])
+        self.assertEqual(changes['deleted'], [])
+        self.assertFalse(changes['has_more'])
+
+    def test_only_changes_since_cursor(self):
+        kept, edited, deleted = self.note('Grace'), self.note('Faith'), self.note('Hope')
+        cursor = self.sync()['cursor']
+
+        edited.content = 'Faith, edited'
+        edited.save()
+        deleted_id = deleted.id
+        deleted.delete()
+        created = self.note('Love')
+
+        changes = self.sync(cursor)
+        self.assertEqual([note['id'] for note in changes['notes']], [str(edited.id), str(created.id)])
+        self.assertEqual([item['id'] for item in changes['deleted']], [str(deleted_id)])
+        self.assertNotIn(str(kept.id), [note['id'] for note in changes['notes']])
+
+        self.assertEqual(self.sync(changes['cursor']), {
+            'notes': [], 'deleted': [], 'cursor': changes['cursor'], 'has_more': False,
+        })
+
+    def test_pages_follow_the_cursor(self):
+        notes = [self.note(f'Note {i}') for i in range(5)]
+        expected = sorted(str(note.id) for note in notes)
+        notes[0].delete()
+
+        seen, cursor = [], None
+        while True:
+            changes = self.sync(cursor, limit=2)
+            seen += [note['id'] for note in changes['notes']] + [item['id'] for item in changes['deleted']]
+            cursor = changes['cursor']
+            if not changes['has_more']:
+                break
+
+        self.assertEqual(sorted(seen), expected)
+
+    def test_sync_queries_do_not_grow_with_history(self):
+        for i in range(20):
+            self.note(f'Note {i}')
+        cursor = self.sync()['cursor']
+        self.note('New')
+
+        with self.assertNumQueries(2):
+            changes = note_changes(self.user.pk, cursor)
+        self.assertEqual(len(changes['notes']), 1)
+
+    def test_caught_up_cursor_is_held_back(self):
+        """Notes committing late behind the cursor must not be skipped"""
+        with override_settings(STUDY_NOTES={**SYNC_SETTINGS, 'SETTLE_SECONDS': 60}):
+            self.note('Grace')
+            cursor = self.sync()['cursor']
+            self.assertEqual(len(self.sync(cursor)['notes']), 1)
+
+    def test_recreated_note_clears_tombstone(self):
+        note = self.note('Grace')
+        note_id = note.id
+        note.delete()
+        StudyNote.objects.create(id=note_id, user=self.user, content='Grace again')
+
+        self.assertFalse(StudyNoteTombstone.objects.filter(id=note_id).exists())
+
+    def test_deleting_user_leaves_no_tombstones(self):
+        self.note('Grace')
+        self.user.delete()
+        self.assertEqual(StudyNoteTombstone.objects.count(), 0)
+
+    def test_bad_and_expired_cursors(self):
+        self.assertEqual(
+            self.client.get('/api/study-notes/changes/', {'cursor': 'nonsense'}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.client.get('/api/study-notes/changes/', {'limit': 'many'}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        old = encode_cursor(timezone.now() - timedelta(days=91), StudyNote().id)
+        self.assertEqual(
+            self.client.get('/api/study-notes/changes/', {'cursor': old}).status_code,
+            status.HTTP_410_GONE,
+        )
+
+    def test_prune_tombstones(self):
+        self.note('Grace').delete()
+        self.note('Faith').delete()
+        StudyNoteTombstone.objects.filter(
+            id=StudyNoteTombstone.objects.order_by('deleted_at').first().id
+        ).update(deleted_at=timezone.now() - timedelta(days=91))
+
+        self.assertEqual(prune_tombstones(), 1)
+        self.assertEqual(StudyNoteTombstone.objects.count(), 1)
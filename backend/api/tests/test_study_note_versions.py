@@ -0,0 +1,171 @@
+"""
+Tests for study note row versions, conditional edits and content patches.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_study_note_versions
+"""
+
+import unittest
+import uuid
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Book, CustomUser, StudyNote, Translation, Verse
+from api.utils.study_notes import (
+    NoteVersionConflict, apply_content_patch, apply_note_batch, NoteOperation, parse_content_patch, update_note
+)
+
+
+class TestContentPatch(unittest.TestCase):
+
+    def test_splices_apply_in_order(self):
+        patch = parse_content_patch([
+            {'at': 0, 'delete': 3, 'insert': 'A'},
+            {'at': 8, 'insert': ' indeed'},
+            {'at': 1, 'delete': 0, 'insert': ''},
+        ])
+        self.assertEqual(len(patch), 2)
+        self.assertEqual(apply_content_patch('For God so loved', patch), 'A God so indeed loved')
+        self.assertEqual(apply_content_patch('Peace 🕊 be', parse_content_patch([{'at': 6, 'delete': 1}])), 'Peace  be')
+
+    def test_malformed_patches(self):
+        for patch in ([], {'at': 0}, ['x'], [{'insert': 'x'}], [{'at': -1}], [{'at': 0, 'delete': '2'}],
+                      [{'at': 0, 'insert': 5}], [{'at': True, 'insert': 'x'}]):
+            with self.assertRaises(ValueError):
+                parse_content_patch(patch)
+        with self.assertRaises(ValueError):
+            apply_content_patch('short', [(3, 5, '')])
+
+
+class StudyNoteVersionTestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        translation = Translation.objects.create(code='KJV', name='King James Version', license='Public Domain')
+        book = Book.objects.create(id=43, name='John', short_name='John', canon_order=43, testament='NT', chapter_count=21)
+        self.verse = Verse.objects.create(
+            translation=translation, book=book, chapter=3, verse_num=16, text='For God so loved', text_len=16
+        )
+        self.note = StudyNote.objects.create(user=self.user, content='For God so loved the world')
+
+
+class TestUpdateNote(StudyNoteVersionTestCase):
+
+    def test_every_write_path_bumps_the_version(self):
+        self.assertEqual(self.note.version, 1)
+        self.note.content = 'Edited'
+        self.note.save()
+        self.assertEqual(StudyNote.objects.get(id=self.note.id).version, 2)
+
+        update_note(self.user.pk, self.note.id, 2, content='Edited again')
+        apply_note_batch(self.user.pk, [NoteOperation(self.note.id, 'upsert', content='Synced')])
+        self.assertEqual(StudyNote.objects.get(id=self.note.id).version, 4)
+
+    def test_patch_in_one_statement(self):
+        patch = parse_content_patch([{'at': 4, 'delete': 3, 'insert': 'the LORD'}, {'at': 31, 'insert': '!'}])
+        with self.assertNumQueries(2):
+            note = update_note(self.user.pk, self.note.id, 1, content_patch=patch, verse=self.verse)
+
+        self.assertEqual(note.content, 'For the LORD so loved the world!')
+        self.assertEqual(note.content, apply_content_patch('For God so loved the world', patch))
+        self.assertEqual((note.version, note.verse_id, note.book_id), (2, self.verse.id, 43))
+        self.assertIsNotNone(note.synced_at)
+
+    def test_stale_version_conflicts(self):
+        update_note(self.user.pk, self.note.id, 1, content='First device')
+
+        with self.assertRaises(NoteVersionConflict) as raised:
+            update_note(self.user.pk, self.note.id, 1, content='Second device')
+        self.assertEqual(raised.exception.note.content, 'First device')
+        self.assertEqual(raised.exception.note.version, 2)
+
+    def test_patch_past_the_end(self):
+        with self.assertRaises(ValueError):
+            update_note(self.user.pk, self.note.id, 1, content_patch=[(20, 10, '')])
+        # The length check allows for earlier splices growing the text
+        note = update_note(self.user.pk, self.note.id, 1, content_patch=[(0, 0, 'Yes, '), (26, 5, 'all')])
+        self.assertEqual(note.content, 'Yes, For God so loved the all')
+
+    def test_other_users_note(self):
+        other = CustomUser.objects.create_user(email='other@example.com', password='testpass123')
+        with self.assertRaises(StudyNote.DoesNotExist):
+            update_note(other.pk, self.note.id, 1, content='Mine now')
+        self.assertEqual(StudyNote.objects.get(id=self.note.id).version, 1)
+
+
+class TestBatchVersions(StudyNoteVersionTestCase):
+
+    def test_versioned_operations(self):
+        other = StudyNote.objects.create(user=self.user, content='Hope', verse=self.verse)
+        results = apply_note_batch(self.user.pk, [
+            NoteOperation(self.note.id, 'upsert', content_patch=[(0, 3, 'And')], version=1),
+            NoteOperation(other.id, 'upsert', content_patch=[(4, 0, '!')], version=5),
+            NoteOperation(uuid.uuid4(), 'delete', version=1),
+        ])
+
+        self.assertEqual([result['status'] for result in results], ['updated', 'stale', 'stale'])
+        self.assertEqual((results[0]['note'].content, results[0]['note'].version), ('And God so loved the world', 2))
+        self.assertEqual(results[1]['note'].content, 'Hope')
+
+    def test_patch_keeps_verse(self):
+        other = StudyNote.objects.create(user=self.user, content='Hope', verse=self.verse, verse_reference='John 3:16')
+        [result] = apply_note_batch(self.user.pk, [NoteOperation(other.id, 'upsert', content_patch=[(4, 0, '!')], version=1)])
+
+        self.assertEqual(result['note'].content, 'Hope!')
+        self.assertEqual((result['note'].verse_id, result['note'].verse_reference), (self.verse.id, 'John 3:16'))
+
+    def test_version_is_checked_before_timestamps(self):
+        self.note.content = 'Changed on the server'
+        self.note.save()
+
+        [result] = apply_note_batch(self.user.pk, [NoteOperation(self.note.id, 'delete', version=1)])
+        self.assertEqual(result['status'], 'stale')
+        [result] = apply_note_batch(self.user.pk, [NoteOperation(self.note.id, 'delete', version=2)])
+        self.assertEqual(result['status'], 'deleted')
+
+    def test_from_data(self):
+        op = NoteOperation.from_data({'id': str(self.note.id), 'version': 1, 'content_patch': [{'at': 0, 'insert': 'x'}]})
+        self.assertEqual((op.version, op.content_patch), (1, [(0, 0, 'x')]))
+
+        for data in ({'content_patch': [{'at': 0, 'insert': 'x'}]}, {'content': 'x', 'version': 0},
+                     {'content': 'x', 'version': '2'}):
+            with self.assertRaises(ValueError):
+                NoteOperation.from_data({'id': str(self.note.id), **data})
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class TestPatchEndpoint(StudyNoteVersionTestCase):
+
+    def patch(self, data, note_id=None):
+        return self.client.patch(f'/api/study-notes/{note_id or self.note.id}/', data, format='json')
+
+    def test_patch_and_conflict(self):
+        response = self.patch({'version': 1, 'content_patch': [{'at': 26, 'insert': ' (John 3:16)'}],
+                               'verse_ref': 43003016, 'translation': 'KJV'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['content'], 'For God so loved the world (John 3:16)')
+        self.assertEqual((response.json()['version'], response.json()['verse_ref']), (2, 43003016))
+
+        response = self.patch({'version': 1, 'content': 'Offline edit'})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.json()['note']['version'], 2)
+        self.assertEqual(StudyNote.objects.get(id=self.note.id).content, 'For God so loved the world (John 3:16)')
+
+    def test_listings_carry_the_version(self):
+        self.assertEqual(self.client.get('/api/study-notes/').json()[0]['version'], 1)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.patch({'content': 'No version'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.patch({'version': 1, 'content': 'x', 'content_patch': [{'at': 0, 'insert': 'y'}]}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.patch({'version': 1, 'content_patch': [{'at': 100, 'delete': 1}]}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(self.patch({'version': 1, 'content': 'x'}, uuid.uuid4()).status_code, status.HTTP_404_NOT_FOUND)
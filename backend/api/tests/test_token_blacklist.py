@@ -0,0 +1,75 @@
+"""
+Tests for token blacklist pruning.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_token_blacklist
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import CustomUser
+from api.utils.token_blacklist import blacklist_table_stats, prune_expired_tokens
+
+
+class TestPruneTokenBlacklist(TestCase):
+    """Expired tokens should be removed in batches; live ones kept"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        now = timezone.now()
+        for i in range(5):
+            token = OutstandingToken.objects.create(
+                user=self.user, jti=f'expired-{i}', token='x',
+                created_at=now - timedelta(days=8), expires_at=now - timedelta(days=1)
+            )
+            BlacklistedToken.objects.create(token=token)
+        self.live = RefreshToken.for_user(self.user)
+        self.live.blacklist()
+
+    def test_prune_in_batches(self):
+        """Each call deletes at most batch_size tokens and their blacklist rows"""
+        self.assertEqual(prune_expired_tokens(batch_size=2), (2, 2))
+        self.assertEqual(OutstandingToken.objects.count(), 4)
+
+    def test_command_removes_only_expired(self):
+        """The command should loop until only unexpired tokens remain"""
+        out = StringIO()
+        call_command('prune_token_blacklist', batch_size=2, pause=0, stdout=out)
+
+        self.assertIn('Pruned 5 outstanding and 5 blacklisted tokens', out.getvalue())
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list('jti', flat=True)),
+            [self.live['jti']]
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    def test_table_stats(self):
+        """Metrics should report both tables"""
+        stats = blacklist_table_stats()
+        self.assertIn('token_blacklist_outstandingtoken', stats)
+        self.assertIn('token_blacklist_blacklistedtoken', stats)
+
+
+class TestLogoutBlacklist(TestCase):
+    """Logging out should blacklist the refresh token"""
+
+    def test_logged_out_refresh_token_is_rejected(self):
+        user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        refresh = RefreshToken.for_user(user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.cookies['refresh_token'] = str(refresh)
+
+        client.post('/api/auth/logout/')
+
+        client.cookies['refresh_token'] = str(refresh)
+        response = client.post('/api/auth/refresh/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,178 @@
+"""
+Tests for cached JWT user resolution.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_user_cache
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import CustomUser
+from api.utils.user_cache import INVALIDATION_KEY, SEQUENCE_KEY, UserCache, user_cache
+
+
+def user_queries(queries):
+    return [q for q in queries.captured_queries if 'custom_user' in q['sql']]
+
+
+class TestCachedJWTAuthentication(TestCase):
+    """Authenticated requests should resolve users from the cache"""
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        user_cache.last_seq = None
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_second_request_skips_user_lookup(self):
+        """Only the first request should query custom_user"""
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(user_queries(first)), 1)
+
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'test@example.com')
+        self.assertEqual(user_queries(second), [])
+
+    def test_save_invalidates_cached_user(self):
+        """Deactivating a user should take effect on the next request"""
+        self.client.get('/api/auth/profile/')
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.user.is_active = False
+            self.user.save()
+            # Still cached until the change commits
+            self.assertEqual(user_cache.get(self.user.pk).is_active, True)
+        self.assertEqual(len(callbacks), 1)
+
+        response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_delete_invalidates_cached_user(self):
+        self.client.get('/api/auth/profile/')
+        user_id = self.user.pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertIsNone(user_cache.get(user_id))
+
+    def test_hits_return_independent_instances(self):
+        """Mutating a returned user should not change the cached copy"""
+        user_cache.sync_invalidations()
+        user_cache.set(self.user)
+
+        first = user_cache.get(self.user.pk)
+        first.email = 'changed@example.com'
+
+        self.assertEqual(user_cache.get(self.user.pk).email, 'test@example.com')
+
+    def test_hits_get_their_own_avatar_file(self):
+        self.user.avatar.name = 'avatars/test.png'
+        user_cache.sync_invalidations()
+        user_cache.set(self.user)
+
+        first, second = user_cache.get(self.user.pk), user_cache.get(self.user.pk)
+        self.assertEqual(first.avatar.name, 'avatars/test.png')
+        self.assertIsNot(first.avatar, second.avatar)
+        self.assertIs(second.avatar.instance, second)
+
+
+class TestUserCache(TestCase):
+    """Unit tests for UserCache"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser(email='a@example.com')
+
+    def test_lru_bound(self):
+        """Oldest entries should be evicted beyond max_entries"""
+        users_cache = UserCache(max_entries=2, ttl=60, poll_interval=0)
+        users = [CustomUser(email=f'{i}@example.com') for i in range(3)]
+        for user in users:
+            users_cache.set(user)
+
+        self.assertIsNone(users_cache.get(users[0].pk))
+        self.assertIsNotNone(users_cache.get(users[2].pk))
+        self.assertEqual(users_cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        """Entries should expire after the TTL"""
+        users_cache = UserCache(max_entries=10, ttl=0, poll_interval=0)
+        users_cache.set(self.user)
+
+        self.assertIsNone(users_cache.get(self.user.pk))
+
+    def test_cross_process_invalidation(self):
+        """An invalidation broadcast by one process should reach another"""
+        process_a = UserCache(max_entries=10, ttl=60, poll_interval=0)
+        process_b = UserCache(max_entries=10, ttl=60, poll_interval=0)
+        process_b.sync_invalidations()
+        process_b.set(self.user)
+
+        process_a.invalidate(self.user.pk)
+
+        self.assertIsNone(process_b.get(self.user.pk))
+        self.assertEqual(process_b.stats()['invalidations'], 1)
+
+    def test_invalidation_numbers_are_claimed(self):
+        """A sequence number taken by a racing process should not lose either invalidation"""
+        other = CustomUser(email='b@example.com')
+        process_a = UserCache(max_entries=10, ttl=60, poll_interval=0)
+        process_b = UserCache(max_entries=10, ttl=60, poll_interval=0)
+        process_b.sync_invalidations()
+        process_b.set(self.user)
+        process_b.set(other)
+
+        # Another process read the same sequence value and stored its record first
+        cache.add(SEQUENCE_KEY, 0, timeout=None)
+        cache.set(INVALIDATION_KEY.format(cache.get(SEQUENCE_KEY) + 1), str(other.pk))
+        process_a.invalidate(self.user.pk)
+
+        self.assertEqual(cache.get(SEQUENCE_KEY), 2)
+        self.assertIsNone(process_b.get(self.user.pk))
+        self.assertIsNone(process_b.get(other.pk))
+        self.assertEqual(process_b.stats()['invalidations'], 2)
+
+    def test_hit_rate(self):
+        """Stats should report hits over lookups"""
+        users_cache = UserCache(max_entries=10, ttl=60, poll_interval=0)
+        users_cache.get(self.user.pk)
+        users_cache.set(self.user)
+        users_cache.get(self.user.pk)
+        users_cache.get(self.user.pk)
+
+        stats = users_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertEqual(stats['hit_rate'], round(2 / 3, 4))
+
+
+class TestMetricsEndpoint(TestCase):
+    """GET /api/metrics/ should expose cache metrics to staff only"""
+
+    def test_requires_staff(self):
+        client = APIClient()
+        user = CustomUser.objects.create_user(email='user@example.com', password='testpass123')
+        client.force_authenticate(user=user)
+
+        response = client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reports_user_cache(self):
+        client = APIClient()
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', password='testpass123')
+        client.force_authenticate(user=admin)
+
+        response = client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_rate', response.data['auth_user_cache'])
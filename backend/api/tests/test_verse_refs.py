@@ -0,0 +1,113 @@
+"""
+Tests for stable BBCCCVVV verse references.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_verse_refs
+"""
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Book, CustomUser, StudyNote, Translation, Verse
+from api.utils.reading_history import reading_events
+from api.utils.verse_refs import make_verse_ref, parse_verse_ref
+
+
+class TestVerseRefEncoding(TestCase):
+    """Test make_verse_ref and parse_verse_ref"""
+
+    def test_round_trip(self):
+        """John 3:16 should encode to 43003016 and back"""
+        self.assertEqual(make_verse_ref(43, 3, 16), 43003016)
+        self.assertEqual(parse_verse_ref(43003016), (43, 3, 16))
+
+    def test_out_of_range_parts_raise(self):
+        """Zero or overflowing parts should raise ValueError"""
+        for args in [(0, 1, 1), (1, 0, 1), (1, 1, 0), (1, 1000, 1), (1, 1, 1000)]:
+            with self.assertRaises(ValueError):
+                make_verse_ref(*args)
+
+    def test_parse_rejects_invalid_refs(self):
+        """Refs with a zero chapter or verse should raise ValueError"""
+        for ref in [1000001, 1001000, 0]:
+            with self.assertRaises(ValueError):
+                parse_verse_ref(ref)
+
+
+class TestVerseRefEndpoints(TestCase):
+    """Verse-bearing endpoints should accept and return refs"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        self.translation = Translation.objects.create(code='KJV', name='King James Version')
+        self.book = Book.objects.create(name='John', short_name='Joh', canon_order=43, testament='NT')
+        self.verse = Verse.objects.create(
+            translation=self.translation, book=self.book, chapter=3, verse_num=16,
+            text='For God so loved the world.', text_len=27
+        )
+
+    def tearDown(self):
+        reading_events.flush()
+
+    def test_save_computes_ref(self):
+        """Verse.save should fill ref from the book's canon order"""
+        self.assertEqual(self.verse.ref, 43003016)
+
+    def test_recent_verse_by_ref(self):
+        """POST /recent-verses/ should accept verse_ref with a translation"""
+        response = self.client.post(
+            '/api/recent-verses/',
+            {'verse_ref': 43003016, 'translation': 'KJV'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['verse'], self.verse.id)
+        self.assertEqual(response.data['verse_ref'], 43003016)
+
+    def test_recent_verse_unknown_ref(self):
+        """POST /recent-verses/ should 404 for a ref with no verse"""
+        response = self.client.post(
+            '/api/recent-verses/',
+            {'verse_ref': 43003017, 'translation': 'KJV'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_study_note_by_ref(self):
+        """POST /study-notes/ should resolve verse_ref and return it"""
+        response = self.client.post(
+            '/api/study-notes/',
+            {'verse_ref': 43003016, 'translation': 'KJV', 'content': 'Love'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['verse'], self.verse.id)
+        self.assertEqual(response.data['verse_ref'], 43003016)
+        self.assertEqual(StudyNote.objects.get().verse, self.verse)
+
+    def test_study_note_ref_requires_translation(self):
+        """verse_ref without a translation should be rejected"""
+        response = self.client.post(
+            '/api/study-notes/',
+            {'verse_ref': 43003016, 'content': 'Love'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('translation', response.data)
+
+    def test_study_notes_list_includes_ref(self):
+        """GET /study-notes/ should include verse_ref (null for general notes)"""
+        StudyNote.objects.create(user=self.user, verse=self.verse, content='On a verse')
+        StudyNote.objects.create(user=self.user, content='General')
+
+        response = self.client.get('/api/study-notes/')
+
+        refs = sorted(note['verse_ref'] or 0 for note in response.data)
+        self.assertEqual(refs, [0, 43003016])
@@ -0,0 +1,123 @@
+"""
+Tests for deduplicated verse text storage.
+
+Run with: docker compose exec backend python manage.py test api.tests.test_verse_text_store
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.management.commands.seeds import Command as SeedsCommand
+from api.models import Book, CustomUser, Translation, Verse, VerseText
+from api.utils.transform_bible_import_data import transform_bible_data
+from api.utils.verse_text_store import intern_texts, text_digest
+
+
+def make_bible_json(code, texts):
+    return {
+        "translation": f"{code}: {code} Translation",
+        "books": [
+            {
+                "name": "Genesis",
+                "chapters": [
+                    {
+                        "chapter": 1,
+                        "verses": [
+                            {"verse": i, "text": text} for i, text in enumerate(texts, start=1)
+                        ]
+                    }
+                ]
+            }
+        ]
+    }
+
+
+class TestInternTexts(TestCase):
+    """Test intern_texts function"""
+
+    def test_identical_texts_share_a_row(self):
+        """Duplicate texts should map to one VerseText"""
+        ids = intern_texts(['In the beginning.', 'In the beginning.', 'And the earth.'])
+
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(VerseText.objects.count(), 2)
+
+    def test_reuses_existing_rows(self):
+        """Texts interned earlier should keep their ids"""
+        first = intern_texts(['In the beginning.'])
+        second = intern_texts(['In the beginning.', 'New text.'])
+
+        self.assertEqual(first['In the beginning.'], second['In the beginning.'])
+        self.assertEqual(VerseText.objects.count(), 2)
+
+    def test_digest_is_sha256_of_utf8(self):
+        """Stored digest should match text_digest"""
+        intern_texts(['Selah ✓'])
+        self.assertEqual(bytes(VerseText.objects.get().digest), text_digest('Selah ✓'))
+
+
+class TestDedupImport(TestCase):
+    """Test seeds import with deduplicated text"""
+
+    def import_translation(self, code, texts):
+        seeds = SeedsCommand(stdout=StringIO())
+        return seeds.import_data(transform_bible_data(make_bible_json(code, texts)), dedup_text=True)
+
+    def test_translations_share_identical_texts(self):
+        """Identical verses in two translations should be stored once"""
+        self.import_translation('KJV', ['In the beginning.', 'And the earth.'])
+        self.import_translation('AKJV', ['In the beginning.', 'And the earth was void.'])
+
+        self.assertEqual(Verse.objects.count(), 4)
+        self.assertEqual(VerseText.objects.count(), 3)
+        self.assertFalse(Verse.objects.exclude(text='').exists())
+
+        verse = Verse.objects.select_related('text_ref').get(translation__code='AKJV', verse_num=2)
+        self.assertEqual(verse.resolved_text, 'And the earth was void.')
+        self.assertEqual(verse.text_len, len('And the earth was void.'))
+
+    def test_dedup_command_round_trip(self):
+        """dedup_verse_texts should convert inline rows and --reverse should restore them"""
+        seeds = SeedsCommand(stdout=StringIO())
+        seeds.import_data(
+            transform_bible_data(make_bible_json('KJV', ['Same.', 'Same.', 'Other.'])),
+            dedup_text=False
+        )
+
+        call_command('dedup_verse_texts', stdout=StringIO())
+        self.assertEqual(VerseText.objects.count(), 2)
+        self.assertFalse(Verse.objects.filter(text_ref__isnull=True).exists())
+
+        call_command('dedup_verse_texts', '--reverse', stdout=StringIO())
+        self.assertEqual(VerseText.objects.count(), 0)
+        self.assertEqual(
+            list(Verse.objects.order_by('verse_num').values_list('text', flat=True)),
+            ['Same.', 'Same.', 'Other.']
+        )
+
+
+class TestDedupVersesEndpoint(TestCase):
+    """Verses endpoint should return deduplicated text transparently"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        translation = Translation.objects.create(code='KJV', name='King James Version')
+        self.book = Book.objects.create(name='Genesis', short_name='Gen', canon_order=1, testament='OT')
+        text_id = intern_texts(['In the beginning.'])['In the beginning.']
+        Verse.objects.create(
+            translation=translation, book=self.book, chapter=1, verse_num=1,
+            text='', text_ref_id=text_id, text_len=17
+        )
+
+    def test_returns_shared_text(self):
+        response = self.client.get('/api/verses/', {'translation': 'KJV', 'book': self.book.id, 'chapter': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['verses'][0]['text'], 'In the beginning.')
@@ -368,6 +368,37 @@ class VersesEndpointTest(TestCase):
         self.assertIn('short_name', verse_data['book'])
         self.assertIn('name', verse_data['book'])
 
+    # ===== Verse Reference Tests =====
+
+    def test_get_verse_by_ref(self):
+        """Should return a single verse for a BBCCCVVV ref without book/chapter"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/verses/', {'translation': 'KJV', 'ref': '1001002'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['verses']), 1)
+        self.assertEqual(response.data['verses'][0]['id'], self.verse2.id)
+        self.assertEqual(response.data['verses'][0]['ref'], 1001002)
+
+    def test_ref_not_found(self):
+        """Should return 404 for a well-formed ref with no verse"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/verses/', {'translation': 'KJV', 'ref': '1050026'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn('1050026', response.data['error'])
+
+    def test_invalid_ref(self):
+        """Should return 400 for a ref that does not decode"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/verses/', {'translation': 'KJV', 'ref': '1000000'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('BBCCCVVV', response.data['error'])
+
     # ===== Query Optimization Tests =====
 
     def test_verses_query_uses_select_related(self):
@@ -4,6 +4,7 @@ from .views import GoogleLoginView
 
 urlpatterns = [
     path('health/', views.health_check, name='health-check'),
+    path('metrics/', views.metrics_view, name='metrics'),
     path('auth/register/', views.register, name='register'),
     path('auth/login/', views.login_view, name='login'),
     path('auth/logout/', views.logout_view, name='logout'),
@@ -15,7 +16,13 @@ urlpatterns = [
     path('habits/current/', views.current_habit_view, name='current-habit'),
     path('habits/', views.habits, name='habits'),
     path('recent-verses/', views.recent_verses_view, name='recent-verses'),
+    path('recent-verses/batch/', views.recent_verses_batch_view, name='recent-verses-batch'),
+    path('reading-history/', views.reading_history_view, name='reading-history'),
     path('study-notes/', views.study_notes, name='study-notes'),
+    path('study-notes/batch/', views.study_notes_batch_view, name='study-notes-batch'),
+    path('study-notes/search/', views.study_notes_search_view, name='study-notes-search'),
+    path('study-notes/changes/', views.study_note_changes, name='study-note-changes'),
+    path('study-notes/<uuid:note_id>/', views.study_note_detail, name='study-note-detail'),
     path('auth/google/', GoogleLoginView.as_view(), name='google-login'),
 
     # Profile management
@@ -0,0 +1,200 @@
+# per-user activity counters.
+# every review, note and habit write updates the user's user_activity row
+# with one upsert (api/signals.py), in the same transaction as the write.
+# days are the user's local days (UserProfile.time_zone) and are worked out
+# in SQL, so recording activity is a single statement. A late event (an
+# offline review synced the next day) only adds to the counters it still
+# belongs to and never moves a streak backwards. Reads (dashboard, profile)
+# are one primary key lookup; repair_activity_counters rebuilds every row
+# from review_logs and study_notes when the counters need repairing.
+
+import json
+
+from django.db import connection
+from django.utils import timezone
+
+from api.utils.dashboard import DashboardSection, invalidate_dashboard, register_dashboard_section
+
+RECORD_ACTIVITY_SQL = """
+    WITH day AS (
+        SELECT (%(when)s::timestamptz AT TIME ZONE COALESCE(
+            (SELECT time_zone FROM user_profile WHERE user_id = %(user_id)s), 'UTC'
+        ))::date AS day
+    )
+    INSERT INTO user_activity
+        (user_id, reviews_today, reviews_day, current_streak, longest_streak, notes_count,
+         last_active_day, updated_at)
+    SELECT %(user_id)s::uuid, %(reviews)s, CASE WHEN %(reviews)s > 0 THEN day END, 1, 1, %(notes)s,
+           day, now()
+    FROM day
+    ON CONFLICT (user_id) DO UPDATE SET
+        reviews_today = CASE
+            WHEN EXCLUDED.reviews_day IS NULL OR EXCLUDED.reviews_day < user_activity.reviews_day
+                THEN user_activity.reviews_today
+            WHEN EXCLUDED.reviews_day = user_activity.reviews_day
+                THEN user_activity.reviews_today + EXCLUDED.reviews_today
+            ELSE EXCLUDED.reviews_today
+        END,
+        reviews_day = GREATEST(user_activity.reviews_day, EXCLUDED.reviews_day),
+        current_streak = CASE
+            WHEN user_activity.last_active_day IS NULL THEN 1
+            WHEN EXCLUDED.last_active_day <= user_activity.last_active_day THEN user_activity.current_streak
+            WHEN EXCLUDED.last_active_day = user_activity.last_active_day + 1 THEN user_activity.current_streak + 1
+            ELSE 1
+        END,
+        longest_streak = GREATEST(user_activity.longest_streak, CASE
+            WHEN user_activity.last_active_day IS NULL THEN 1
+            WHEN EXCLUDED.last_active_day <= user_activity.last_active_day THEN user_activity.current_streak
+            WHEN EXCLUDED.last_active_day = user_activity.last_active_day + 1 THEN user_activity.current_streak + 1
+            ELSE 1
+        END),
+        notes_count = user_activity.notes_count + EXCLUDED.notes_count,
+        last_active_day = GREATEST(user_activity.last_active_day, EXCLUDED.last_active_day),
+        updated_at = now()
+"""
+
+# Counters as of the user's current local day: reviews from an earlier day
+# and a streak not extended today or yesterday read as 0.
+ACTIVITY_SQL = """
+    SELECT json_build_object(
+        'reviews_today', CASE WHEN a.reviews_day = d.today THEN a.reviews_today ELSE 0 END,
+        'review_goal_per_day', COALESCE(p.review_goal_per_day, 10),
+        'current_streak', CASE WHEN a.last_active_day >= d.today - 1 THEN a.current_streak ELSE 0 END,
+        'longest_streak', COALESCE(a.longest_streak, 0),
+        'notes_count', COALESCE(a.notes_count, 0),
+        'last_active_day', a.last_active_day
+    )
+    FROM (SELECT %(user_id)s::uuid AS user_id) u
+    LEFT JOIN user_activity a ON a.user_id = u.user_id
+    LEFT JOIN user_profile p ON p.user_id = u.user_id
+    CROSS JOIN LATERAL (
+        SELECT (now() AT TIME ZONE COALESCE(p.time_zone, 'UTC'))::date AS today
+    ) d
+"""
+
+REPAIR_SQL = """
+    WITH zones AS (
+        SELECT u.id AS user_id, COALESCE(p.time_zone, 'UTC') AS time_zone
+        FROM custom_user u
+        LEFT JOIN user_profile p ON p.user_id = u.id
+    ),
+    active AS (
+        SELECT user_id, day, sum(reviews) AS reviews
+        FROM (
+            SELECT r.user_id, (r.ts AT TIME ZONE z.time_zone)::date AS day, count(*) AS reviews
+            FROM review_logs r JOIN zones z USING (user_id)
+            GROUP BY 1, 2
+            UNION ALL
+            SELECT n.user_id, (n.created_at AT TIME ZONE z.time_zone)::date, 0
+            FROM study_notes n JOIN zones z USING (user_id)
+            GROUP BY 1, 2
+        ) days
+        GROUP BY user_id, day
+    ),
+    runs AS (
+        -- Consecutive days share day - row_number()
+        SELECT user_id, count(*) AS length, max(day) AS last_day
+        FROM (
+            SELECT user_id, day, day - row_number() OVER (PARTITION BY user_id ORDER BY day)::int AS run
+            FROM active
+        ) numbered
+        GROUP BY user_id, run
+    ),
+    streaks AS (
+        SELECT user_id, max(last_day) AS last_active_day, max(length) AS longest_streak,
+               (array_agg(length ORDER BY last_day DESC))[1] AS current_streak
+        FROM runs
+        GROUP BY user_id
+    ),
+    reviews AS (
+        SELECT DISTINCT ON (user_id) user_id, day, reviews
+        FROM active
+        WHERE reviews > 0
+        ORDER BY user_id, day DESC
+    ),
+    notes AS (
+        SELECT user_id, count(*) AS notes_count FROM study_notes GROUP BY user_id
+    ),
+    repaired AS (
+        INSERT INTO user_activity
+            (user_id, reviews_today, reviews_day, current_streak, longest_streak, notes_count,
+             last_active_day, updated_at)
+        SELECT z.user_id, COALESCE(r.reviews, 0), r.day, COALESCE(s.current_streak, 0),
+               COALESCE(s.longest_streak, 0), COALESCE(n.notes_count, 0), s.last_active_day, now()
+        FROM zones z
+        LEFT JOIN streaks s USING (user_id)
+        LEFT JOIN reviews r USING (user_id)
+        LEFT JOIN notes n USING (user_id)
+        ON CONFLICT (user_id) DO UPDATE SET
+            reviews_today = EXCLUDED.reviews_today,
+            reviews_day = EXCLUDED.reviews_day,
+            current_streak = EXCLUDED.current_streak,
+            longest_streak = GREATEST(EXCLUDED.longest_streak, user_activity.longest_streak),
+            notes_count = EXCLUDED.notes_count,
+            last_active_day = EXCLUDED.last_active_day,
+            updated_at = now()
+        RETURNING 1
+    )
+    SELECT count(*) FROM repaired
+"""
+
+
+def record_activity(user_id, when=None, reviews=0, notes=0):
+    """
+    Count activity for a user on the local day of `when` (one statement).
+
+    Args:
+        user_id: The active user's id
+        when: When the activity happened (defaults to now)
+        reviews: Reviews to add to that day's count
+        notes: Notes created
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(RECORD_ACTIVITY_SQL, {
+            'user_id': str(user_id),
+            'when': when or timezone.now(),
+            'reviews': reviews,
+            'notes': notes,
+        })
+    invalidate_dashboard(user_id)
+
+
+def note_deleted(user_id, count=1):
+    """Drop deleted notes from the count (deleting isn't activity)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE user_activity SET notes_count = GREATEST(notes_count - %s, 0), updated_at = now() "
+            "WHERE user_id = %s",
+            [count, str(user_id)],
+        )
+    invalidate_dashboard(user_id)
+
+
+def get_activity(user_id):
+    """
+    A user's counters as of today (one primary key lookup).
+
+    Returns:
+        dict: reviews_today, review_goal_per_day, current_streak,
+            longest_streak, notes_count and last_active_day
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT ({ACTIVITY_SQL})::text", {'user_id': str(user_id)})
+        return json.loads(cursor.fetchone()[0])
+
+
+def repair_activity_counters():
+    """
+    Recompute every user's counters from review_logs and study_notes in one
+    statement. Habit check-ins leave no history, so days that only had one
+    drop out of the rebuilt streaks; longest_streak never goes down.
+
+    Returns:
+        int: Rows written
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(REPAIR_SQL)
+        return cursor.fetchone()[0]
+
+
+register_dashboard_section(DashboardSection(name='activity', sql=ACTIVITY_SQL))
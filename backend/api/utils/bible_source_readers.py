@@ -0,0 +1,141 @@
+# readers for the scrollmapper CSV and SQLite exports.
+# each reader returns (translation_string, verse_rows) where verse_rows is a
+# lazy iterator of (book_name, chapter, verse_num, text) tuples that feeds
+# transform_verse_rows() without loading the whole source into memory.
+
+import csv
+import io
+import sqlite3
+
+from api.utils.transform_bible_import_data import transform_bible_data, transform_verse_rows
+
+# Accepted header names for each CSV column
+CSV_COLUMNS = {
+    'book': ('book', 'book name', 'book_name'),
+    'chapter': ('chapter',),
+    'verse': ('verse', 'verse_num'),
+    'text': ('text',),
+}
+
+
+def quote_identifier(name):
+    """Quote a SQLite identifier (table names come from the translation code)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def read_csv_source(csv_text, translation_code):
+    """
+    Read a scrollmapper CSV export (Book,Chapter,Verse,Text).
+
+    The CSV files carry no translation metadata, so the code doubles as the name.
+
+    Args:
+        csv_text: CSV file contents
+        translation_code: Translation code, e.g. "KJV"
+
+    Returns:
+        tuple: (translation_string, verse_rows iterator)
+
+    Raises:
+        ValueError: If the header is missing a required column
+    """
+    reader = csv.reader(io.StringIO(csv_text))
+    header = [column.strip().lower() for column in next(reader, [])]
+
+    indexes = {}
+    for column, names in CSV_COLUMNS.items():
+        index = next((header.index(name) for name in names if name in header), None)
+        if index is None:
+            raise ValueError(f"CSV source is missing a '{column}' column (header: {header})")
+        indexes[column] = index
+
+    book_i, chapter_i, verse_i, text_i = (
+        indexes['book'], indexes['chapter'], indexes['verse'], indexes['text']
+    )
+
+    def verse_rows():
+        for row in reader:
+            if row:
+                yield row[book_i], row[chapter_i], row[verse_i], row[text_i]
+
+    return f"{translation_code}: {translation_code}", verse_rows()
+
+
+def read_sqlite_source(db_path, translation_code):
+    """
+    Read a scrollmapper SQLite export.
+
+    Expects "<code>_books" (id, name) and "<code>_verses" (book_id, chapter,
+    verse, text) tables, plus an optional "translations" table with titles.
+    Verses are streamed straight off the cursor.
+
+    Args:
+        db_path: Path to the .db file
+        translation_code: Translation code, e.g. "KJV"
+
+    Returns:
+        tuple: (translation_string, verse_rows iterator)
+
+    Raises:
+        ValueError: If the expected tables are missing
+    """
+    conn = sqlite3.connect(db_path)
+
+    books_table = quote_identifier(f'{translation_code}_books')
+    verses_table = quote_identifier(f'{translation_code}_verses')
+
+    try:
+        cursor = conn.execute(
+            f'SELECT b.name, v.chapter, v.verse, v.text '
+            f'FROM {verses_table} v JOIN {books_table} b ON b.id = v.book_id '
+            f'ORDER BY v.book_id, v.chapter, v.verse'
+        )
+    except sqlite3.DatabaseError as e:
+        conn.close()
+        raise ValueError(f"SQLite source has no tables for '{translation_code}': {str(e)}")
+
+    try:
+        row = conn.execute(
+            'SELECT title FROM translations WHERE translation = ?',
+            (translation_code,)
+        ).fetchone()
+        title = row[0] if row and row[0] else translation_code
+    except sqlite3.OperationalError:
+        title = translation_code
+
+    def verse_rows():
+        try:
+            for row in cursor:
+                yield row
+        finally:
+            conn.close()
+
+    return f"{translation_code}: {title}", verse_rows()
+
+
+SOURCE_READERS = {
+    'csv': read_csv_source,
+    'sqlite': read_sqlite_source,
+}
+
+
+def transform_source(source_format, source, translation_code):
+    """
+    Transform a fetched source of any supported format for import.
+
+    Args:
+        source_format: "json", "csv" or "sqlite"
+        source: Parsed JSON dict, CSV text, or SQLite file path
+        translation_code: Translation code (ignored for JSON, which names itself)
+
+    Returns:
+        dict: Same shape as transform_bible_data()
+    """
+    if source_format == 'json':
+        return transform_bible_data(source)
+
+    if source_format not in SOURCE_READERS:
+        raise ValueError(f"Unsupported source format: {source_format}")
+
+    translation_string, verse_rows = SOURCE_READERS[source_format](source, translation_code)
+    return transform_verse_rows(translation_string, verse_rows)
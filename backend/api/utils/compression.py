@@ -0,0 +1,221 @@
+# compressed request and response bodies.
+# responses are compressed with the best encoding the client accepts (brotli
+# when the brotli package is installed, else gzip). Responses marked
+# cacheable with a Cache-Control max-age (the Bible content endpoints) keep
+# their compressed copies in the default cache, keyed by a hash of the body,
+# so repeat downloads of the same chapter cost a hash rather than a
+# compression. Auth endpoints are never compressed (they carry tokens next
+# to attacker-influenced input, the BREACH setting).
+# request bodies sent with Content-Encoding: gzip are inflated by the JSON
+# parser, up to COMPRESSION['MAX_REQUEST_BYTES'].
+
+import gzip
+import hashlib
+import io
+import re
+import threading
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.exceptions import APIException, ParseError, UnsupportedMediaType
+from rest_framework.parsers import JSONParser
+
+from api.utils.metrics import register_collector
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+CACHE_KEY = 'compressed:{}:{}'
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'application/xml', 'image/svg+xml', 'text/')
+MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+
+def accepted_encodings(header):
+    """
+    Encodings from an Accept-Encoding header with a non-zero q-value.
+
+    Returns:
+        dict: {encoding: q}
+    """
+    accepted = {}
+    for part in header.lower().split(','):
+        name, *params = [item.strip() for item in part.split(';')]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted[name] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """The encoding to respond with (brotli preferred on ties), or None"""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get('*', 0)
+    candidates = [('br', accepted.get('br', wildcard))] if brotli else []
+    candidates.append(('gzip', accepted.get('gzip', wildcard)))
+    encoding, q = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if q > 0 else None
+
+
+def compress(body, encoding):
+    options = settings.COMPRESSION
+    if encoding == 'br':
+        return brotli.compress(body, quality=options['BROTLI_QUALITY'])
+    return gzip.compress(body, compresslevel=options['GZIP_LEVEL'], mtime=0)
+
+
+def cache_seconds(response):
+    """How long a response may be reused (its Cache-Control max-age), or 0"""
+    cache_control = response.get('Cache-Control', '')
+    if 'no-store' in cache_control:
+        return 0
+    match = MAX_AGE_PATTERN.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+class CompressionStats:
+    """Bytes before and after compression, for the metrics endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.responses = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, before, after, cache_hit):
+        with self.lock:
+            self.responses += 1
+            self.cache_hits += cache_hit
+            self.bytes_in += before
+            self.bytes_out += after
+
+    def snapshot(self):
+        return {
+            'responses': self.responses,
+            'cache_hits': self.cache_hits,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'ratio': round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None,
+        }
+
+
+compression_stats = CompressionStats()
+
+register_collector('compression', compression_stats.snapshot)
+
+
+def compressed_body(body, encoding, max_age=0):
+    """
+    Compress a body, reusing a cached copy when the response is cacheable.
+
+    Returns:
+        tuple: (compressed bytes, whether it came from the cache)
+    """
+    options = settings.COMPRESSION
+    if not max_age or len(body) > options['MAX_CACHED_BYTES']:
+        return compress(body, encoding), False
+
+    key = CACHE_KEY.format(encoding, hashlib.sha256(body).hexdigest())
+    compressed = cache.get(key)
+    if compressed is not None:
+        return compressed, True
+    compressed = compress(body, encoding)
+    cache.set(key, compressed, min(max_age, options['CACHE_SECONDS']))
+    return compressed, False
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with the client's preferred supported encoding.
+    Place it above every middleware that reads or changes the response body.
+    """
+
+    def process_response(self, request, response):
+        options = settings.COMPRESSION
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        if request.path.startswith(tuple(options['EXCLUDE_PATHS'])):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < options['MIN_SIZE']:
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        body, cache_hit = compressed_body(response.content, encoding, cache_seconds(response))
+        if len(body) >= len(response.content):
+            return response
+        compression_stats.record(len(response.content), len(body), cache_hit)
+
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        # The compressed bytes differ, so a strong validator no longer holds
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class RequestTooLarge(APIException):
+    status_code = 413
+    default_detail = 'Request body too large.'
+    default_code = 'request_too_large'
+
+
+def inflate_gzip(stream, limit):
+    """
+    Decompress a gzip stream, refusing to produce more than `limit` bytes
+    (a few KB of gzip can inflate to gigabytes).
+
+    Raises:
+        RequestTooLarge: If the body inflates past the limit
+        ParseError: If the body isn't valid gzip
+    """
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    output = bytearray()
+    try:
+        for chunk in iter(lambda: stream.read(64 * 1024), b''):
+            while chunk:
+                output += decompressor.decompress(chunk, limit + 1 - len(output))
+                if len(output) > limit:
+                    raise RequestTooLarge(f'Request body inflates past {limit} bytes.')
+                chunk = decompressor.unconsumed_tail
+            if decompressor.eof:
+                break
+    except zlib.error:
+        raise ParseError('Request body is not valid gzip.')
+    if not decompressor.eof:
+        raise ParseError('Request body is truncated gzip.')
+    return bytes(output)
+
+
+class DecompressingJSONParser(JSONParser):
+    """JSONParser that also accepts Content-Encoding: gzip request bodies"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        encoding = request.META.get('HTTP_CONTENT_ENCODING', '').strip().lower() if request is not None else ''
+        if encoding == 'gzip':
+            if stream is not None:
+                stream = io.BytesIO(inflate_gzip(stream, settings.COMPRESSION['MAX_REQUEST_BYTES']))
+        elif encoding not in ('', 'identity'):
+            raise UnsupportedMediaType(media_type, detail=f'Unsupported Content-Encoding "{encoding}".')
+        return super().parse(stream, media_type, parser_context)
@@ -0,0 +1,127 @@
+# per-user dashboard snapshot.
+# the dashboard is built from registered sections, each a scalar SQL subquery
+# returning JSON; all sections are combined into one json_build_object()
+# SELECT so a snapshot costs a single round trip however many sections exist.
+# snapshots are cached per user and dropped by signals (api/signals.py)
+# whenever one of the source tables changes for that user.
+
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+CACHE_KEY = 'dashboard:{}'
+
+
+class DashboardSection:
+    """
+    One top-level key of the dashboard response.
+
+    Args:
+        name: Response key
+        sql: Scalar subquery returning json; may use %(user_id)s
+        to_representation: Optional callable applied to the decoded value
+    """
+
+    def __init__(self, name, sql, to_representation=None):
+        self.name = name
+        self.sql = sql
+        self.to_representation = to_representation
+
+
+SECTIONS = []
+
+
+def register_dashboard_section(section):
+    """Add a section to every dashboard snapshot (no extra queries per request)."""
+    SECTIONS.append(section)
+
+
+def dashboard_cache_key(user_id):
+    return CACHE_KEY.format(user_id)
+
+
+def build_dashboard(user_id):
+    """
+    Assemble the dashboard for a user with a single query.
+
+    Returns:
+        dict: {section name: value}
+    """
+    pairs = ', '.join(f"'{section.name}', ({section.sql})" for section in SECTIONS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT json_build_object({pairs})::text", {'user_id': str(user_id)})
+        snapshot = json.loads(cursor.fetchone()[0])
+
+    for section in SECTIONS:
+        if section.to_representation is not None:
+            snapshot[section.name] = section.to_representation(snapshot[section.name])
+    return snapshot
+
+
+def get_dashboard(user_id):
+    """Cached dashboard snapshot, assembled on a miss"""
+    key = dashboard_cache_key(user_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_dashboard(user_id)
+        cache.set(key, snapshot, settings.DASHBOARD_CACHE_SECONDS)
+    return snapshot
+
+
+def invalidate_dashboard(user_id):
+    """
+    Drop a user's cached snapshot (call after writes that bypass signals).
+    Inside a transaction this waits for the commit: dropped earlier, the
+    snapshot could be rebuilt from the old rows and cached again.
+    """
+    transaction.on_commit(lambda: cache.delete(dashboard_cache_key(user_id)))
+
+
+datetime_field = serializers.DateTimeField()
+
+
+def format_recent_verses(rows):
+    """Match RecentVerseSerializer's datetime formatting"""
+    for row in rows:
+        row['last_accessed'] = datetime_field.to_representation(parse_datetime(row['last_accessed']))
+    return rows
+
+
+register_dashboard_section(DashboardSection(
+    name='current_habit',
+    sql="""
+        SELECT json_build_object(
+            'id', h.id, 'habit', h.habit, 'frequency', h.frequency, 'purpose', h.purpose,
+            'time', h.time, 'location', h.location, 'skipped', h.skipped
+        )
+        FROM user_habit h
+        WHERE h.user_id = %(user_id)s
+        ORDER BY h.id
+        LIMIT 1
+    """,
+))
+
+register_dashboard_section(DashboardSection(
+    name='recent_verses',
+    sql="""
+        SELECT COALESCE(json_agg(r ORDER BY r.last_accessed DESC), '[]'::json)
+        FROM (
+            SELECT rv.id, rv.verse_id AS verse, v.ref AS verse_ref,
+                   COALESCE(vt.text, v.text) AS verse_text,
+                   b.short_name || ' ' || rv.chapter || ':' || v.verse_num AS verse_reference,
+                   b.short_name AS book_name, rv.chapter, rv.last_accessed
+            FROM recent_verses rv
+            JOIN verses v ON v.id = rv.verse_id
+            LEFT JOIN verse_texts vt ON vt.id = v.text_id
+            JOIN books b ON b.id = rv.book_id
+            WHERE rv.user_id = %(user_id)s
+            ORDER BY rv.last_accessed DESC
+            LIMIT 2
+        ) r
+    """,
+    to_representation=format_recent_verses,
+))
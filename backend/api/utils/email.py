@@ -1,278 +1,304 @@
-"""Email utility functions for sending verification and notification emails."""
+"""Email utility functions: verification and notification messages, and the providers that send them."""
 
-import logging
+import time
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 import resend
 
-logger = logging.getLogger(__name__)
 
+class EmailDeliveryError(Exception):
+    """Raised by an email provider when a message could not be sent."""
 
-def send_verification_email(user):
-    """
-    Send email verification link to user.
 
-    Args:
-        user: CustomUser instance
+class ResendProvider:
+    """Sends email through the Resend API."""
 
-    Returns:
-        tuple: (success: bool, error_message: str or None)
-    """
-    try:
-        # Generate verification token
-        token = default_token_generator.make_token(user)
-        uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
-
-        # Build verification URL
-        verification_url = (
-            f"{settings.FRONTEND_URL}/verify-email"
-            f"?token={token}&uidb64={uidb64}"
-        )
-
-        # Create email content
-        subject = "Verify your email address"
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background-color: #4F46E5;
-                    color: white;
-                    padding: 20px;
-                    text-align: center;
-                    border-radius: 8px 8px 0 0;
-                }}
-                .content {{
-                    background-color: #f9fafb;
-                    padding: 30px;
-                    border-radius: 0 0 8px 8px;
-                }}
-                .button {{
-                    display: inline-block;
-                    background-color: #4F46E5;
-                    color: white;
-                    padding: 12px 24px;
-                    text-decoration: none;
-                    border-radius: 6px;
-                    margin: 20px 0;
-                }}
-                .footer {{
-                    margin-top: 30px;
-                    text-align: center;
-                    font-size: 12px;
-                    color: #6b7280;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Bible Memorization App</h1>
-            </div>
-            <div class="content">
-                <h2>Welcome!</h2>
-                <p>Thank you for registering with Bible Memorization App. Please verify your email address to activate your account.</p>
-
-                <p>Click the button below to verify your email:</p>
-
-                <center>
-                    <a href="{verification_url}" class="button">Verify Email Address</a>
-                </center>
-
-                <p>Or copy and paste this link into your browser:</p>
-                <p style="word-break: break-all; color: #4F46E5;">{verification_url}</p>
-
-                <p><strong>This link will expire in 24 hours.</strong></p>
-
-                <p>If you didn't create an account, you can safely ignore this email.</p>
-            </div>
-            <div class="footer">
-                <p>&copy; 2025 Bible Memorization App. All rights reserved.</p>
-            </div>
-        </body>
-        </html>
+    def send(self, to, subject, html, text):
         """
+        Send one email.
 
-        plain_content = f"""
-        Welcome to Bible Memorization App!
-
-        Thank you for registering. Please verify your email address to activate your account.
+        Returns:
+            str: Resend message id
 
-        Click or copy this link to verify your email:
-        {verification_url}
-
-        This link will expire in 24 hours.
-
-        If you didn't create an account, you can safely ignore this email.
-
-        © 2025 Bible Memorization App. All rights reserved.
+        Raises:
+            EmailDeliveryError: If the API key is missing or Resend rejects the message
         """
-
-        # Send email via Resend
         if not settings.RESEND_API_KEY:
-            logger.warning(f"Resend API key not configured. Verification email for {user.email} not sent.")
-            logger.info(f"Verification URL (for testing): {verification_url}")
-            return (False, "Resend API key not configured. Check server logs for verification URL.")
+            raise EmailDeliveryError("Resend API key not configured")
 
         resend.api_key = settings.RESEND_API_KEY
 
         params = {
             "from": settings.RESEND_FROM_EMAIL,
-            "to": [user.email],
+            "to": [to],
             "subject": subject,
-            "html": html_content,
-            "text": plain_content,
+            "html": html,
+            "text": text,
         }
 
         response = resend.Emails.send(params)
 
-        if response.get("id"):
-            logger.info(f"Verification email sent successfully to {user.email}, resend_id={response.get('id')}")
-            return (True, None)
-        else:
-            logger.error(f"Resend failed for {user.email}: {response}")
-            return (False, "Email service failed to send")
+        if not response.get("id"):
+            raise EmailDeliveryError(f"Email service failed to send: {response}")
+        return response.get("id")
+
+
+class FakeEmailProvider:
+    """
+    In-memory stand-in for Resend (EMAIL_PROVIDER = 'fake').
+
+    Sent messages are appended to `sent`; set `failures` to make the next
+    N sends raise EmailDeliveryError and `latency` to simulate a slow provider.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.failures = 0
+        self.latency = 0.0
+
+    def send(self, to, subject, html, text):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failures:
+            self.failures -= 1
+            raise EmailDeliveryError("Fake provider failure")
+        self.sent.append({'to': to, 'subject': subject, 'html': html, 'text': text})
+        return f"fake-{len(self.sent)}"
+
+    def reset(self):
+        self.sent = []
+        self.failures = 0
+        self.latency = 0.0
 
-    except Exception as e:
-        logger.error(f"Error sending verification email to {user.email}: {str(e)}")
-        return (False, str(e))
 
+fake_provider = FakeEmailProvider()
 
-def send_password_reset_email(user, reset_url):
+
+def get_email_provider():
+    """The provider selected by settings.EMAIL_PROVIDER ('resend' or 'fake')."""
+    if settings.EMAIL_PROVIDER == 'fake':
+        return fake_provider
+    return ResendProvider()
+
+
+def build_verification_email(user):
     """
-    Send password reset email to user.
+    Build the email verification message for a user.
 
     Args:
         user: CustomUser instance
-        reset_url: Password reset URL with token
 
     Returns:
-        tuple: (success: bool, error_message: str or None)
+        dict: subject, html, text and the verification_url they link to
+    """
+    # Generate verification token
+    token = default_token_generator.make_token(user)
+    uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+
+    # Build verification URL
+    verification_url = (
+        f"{settings.FRONTEND_URL}/verify-email"
+        f"?token={token}&uidb64={uidb64}"
+    )
+
+    # Create email content
+    subject = "Verify your email address"
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <style>
+            body {{
+                font-family: Arial, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 600px;
+                margin: 0 auto;
+                padding: 20px;
+            }}
+            .header {{
+                background-color: #4F46E5;
+                color: white;
+                padding: 20px;
+                text-align: center;
+                border-radius: 8px 8px 0 0;
+            }}
+            .content {{
+                background-color: #f9fafb;
+                padding: 30px;
+                border-radius: 0 0 8px 8px;
+            }}
+            .button {{
+                display: inline-block;
+                background-color: #4F46E5;
+                color: white;
+                padding: 12px 24px;
+                text-decoration: none;
+                border-radius: 6px;
+                margin: 20px 0;
+            }}
+            .footer {{
+                margin-top: 30px;
+                text-align: center;
+                font-size: 12px;
+                color: #6b7280;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Bible Memorization App</h1>
+        </div>
+        <div class="content">
+            <h2>Welcome!</h2>
+            <p>Thank you for registering with Bible Memorization App. Please verify your email address to activate your account.</p>
+
+            <p>Click the button below to verify your email:</p>
+
+            <center>
+                <a href="{verification_url}" class="button">Verify Email Address</a>
+            </center>
+
+            <p>Or copy and paste this link into your browser:</p>
+            <p style="word-break: break-all; color: #4F46E5;">{verification_url}</p>
+
+            <p><strong>This link will expire in 24 hours.</strong></p>
+
+            <p>If you didn't create an account, you can safely ignore this email.</p>
+        </div>
+        <div class="footer">
+            <p>&copy; 2025 Bible Memorization App. All rights reserved.</p>
+        </div>
+    </body>
+    </html>
     """
-    try:
-        subject = "Reset your password"
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background-color: #4F46E5;
-                    color: white;
-                    padding: 20px;
-                    text-align: center;
-                    border-radius: 8px 8px 0 0;
-                }}
-                .content {{
-                    background-color: #f9fafb;
-                    padding: 30px;
-                    border-radius: 0 0 8px 8px;
-                }}
-                .button {{
-                    display: inline-block;
-                    background-color: #4F46E5;
-                    color: white;
-                    padding: 12px 24px;
-                    text-decoration: none;
-                    border-radius: 6px;
-                    margin: 20px 0;
-                }}
-                .footer {{
-                    margin-top: 30px;
-                    text-align: center;
-                    font-size: 12px;
-                    color: #6b7280;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Bible Memorization App</h1>
-            </div>
-            <div class="content">
-                <h2>Password Reset Request</h2>
-                <p>We received a request to reset your password. Click the button below to create a new password:</p>
-
-                <center>
-                    <a href="{reset_url}" class="button">Reset Password</a>
-                </center>
-
-                <p>Or copy and paste this link into your browser:</p>
-                <p style="word-break: break-all; color: #4F46E5;">{reset_url}</p>
-
-                <p><strong>This link will expire in 24 hours.</strong></p>
-
-                <p>If you didn't request a password reset, you can safely ignore this email. Your password will not be changed.</p>
-            </div>
-            <div class="footer">
-                <p>&copy; 2025 Bible Memorization App. All rights reserved.</p>
-            </div>
-        </body>
-        </html>
-        """
 
-        plain_content = f"""
-        Password Reset Request
+    plain_content = f"""
+    Welcome to Bible Memorization App!
 
-        We received a request to reset your password for Bible Memorization App.
+    Thank you for registering. Please verify your email address to activate your account.
 
-        Click or copy this link to reset your password:
-        {reset_url}
+    Click or copy this link to verify your email:
+    {verification_url}
 
-        This link will expire in 24 hours.
+    This link will expire in 24 hours.
 
-        If you didn't request a password reset, you can safely ignore this email.
+    If you didn't create an account, you can safely ignore this email.
 
-        © 2025 Bible Memorization App. All rights reserved.
-        """
+    © 2025 Bible Memorization App. All rights reserved.
+    """
 
-        # Send email via Resend
-        if not settings.RESEND_API_KEY:
-            logger.warning(f"Resend API key not configured. Password reset email for {user.email} not sent.")
-            logger.info(f"Password reset URL (for testing): {reset_url}")
-            return (False, "Resend API key not configured. Check server logs for reset URL.")
+    return {
+        'subject': subject,
+        'html': html_content,
+        'text': plain_content,
+        'verification_url': verification_url,
+    }
 
-        resend.api_key = settings.RESEND_API_KEY
 
-        params = {
-            "from": settings.RESEND_FROM_EMAIL,
-            "to": [user.email],
-            "subject": subject,
-            "html": html_content,
-            "text": plain_content,
-        }
+def build_password_reset_email(user, reset_url):
+    """
+    Build the password reset message for a user.
 
-        response = resend.Emails.send(params)
+    Args:
+        user: CustomUser instance
+        reset_url: Password reset URL with token
+
+    Returns:
+        dict: subject, html and text
+    """
+    subject = "Reset your password"
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <style>
+            body {{
+                font-family: Arial, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 600px;
+                margin: 0 auto;
+                padding: 20px;
+            }}
+            .header {{
+                background-color: #4F46E5;
+                color: white;
+                padding: 20px;
+                text-align: center;
+                border-radius: 8px 8px 0 0;
+            }}
+            .content {{
+                background-color: #f9fafb;
+                padding: 30px;
+                border-radius: 0 0 8px 8px;
+            }}
+            .button {{
+                display: inline-block;
+                background-color: #4F46E5;
+                color: white;
+                padding: 12px 24px;
+                text-decoration: none;
+                border-radius: 6px;
+                margin: 20px 0;
+            }}
+            .footer {{
+                margin-top: 30px;
+                text-align: center;
+                font-size: 12px;
+                color: #6b7280;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Bible Memorization App</h1>
+        </div>
+        <div class="content">
+            <h2>Password Reset Request</h2>
+            <p>We received a request to reset your password. Click the button below to create a new password:</p>
+
+            <center>
+                <a href="{reset_url}" class="button">Reset Password</a>
+            </center>
+
+            <p>Or copy and paste this link into your browser:</p>
+            <p style="word-break: break-all; color: #4F46E5;">{reset_url}</p>
+
+            <p><strong>This link will expire in 24 hours.</strong></p>
+
+            <p>If you didn't request a password reset, you can safely ignore this email. Your password will not be changed.</p>
+        </div>
+        <div class="footer">
+            <p>&copy; 2025 Bible Memorization App. All rights reserved.</p>
+        </div>
+    </body>
+    </html>
+    """
+
+    plain_content = f"""
+    Password Reset Request
 
-        if response.get("id"):
-            logger.info(f"Password reset email sent successfully to {user.email}, resend_id={response.get('id')}")
-            return (True, None)
-        else:
-            logger.error(f"Resend failed for {user.email}: {response}")
-            return (False, "Email service failed to send")
+    We received a request to reset your password for Bible Memorization App.
+
+    Click or copy this link to reset your password:
+    {reset_url}
+
+    This link will expire in 24 hours.
+
+    If you didn't request a password reset, you can safely ignore this email.
+
+    © 2025 Bible Memorization App. All rights reserved.
+    """
 
-    except Exception as e:
-        logger.error(f"Error sending password reset email to {user.email}: {str(e)}")
-        return (False, str(e))
+    return {
+        'subject': subject,
+        'html': html_content,
+        'text': plain_content,
+    }
@@ -0,0 +1,143 @@
+# transactional email outbox.
+# views queue emails as email_outbox rows inside their own transaction and
+# return immediately; the deliver_emails worker claims due rows in batches,
+# sends them through the configured provider, and retries failures with
+# exponential backoff until EMAIL_OUTBOX['MAX_ATTEMPTS'], after which the row
+# is dead-lettered (status 'dead') for inspection in the admin.
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import EmailOutbox
+from api.utils.email import (
+    build_password_reset_email,
+    build_verification_email,
+    get_email_provider,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_verification_email(user):
+    """
+    Queue a verification email unless one is already waiting for this user.
+
+    Returns:
+        EmailOutbox: The new or already-pending row
+    """
+    pending = EmailOutbox.objects.filter(
+        user=user, kind=EmailOutbox.Kind.VERIFICATION, status=EmailOutbox.Status.PENDING
+    ).first()
+    if pending is not None:
+        return pending
+    return EmailOutbox.objects.create(user=user, kind=EmailOutbox.Kind.VERIFICATION)
+
+
+def enqueue_password_reset_email(user, reset_url):
+    """Queue a password reset email"""
+    return EmailOutbox.objects.create(
+        user=user, kind=EmailOutbox.Kind.PASSWORD_RESET, payload={'reset_url': reset_url}
+    )
+
+
+def backoff_seconds(attempts):
+    """Delay before retry number `attempts` (1-based): base * 2^(n-1), capped"""
+    options = settings.EMAIL_OUTBOX
+    return min(options['BACKOFF_SECONDS'] * 2 ** (attempts - 1), options['MAX_BACKOFF_SECONDS'])
+
+
+def claim_batch(batch_size):
+    """
+    Claim up to batch_size due emails.
+
+    Claimed rows have next_attempt_at pushed out by the lease, so concurrent
+    workers skip them, and a worker that dies mid-send gives them up again
+    once the lease runs out. Sending happens after this transaction commits,
+    so no row lock is held during the provider call.
+
+    Returns:
+        list: Claimed EmailOutbox rows (with user loaded)
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('user')
+            .filter(status=EmailOutbox.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if emails:
+            EmailOutbox.objects.filter(id__in=[email.id for email in emails]).update(
+                next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX['LEASE_SECONDS'])
+            )
+    return emails
+
+
+def build_message(email):
+    if email.kind == EmailOutbox.Kind.VERIFICATION:
+        return build_verification_email(email.user)
+    return build_password_reset_email(email.user, email.payload['reset_url'])
+
+
+def deliver(email, provider):
+    """
+    Send one claimed email and record the outcome.
+
+    Returns:
+        bool: True if sent
+    """
+    now = timezone.now()
+    message = None
+    try:
+        message = build_message(email)
+        message_id = provider.send(email.user.email, message['subject'], message['html'], message['text'])
+    except Exception as e:
+        email.attempts += 1
+        email.last_error = str(e)
+        if email.attempts >= settings.EMAIL_OUTBOX['MAX_ATTEMPTS']:
+            email.status = EmailOutbox.Status.DEAD
+            logger.error(f"Giving up on {email.kind} email {email.id} to {email.user.email}: {str(e)}")
+        else:
+            email.next_attempt_at = now + timedelta(seconds=backoff_seconds(email.attempts))
+            logger.warning(f"Sending {email.kind} email {email.id} failed (attempt {email.attempts}): {str(e)}")
+        if message is not None and email.kind == EmailOutbox.Kind.VERIFICATION:
+            logger.info(f"Verification URL (for testing): {message['verification_url']}")
+        email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+        return False
+
+    email.attempts += 1
+    email.status = EmailOutbox.Status.SENT
+    email.sent_at = now
+    email.provider_message_id = message_id or ''
+    email.last_error = ''
+    email.save(update_fields=['attempts', 'status', 'sent_at', 'provider_message_id', 'last_error'])
+
+    if email.kind == EmailOutbox.Kind.VERIFICATION:
+        # Drives resend_verification's 5 minute cool-down
+        email.user.last_verification_email_sent = now
+        email.user.save(update_fields=['last_verification_email_sent'])
+
+    logger.info(f"{email.kind} email sent to {email.user.email}, provider_id={message_id}")
+    return True
+
+
+def deliver_pending(batch_size=None, provider=None):
+    """
+    Claim and send one batch of due emails.
+
+    Args:
+        batch_size: Emails per batch (defaults to EMAIL_OUTBOX['BATCH_SIZE'])
+        provider: Email provider (defaults to settings.EMAIL_PROVIDER)
+
+    Returns:
+        dict: Counts of claimed, sent and failed emails
+    """
+    provider = provider or get_email_provider()
+    emails = claim_batch(batch_size or settings.EMAIL_OUTBOX['BATCH_SIZE'])
+
+    sent = sum(deliver(email, provider) for email in emails)
+    return {'claimed': len(emails), 'sent': sent, 'failed': len(emails) - sent}
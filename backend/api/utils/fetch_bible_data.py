@@ -1,15 +1,20 @@
 # make request call code here
 
+import tempfile
+import time
+from contextlib import nullcontext
+
 import requests
 
 
-def fetch_bible_translation(translation_filename):
+def fetch_bible_translation(translation_filename, telemetry=None):
     """
     Fetch Bible translation data from GitHub repository.
 
     Args:
         translation_filename: The filename of the translation (e.g., "KJV", "Anderson", "t_asv")
                              Can include or exclude .json extension
+        telemetry: Optional ImportTelemetry to record download and parse stages
 
     Returns:
         dict: Parsed JSON data from the translation file
@@ -27,11 +32,16 @@ def fetch_bible_translation(translation_filename):
 
     try:
         # Fetch the translation data
+        start = time.perf_counter()
         response = requests.get(url, timeout=30)
         response.raise_for_status()  # Raise exception for 4xx/5xx status codes
 
+        if telemetry:
+            telemetry.record_download(response, time.perf_counter() - start)
+
         # Parse and return JSON
-        return response.json()
+        with telemetry.stage('parse') if telemetry else nullcontext():
+            return response.json()
 
     except requests.exceptions.HTTPError as e:
         if response.status_code == 404:
@@ -50,3 +60,76 @@ def fetch_bible_translation(translation_filename):
 
     except ValueError as e:
         raise ValueError(f"Invalid JSON response from {url}: {str(e)}")
+
+
+# File extension used by each scrollmapper export format
+SOURCE_EXTENSIONS = {
+    'json': 'json',
+    'csv': 'csv',
+    'sqlite': 'db',
+}
+
+
+def fetch_bible_source(translation_filename, source_format, telemetry=None):
+    """
+    Fetch a Bible translation export in CSV or SQLite format.
+
+    Args:
+        translation_filename: The filename of the translation (e.g., "KJV")
+                             Can include or exclude the format's extension
+        source_format: "csv" or "sqlite"
+        telemetry: Optional ImportTelemetry to record the download stage
+
+    Returns:
+        str: CSV text for "csv", or the path of a temporary .db file for "sqlite"
+             (the caller is responsible for deleting it)
+
+    Raises:
+        requests.RequestException: If the request fails
+        ValueError: If the format is unknown or translation not found
+    """
+    if source_format not in ('csv', 'sqlite'):
+        raise ValueError(f"Unsupported source format: {source_format}")
+
+    extension = SOURCE_EXTENSIONS[source_format]
+    translation_filename = translation_filename.removesuffix(f'.{extension}')
+
+    base_url = f"https://raw.githubusercontent.com/scrollmapper/bible_databases/refs/heads/master/formats/{source_format}"
+    url = f"{base_url}/{translation_filename}.{extension}"
+
+    try:
+        start = time.perf_counter()
+        response = requests.get(url, timeout=30, stream=source_format == 'sqlite')
+        response.raise_for_status()
+
+        if source_format == 'csv':
+            if telemetry:
+                telemetry.record_download(response, time.perf_counter() - start)
+            response.encoding = 'utf-8'
+            return response.text
+
+        # Stream the database to disk; sqlite3 can only open files
+        size = 0
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as db_file:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                db_file.write(chunk)
+                size += len(chunk)
+
+        if telemetry:
+            telemetry.add('download', time.perf_counter() - start, bytes=size)
+        return db_file.name
+
+    except requests.exceptions.HTTPError as e:
+        if response.status_code == 404:
+            raise ValueError(
+                f"Translation '{translation_filename}' not found. "
+                f"Check available translations at: "
+                f"https://github.com/scrollmapper/bible_databases/tree/master/formats/{source_format}"
+            )
+        raise
+
+    except requests.exceptions.Timeout:
+        raise requests.RequestException(f"Request timed out while fetching {url}")
+
+    except requests.exceptions.RequestException as e:
+        raise requests.RequestException(f"Failed to fetch translation data: {str(e)}")
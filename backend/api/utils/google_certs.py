@@ -0,0 +1,159 @@
+# process-wide cache of Google's OAuth2 signing certificates.
+# GoogleLoginView verifies ID tokens against these certificates. They are
+# fetched with a pooled HTTP session, kept for the max-age Google sends in
+# Cache-Control, and refreshed in a background thread shortly before they
+# expire, so a login normally verifies without any outbound request.
+
+import logging
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from google.auth import jwt
+
+from api.utils.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+# Used when the response has no usable Cache-Control header
+DEFAULT_MAX_AGE = 300
+# Refresh in the background once this close to expiry
+REFRESH_MARGIN_SECONDS = 60
+# Minimum gap between forced refetches for unknown key ids
+UNKNOWN_KID_REFETCH_SECONDS = 30
+
+
+def parse_max_age(cache_control):
+    """Seconds from a Cache-Control header's max-age, or None"""
+    match = MAX_AGE_PATTERN.search(cache_control or '')
+    return int(match.group(1)) if match else None
+
+
+class GoogleCertCache:
+    """
+    Certificates keyed by key id, with expiry from the upstream max-age.
+
+    Args:
+        certs_url: Certificate endpoint; defaults to settings.GOOGLE_CERTS_URL
+            (read at fetch time so tests can point it at a local key server)
+        timeout: HTTP timeout in seconds
+    """
+
+    def __init__(self, certs_url=None, timeout=10):
+        self.certs_url = certs_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.certs = None
+        self.expires_at = 0.0
+        self.last_fetch = 0.0
+        self.refreshing = False
+        self.fetches = 0
+        self.hits = 0
+        self.background_refreshes = 0
+
+    def fetch(self):
+        """Download the certificates and reset the expiry"""
+        url = self.certs_url or settings.GOOGLE_CERTS_URL
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        certs = response.json()
+
+        max_age = parse_max_age(response.headers.get('Cache-Control'))
+        if max_age is None:
+            max_age = DEFAULT_MAX_AGE
+
+        now = time.monotonic()
+        with self.lock:
+            self.certs = certs
+            self.expires_at = now + max_age
+            self.last_fetch = now
+            self.fetches += 1
+        return certs
+
+    def get_certs(self):
+        """
+        Current certificates, fetching synchronously only if there are none
+        or they have expired.
+
+        Returns:
+            dict: {key id: PEM certificate}
+        """
+        now = time.monotonic()
+        with self.lock:
+            certs, expires_at = self.certs, self.expires_at
+            if certs is not None and now < expires_at:
+                self.hits += 1
+                if expires_at - now < REFRESH_MARGIN_SECONDS and not self.refreshing:
+                    self.refreshing = True
+                    threading.Thread(target=self.background_refresh, daemon=True).start()
+                return certs
+
+        return self.fetch()
+
+    def background_refresh(self):
+        try:
+            self.fetch()
+            self.background_refreshes += 1
+        except requests.RequestException as e:
+            # Keep serving the current certificates until they expire
+            logger.warning(f"Background refresh of Google certificates failed: {str(e)}")
+        finally:
+            self.refreshing = False
+
+    def verify(self, token, audience, clock_skew_in_seconds=0):
+        """
+        Verify a Google ID token, equivalent to id_token.verify_oauth2_token.
+
+        Args:
+            token: Encoded ID token
+            audience: Expected audience (the OAuth client ID)
+            clock_skew_in_seconds: Allowed skew for iat/exp
+
+        Returns:
+            dict: The decoded token claims
+
+        Raises:
+            ValueError: If the token is malformed, signed by an unknown key,
+                expired, for another audience or from another issuer
+        """
+        certs = self.get_certs()
+
+        # Google rotates keys; a kid we haven't seen means our copy is stale
+        kid = jwt.decode_header(token).get('kid')
+        if kid not in certs and time.monotonic() - self.last_fetch > UNKNOWN_KID_REFETCH_SECONDS:
+            certs = self.fetch()
+
+        idinfo = jwt.decode(
+            token,
+            certs=certs,
+            audience=audience,
+            clock_skew_in_seconds=clock_skew_in_seconds,
+        )
+        if idinfo.get('iss') not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer. 'iss' should be one of the following: {GOOGLE_ISSUERS}")
+        return idinfo
+
+    def clear(self):
+        with self.lock:
+            self.certs = None
+            self.expires_at = 0.0
+            self.last_fetch = 0.0
+
+    def stats(self):
+        """Fetch and hit counters"""
+        return {
+            'fetches': self.fetches,
+            'hits': self.hits,
+            'background_refreshes': self.background_refreshes,
+            'expires_in_seconds': round(max(self.expires_at - time.monotonic(), 0), 1),
+        }
+
+
+google_cert_cache = GoogleCertCache()
+
+register_collector('google_certs', google_cert_cache.stats)
@@ -0,0 +1,137 @@
+# structured per-stage telemetry for seeds imports.
+# each run is emitted as one JSON line (command output + optional file) and
+# persisted as an ImportRun row so slow imports can be diagnosed later.
+
+import json
+import resource
+import time
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+from api.models import ImportRun
+
+
+def response_size(response):
+    """Downloaded body size in bytes, or None if the body is not available."""
+    content = getattr(response, 'content', None)
+    if isinstance(content, (bytes, bytearray)):
+        return len(content)
+    return None
+
+
+class ImportTelemetry:
+    """
+    Collects timings, row/byte counts and resource usage for one import run.
+
+    Stages recorded more than once (e.g. "write", once per book) accumulate.
+    """
+
+    def __init__(self, translation_code, source_format):
+        self.translation_code = translation_code
+        self.source_format = source_format
+        self.started_at = timezone.now()
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.lock_wait_seconds = 0.0
+
+    def add(self, name, seconds=0.0, rows=None, bytes=None):
+        """Add a measurement to a stage"""
+        stage = self.stages.setdefault(name, {'seconds': 0.0, 'rows': None, 'bytes': None})
+        stage['seconds'] += seconds
+        if rows is not None:
+            stage['rows'] = (stage['rows'] or 0) + rows
+        if bytes is not None:
+            stage['bytes'] = (stage['bytes'] or 0) + bytes
+
+    def record_download(self, response, seconds):
+        """Record an HTTP download (body size taken from the response)"""
+        self.add('download', seconds, bytes=response_size(response))
+
+    @contextmanager
+    def stage(self, name, rows=None, bytes=None):
+        """Time the enclosed block as (part of) a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, rows=rows, bytes=bytes)
+
+    @contextmanager
+    def lock_wait(self):
+        """Time the enclosed block as waiting on a lock"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.lock_wait_seconds += time.perf_counter() - start
+
+    def summary(self):
+        """Stage metrics with derived rates"""
+        stages = {}
+        for name, stage in self.stages.items():
+            seconds = stage['seconds']
+            metrics = {'seconds': round(seconds, 6)}
+            if stage['rows'] is not None:
+                metrics['rows'] = stage['rows']
+                metrics['rows_per_sec'] = round(stage['rows'] / seconds, 1) if seconds else None
+            if stage['bytes'] is not None:
+                metrics['bytes'] = stage['bytes']
+                metrics['bytes_per_sec'] = round(stage['bytes'] / seconds, 1) if seconds else None
+            stages[name] = metrics
+        return stages
+
+    def finish(self, stats=None, error=''):
+        """
+        Persist the run as an ImportRun and build its JSON line (see to_json()).
+
+        Args:
+            stats: seeds import_data() stats dict (None if the import never ran)
+            error: Error message for runs that failed before or during import
+
+        Returns:
+            ImportRun: The saved row
+        """
+        stats = stats or {}
+        errors = stats.get('errors', [])
+        failed = bool(error) or bool(errors)
+
+        download = self.stages.get('download', {})
+        record = {
+            'event': 'import_run',
+            'translation_code': self.translation_code,
+            'source_format': self.source_format,
+            'status': ImportRun.Status.FAILED if failed else ImportRun.Status.SUCCESS,
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(time.perf_counter() - self.start, 6),
+            'verses_imported': stats.get('verses_created', 0),
+            'verses_deleted': stats.get('verses_deleted', 0),
+            'error_count': len(errors) + (1 if error else 0),
+            'download_bytes': download.get('bytes'),
+            # ru_maxrss is reported in KB on Linux
+            'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'lock_wait_seconds': round(self.lock_wait_seconds, 6),
+            'stages': self.summary(),
+            'error': error or '; '.join(errors),
+        }
+
+        self.record = record
+
+        return ImportRun.objects.create(
+            translation_code=record['translation_code'],
+            source_format=record['source_format'],
+            status=record['status'],
+            started_at=self.started_at,
+            duration_seconds=record['duration_seconds'],
+            verses_imported=record['verses_imported'],
+            error_count=record['error_count'],
+            download_bytes=record['download_bytes'],
+            peak_rss_kb=record['peak_rss_kb'],
+            lock_wait_seconds=record['lock_wait_seconds'],
+            stages=record['stages'],
+            error=record['error'],
+        )
+
+    def to_json(self):
+        """The emitted record as a JSON line (available after finish())"""
+        return json.dumps(self.record)
@@ -0,0 +1,37 @@
+# in-process metrics registry.
+# subsystems register a collector function returning a dict of numbers;
+# GET /api/metrics/ (staff only) returns every collector's current values.
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+_collectors = {}
+
+
+def register_collector(name, collector):
+    """
+    Register a metrics collector.
+
+    Args:
+        name: Key the collector's values are reported under
+        collector: Callable returning a JSON-serializable dict
+    """
+    _collectors[name] = collector
+
+
+def collect_metrics():
+    """
+    Run every registered collector.
+
+    Returns:
+        dict: {name: collector output}; a failing collector reports its error
+    """
+    metrics = {}
+    for name, collector in sorted(_collectors.items()):
+        try:
+            metrics[name] = collector()
+        except Exception as e:
+            logger.error(f"Metrics collector {name} failed: {str(e)}")
+            metrics[name] = {'error': str(e)}
+    return metrics
@@ -0,0 +1,74 @@
+# study note search.
+# each note's search_vector (kept by a trigger, see migration 0026) holds its
+# reference, its content and the text of the verse it's on, weighted in that
+# order. A search reads only the user's entries in the (user_id,
+# search_vector) GIN index, ranks the matches, and builds snippets for the
+# returned page alone. Snippets are HTML: the note and verse text is escaped
+# and matched words are wrapped in <mark>.
+
+from django.conf import settings
+from django.db import connection
+
+from api.models import StudyNote
+
+# Must match the configuration the trigger builds search_vector with
+SEARCH_CONFIG = 'english'
+
+HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MinWords=8, MaxWords=25, FragmentDelimiter=" … "'
+
+SEARCH_SQL = """
+    WITH q AS (
+        SELECT websearch_to_tsquery(%(config)s::regconfig, %(query)s) AS query
+    ),
+    matches AS (
+        SELECT n.id, n.content, n.verse_id, ts_rank_cd(n.search_vector, q.query) AS rank, n.updated_at
+        FROM study_notes n CROSS JOIN q
+        WHERE n.user_id = %(user_id)s AND n.search_vector @@ q.query
+        ORDER BY rank DESC, n.updated_at DESC, n.id DESC
+        LIMIT %(limit)s
+    )
+    SELECT m.id, m.rank,
+           ts_headline(%(config)s::regconfig, {escaped_content}, q.query, %(options)s),
+           CASE WHEN to_tsvector(%(config)s::regconfig, COALESCE(vt.text, v.text)) @@ q.query
+                THEN ts_headline(%(config)s::regconfig, {escaped_verse}, q.query, %(options)s)
+           END
+    FROM matches m CROSS JOIN q
+    LEFT JOIN verses v ON v.id = m.verse_id
+    LEFT JOIN verse_texts vt ON vt.id = v.text_id
+    ORDER BY m.rank DESC, m.updated_at DESC, m.id DESC
+""".format(
+    escaped_content="replace(replace(replace(m.content, '&', '&amp;'), '<', '&lt;'), '>', '&gt;')",
+    escaped_verse="replace(replace(replace(COALESCE(vt.text, v.text), '&', '&amp;'), '<', '&lt;'), '>', '&gt;')",
+)
+
+
+def search_notes(user_id, query, limit=None):
+    """
+    A user's notes matching a web-style search query, best first.
+
+    Args:
+        user_id: The searching user's id
+        query: Search terms; supports "quoted phrases", OR and -exclusions
+        limit: Most matches to return (default STUDY_NOTES['PAGE_SIZE'])
+
+    Returns:
+        list: One dict per match: note (StudyNote), rank, snippet (from the
+            note) and verse_snippet (from its verse, when the verse text
+            matches too, else None)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, {
+            'user_id': str(user_id),
+            'query': query,
+            'limit': limit or settings.STUDY_NOTES['PAGE_SIZE'],
+            'config': SEARCH_CONFIG,
+            'options': HEADLINE_OPTIONS,
+        })
+        rows = cursor.fetchall()
+
+    notes = StudyNote.objects.select_related('verse').in_bulk([note_id for note_id, *rest in rows])
+    return [
+        {'note': notes[note_id], 'rank': rank, 'snippet': snippet, 'verse_snippet': verse_snippet}
+        for note_id, rank, snippet, verse_snippet in rows
+        if note_id in notes
+    ]
@@ -0,0 +1,152 @@
+# password hashing off the request thread.
+# hashes run on a small bounded thread pool per process (hashlib releases the
+# GIL while hashing), so a burst of logins or signups can use at most
+# PASSWORD_HASHING['MAX_CONCURRENT'] cores and queues at most MAX_PENDING more;
+# anything beyond that is rejected with PasswordHashingBusy rather than piling
+# up behind content requests. Hasher cost comes from settings (tune it with
+# manage.py tune_password_hashing) and stored hashes are upgraded on login.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    check_password,
+    make_password,
+)
+
+from api.utils.metrics import register_collector
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool and its queue are full"""
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the iteration count from PASSWORD_HASHING"""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASHING['PBKDF2_ITERATIONS']
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """Memory-hard scrypt with the work factor from PASSWORD_HASHING"""
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_HASHING['SCRYPT_WORK_FACTOR']
+
+    # Upper bound only; hashlib's default 32 MB cap rejects larger work factors
+    maxmem = 512 * 1024 * 1024
+
+
+class HashingExecutor:
+    """
+    Thread pool with a hard cap on running plus queued hashes.
+
+    Args:
+        max_concurrent: Hashes running at once
+        max_pending: Hashes allowed to wait for a thread
+    """
+
+    def __init__(self, max_concurrent, max_pending):
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='password-hash')
+        self.slots = threading.BoundedSemaphore(max_concurrent + max_pending)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Run fn on the pool and wait for its result.
+
+        Raises:
+            PasswordHashingBusy: If every slot is taken
+        """
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise PasswordHashingBusy()
+
+        with self.lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return self.executor.submit(fn, *args, **kwargs).result()
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_seconds += time.perf_counter() - start
+            self.slots.release()
+
+    def stats(self):
+        """Pool usage and average hash latency (including queueing)"""
+        return {
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'avg_ms': round(self.total_seconds / self.completed * 1000, 1) if self.completed else None,
+        }
+
+
+hashing_executor = HashingExecutor(
+    max_concurrent=settings.PASSWORD_HASHING['MAX_CONCURRENT'],
+    max_pending=settings.PASSWORD_HASHING['MAX_PENDING'],
+)
+
+register_collector('password_hashing', hashing_executor.stats)
+
+
+def hash_password(raw_password):
+    """make_password() on the hashing pool"""
+    return hashing_executor.run(make_password, raw_password)
+
+
+def verify_password(raw_password, encoded):
+    """
+    check_password() on the hashing pool.
+
+    Returns:
+        tuple: (is_correct, needs_rehash) where needs_rehash means the stored
+            hash uses an old algorithm or cost parameters
+    """
+    needs_rehash = []
+    is_correct = hashing_executor.run(
+        check_password, raw_password, encoded, lambda raw: needs_rehash.append(True)
+    )
+    return is_correct, bool(needs_rehash)
+
+
+def authenticate_user(email, password):
+    """
+    Equivalent of django.contrib.auth.authenticate() for email logins, with
+    the hashing done on the pool and the database work kept on this thread.
+
+    Returns:
+        CustomUser or None: The user if the credentials are valid and the
+            account is active
+    """
+    User = get_user_model()
+    try:
+        user = User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        # Hash anyway so unknown emails take as long as wrong passwords
+        hash_password(password)
+        return None
+
+    is_correct, needs_rehash = verify_password(password, user.password)
+    if not is_correct or not user.is_active:
+        return None
+
+    if needs_rehash:
+        user.password = hash_password(password)
+        user.save(update_fields=['password'])
+    return user
@@ -0,0 +1,201 @@
+# shared storage and hit counters for django_ratelimit.
+# the @ratelimit decorators keep their window counters in the cache named by
+# RATELIMIT_USE_CACHE. DatabaseRateLimitCache stores them in rate_limit_counters
+# so every gunicorn worker counts against the same limit; each add/incr is one
+# atomic upsert/update. Rejections are counted per endpoint in memory and
+# flushed to rate_limit_hits in batches.
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import connection
+from django.utils import timezone
+from django_ratelimit.exceptions import Ratelimited
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from api.models import RateLimitHit
+from api.utils.metrics import register_collector
+
+# Delete expired counters once every this many new windows
+CULL_EVERY = 1000
+FOREVER = datetime.max.replace(tzinfo=dt_timezone.utc) - timedelta(days=1)
+
+
+class DatabaseRateLimitCache(BaseCache):
+    """
+    Cache backend for integer rate-limit counters, shared across processes.
+
+    Supports the operations django_ratelimit uses (add, incr, get) plus
+    set/delete/clear. Values must be integers.
+
+    LOCATION is the counter table (rate_limit_counters, created by migration).
+    """
+
+    def __init__(self, table, params):
+        super().__init__(params)
+        self.table = connection.ops.quote_name(table)
+        self.adds = 0
+
+    def expiry(self, timeout):
+        # get_backend_timeout() returns an absolute Unix timestamp (or None)
+        expires = self.get_backend_timeout(timeout)
+        if expires is None:
+            return FOREVER
+        return datetime.fromtimestamp(expires, tz=dt_timezone.utc)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """Start a counter unless an unexpired one exists (one upsert)"""
+        key = self.make_and_validate_key(key, version=version)
+        self.adds += 1
+        if self.adds % CULL_EVERY == 0:
+            self.cull()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self.table} (key, count, expires_at) VALUES (%s, %s, %s)
+                ON CONFLICT (key) DO UPDATE
+                SET count = EXCLUDED.count, expires_at = EXCLUDED.expires_at
+                WHERE {self.table}.expires_at <= %s
+                RETURNING 1
+                """,
+                [key, int(value), self.expiry(timeout), timezone.now()],
+            )
+            return cursor.fetchone() is not None
+
+    def incr(self, key, delta=1, version=None):
+        """Atomically add delta to an unexpired counter"""
+        key = self.make_and_validate_key(key, version=version)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {self.table} SET count = count + %s
+                WHERE key = %s AND expires_at > %s
+                RETURNING count
+                """,
+                [delta, key, timezone.now()],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Key '{key}' not found")
+        return row[0]
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count FROM {self.table} WHERE key = %s AND expires_at > %s",
+                [key, timezone.now()],
+            )
+            row = cursor.fetchone()
+        return default if row is None else row[0]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self.table} (key, count, expires_at) VALUES (%s, %s, %s)
+                ON CONFLICT (key) DO UPDATE
+                SET count = EXCLUDED.count, expires_at = EXCLUDED.expires_at
+                """,
+                [key, int(value), self.expiry(timeout)],
+            )
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {self.table} SET expires_at = %s WHERE key = %s AND expires_at > %s",
+                [self.expiry(timeout), key, timezone.now()],
+            )
+            return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE key = %s", [key])
+            return cursor.rowcount > 0
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def cull(self):
+        """Delete expired counters"""
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE expires_at <= %s", [timezone.now()])
+
+
+class LimitHitCounter:
+    """
+    Per-endpoint count of rate-limited requests, buffered in memory and
+    flushed to rate_limit_hits every FLUSH_EVERY hits or FLUSH_SECONDS.
+    """
+
+    def __init__(self, flush_every, flush_seconds):
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def record(self, endpoint):
+        with self.lock:
+            self.pending[endpoint] = self.pending.get(endpoint, 0) + 1
+            due = (
+                sum(self.pending.values()) >= self.flush_every
+                or time.monotonic() - self.last_flush >= self.flush_seconds
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered hits with one upsert"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        if not pending:
+            return
+
+        now = timezone.now()
+        table = RateLimitHit._meta.db_table
+        values = ', '.join(['(%s, %s, %s)'] * len(pending))
+        params = [value for endpoint, hits in sorted(pending.items()) for value in (endpoint, hits, now)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (endpoint, hits, last_hit_at) VALUES {values}
+                ON CONFLICT (endpoint) DO UPDATE
+                SET hits = {table}.hits + EXCLUDED.hits, last_hit_at = EXCLUDED.last_hit_at
+                """,
+                params,
+            )
+
+    def stats(self):
+        """Hits per endpoint across all processes (after flushing this one)"""
+        self.flush()
+        return {
+            hit.endpoint: {'hits': hit.hits, 'last_hit_at': hit.last_hit_at.isoformat()}
+            for hit in RateLimitHit.objects.order_by('endpoint')
+        }
+
+
+limit_hits = LimitHitCounter(
+    flush_every=settings.RATE_LIMIT_HITS['FLUSH_EVERY'],
+    flush_seconds=settings.RATE_LIMIT_HITS['FLUSH_SECONDS'],
+)
+
+register_collector('rate_limit_hits', limit_hits.stats)
+
+
+def exception_handler(exc, context):
+    """DRF exception handler that also counts rate-limit rejections per endpoint"""
+    if isinstance(exc, Ratelimited):
+        view = context.get('view')
+        # Function views are wrapped in a class named after the function
+        limit_hits.record(view.__class__.__name__ if view is not None else 'unknown')
+    return drf_exception_handler(exc, context)
@@ -0,0 +1,317 @@
+# reading history.
+# verse views are appended to reading_events: each process buffers them in
+# memory and writes a flush with one INSERT ... SELECT (which also resolves
+# translation + ref lookups and drops unknown verses). The
+# rollup_reading_history worker folds new events into reading_rollups (one
+# row per user/book/chapter) and re-derives recent_verses for the users it
+# touched. Reads (history, recent verses, dashboard) only use the rollups.
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from api.models import ReadingEvent, RollupCursor
+from api.utils.dashboard import invalidate_dashboard
+from api.utils.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+CURSOR_NAME = 'reading_history'
+
+INSERT_EVENTS_SQL = """
+    INSERT INTO reading_events (user_id, verse_id, read_at)
+    SELECT e.user_id, v.id, e.read_at
+    FROM unnest(
+        %(user_ids)s::uuid[], %(verse_ids)s::bigint[], %(translations)s::text[],
+        %(refs)s::integer[], %(read_at)s::timestamptz[]
+    ) AS e(user_id, verse_id, translation, ref, read_at)
+    JOIN verses v ON v.id = COALESCE(e.verse_id, (
+        SELECT rv.id FROM verses rv JOIN translations t ON t.id = rv.translation_id
+        WHERE t.code = e.translation AND rv.ref = e.ref
+    ))
+    ORDER BY e.read_at
+"""
+
+ROLLUP_SQL = """
+    WITH batch AS (
+        SELECT e.user_id, v.book_id, v.chapter, count(*) AS reads, min(e.read_at) AS first_read_at,
+               max(e.read_at) AS last_read_at,
+               (array_agg(e.verse_id ORDER BY e.read_at DESC, e.id DESC))[1] AS last_verse_id
+        FROM reading_events e
+        JOIN verses v ON v.id = e.verse_id
+        WHERE e.id > %(after)s AND e.id <= %(until)s
+        GROUP BY e.user_id, v.book_id, v.chapter
+    ),
+    upserted AS (
+        INSERT INTO reading_rollups (user_id, book_id, chapter, read_count, first_read_at, last_read_at, last_verse_id)
+        SELECT user_id, book_id, chapter, reads, first_read_at, last_read_at, last_verse_id FROM batch
+        ON CONFLICT (user_id, book_id, chapter) DO UPDATE SET
+            read_count = reading_rollups.read_count + EXCLUDED.read_count,
+            first_read_at = LEAST(reading_rollups.first_read_at, EXCLUDED.first_read_at),
+            last_read_at = GREATEST(reading_rollups.last_read_at, EXCLUDED.last_read_at),
+            last_verse_id = CASE
+                WHEN EXCLUDED.last_read_at >= reading_rollups.last_read_at THEN EXCLUDED.last_verse_id
+                ELSE reading_rollups.last_verse_id
+            END
+        RETURNING user_id
+    )
+    SELECT COALESCE((SELECT sum(reads) FROM batch), 0)::bigint,
+           ARRAY(SELECT DISTINCT user_id::text FROM upserted)
+"""
+
+# Same keep-the-newest-chapters rule as api.utils.recent_verses, for many
+# users at once, fed from each user's latest rollups. Entries written by the
+# interactive POST since the last rollup are candidates too, so a rollup
+# never replaces a newer view with an older one.
+DERIVE_RECENT_VERSES_SQL = """
+    WITH affected AS (
+        SELECT DISTINCT unnest(%(user_ids)s::uuid[]) AS user_id
+    ),
+    latest AS (
+        SELECT a.user_id, r.book_id, r.chapter, r.last_verse_id, r.last_read_at
+        FROM affected a
+        CROSS JOIN LATERAL (
+            SELECT book_id, chapter, last_verse_id, last_read_at
+            FROM reading_rollups
+            WHERE user_id = a.user_id
+            ORDER BY last_read_at DESC
+            LIMIT %(keep)s
+        ) r
+    ),
+    kept AS (
+        SELECT user_id, book_id, chapter
+        FROM (
+            SELECT user_id, book_id, chapter,
+                   row_number() OVER (
+                       PARTITION BY user_id ORDER BY max(last_accessed) DESC, book_id, chapter
+                   ) AS position
+            FROM (
+                SELECT user_id, book_id, chapter, last_accessed
+                FROM recent_verses WHERE user_id IN (SELECT user_id FROM affected)
+                UNION ALL
+                SELECT user_id, book_id, chapter, last_read_at FROM latest
+            ) candidates
+            GROUP BY user_id, book_id, chapter
+        ) ranked
+        WHERE position <= %(keep)s
+    ),
+    upserted AS (
+        INSERT INTO recent_verses (user_id, verse_id, book_id, chapter, last_accessed)
+        SELECT latest.user_id, latest.last_verse_id, latest.book_id, latest.chapter, latest.last_read_at
+        FROM latest JOIN kept USING (user_id, book_id, chapter)
+        ON CONFLICT (user_id, book_id, chapter) DO UPDATE
+        SET verse_id = EXCLUDED.verse_id, last_accessed = EXCLUDED.last_accessed
+        WHERE recent_verses.last_accessed < EXCLUDED.last_accessed
+    )
+    DELETE FROM recent_verses rv
+    WHERE rv.user_id IN (SELECT user_id FROM affected)
+      AND NOT EXISTS (
+          SELECT 1 FROM kept
+          WHERE kept.user_id = rv.user_id AND kept.book_id = rv.book_id AND kept.chapter = rv.chapter
+      )
+"""
+
+
+class ReadingEventBuffer:
+    """
+    Per-process buffer of verse views, written to reading_events with one
+    insert every FLUSH_EVERY events, and at most FLUSH_SECONDS after the
+    oldest buffered view (a timer thread flushes, so an idle process doesn't
+    hold views until its next request). Whatever is buffered is flushed at
+    exit; a killed process loses at most FLUSH_SECONDS of views. A flush that
+    fails drops its events (counted in stats) rather than failing the request
+    that happened to trigger it.
+    """
+
+    def __init__(self, flush_every, flush_seconds):
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.pending = []
+        self.lock = threading.Lock()
+        self.timer = None
+        self.flushes = 0
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, user_id, events):
+        """
+        Buffer views for a user.
+
+        Args:
+            user_id: The viewing user's id
+            events: List of api.utils.recent_verses.ViewEvent
+        """
+        with self.lock:
+            self.pending.extend((str(user_id), event) for event in events)
+            due = len(self.pending) >= self.flush_every
+            if not due and self.timer is None:
+                self.timer = threading.Timer(self.flush_seconds, self.flush_in_background)
+                self.timer.daemon = True
+                self.timer.start()
+        if due:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Dropped buffered reading events: {str(e)}")
+
+    def flush(self):
+        """
+        Write buffered views with one insert.
+
+        Returns:
+            int: Events written (views of unknown verses are dropped)
+        """
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if not pending:
+            return 0
+
+        params = {
+            'user_ids': [user_id for user_id, event in pending],
+            'verse_ids': [event.verse_id for user_id, event in pending],
+            'translations': [event.translation for user_id, event in pending],
+            'refs': [event.ref for user_id, event in pending],
+            'read_at': [event.viewed_at for user_id, event in pending],
+        }
+        try:
+            # A savepoint when inside a transaction, so a failure doesn't abort it
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(INSERT_EVENTS_SQL, params)
+                written = cursor.rowcount
+        except Exception:
+            with self.lock:
+                self.dropped += len(pending)
+            raise
+
+        with self.lock:
+            self.flushes += 1
+            self.written += written
+        return written
+
+    def flush_in_background(self):
+        """Timer callback: flush the views that have waited FLUSH_SECONDS"""
+        with self.lock:
+            self.timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Dropped buffered reading events: {str(e)}")
+        finally:
+            # The timer thread's own connection
+            connection.close()
+
+    def stats(self):
+        return {'pending': len(self.pending), 'flushes': self.flushes, 'written': self.written, 'dropped': self.dropped}
+
+
+reading_events = ReadingEventBuffer(
+    flush_every=settings.READING_HISTORY['FLUSH_EVERY'],
+    flush_seconds=settings.READING_HISTORY['FLUSH_SECONDS'],
+)
+
+register_collector('reading_events', reading_events.stats)
+
+
+@atexit.register
+def flush_at_exit():
+    pending = len(reading_events.pending)
+    try:
+        reading_events.flush()
+    except Exception as e:
+        logger.error(f"Dropped {pending} buffered reading events at exit: {str(e)}")
+
+
+def derive_recent_verses(user_ids):
+    """Rebuild recent_verses for the given users from their rollups (one statement)"""
+    if not user_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(DERIVE_RECENT_VERSES_SQL, {
+            'user_ids': [str(user_id) for user_id in user_ids],
+            'keep': settings.RECENT_VERSES['KEEP'],
+        })
+
+
+def rollup_reading_history(max_events=None):
+    """
+    Fold events appended since the last run into reading_rollups.
+
+    Each run covers events up to the highest id observed by the previous run
+    (see RollupCursor), capped at max_events, then records the current
+    highest id for the next run. Running it concurrently is safe: the cursor
+    row is locked for the duration.
+
+    Args:
+        max_events: Most events to fold in this run (default READING_HISTORY['ROLLUP_BATCH'])
+
+    Returns:
+        dict: Events folded, users updated, and whether the run reached
+            the end of the previous run's snapshot
+    """
+    max_events = max_events or settings.READING_HISTORY['ROLLUP_BATCH']
+    with transaction.atomic():
+        RollupCursor.objects.get_or_create(name=CURSOR_NAME)
+        cursor_row = RollupCursor.objects.select_for_update().get(name=CURSOR_NAME)
+
+        after = cursor_row.last_event_id
+        # Ids have gaps (rolled-back inserts), so find the max_events-th one
+        until = (
+            ReadingEvent.objects.filter(id__gt=after, id__lte=cursor_row.next_event_id)
+            .order_by('id').values_list('id', flat=True)[max_events - 1:max_events].first()
+        ) or cursor_row.next_event_id
+        events, user_ids = 0, []
+        if until > after:
+            with connection.cursor() as cursor:
+                cursor.execute(ROLLUP_SQL, {'after': after, 'until': until})
+                events, user_ids = cursor.fetchone()
+            derive_recent_verses(user_ids)
+
+        caught_up = until == cursor_row.next_event_id
+        cursor_row.last_event_id = until
+        if caught_up:
+            latest = ReadingEvent.objects.order_by('-id').values_list('id', flat=True).first()
+            cursor_row.next_event_id = max(latest or 0, until)
+        cursor_row.save()
+
+    for user_id in user_ids:
+        invalidate_dashboard(user_id)
+    return {'events': events, 'users': len(user_ids), 'caught_up': caught_up}
+
+
+def reading_history(user_id):
+    """
+    Per-book reading summary for a user, from the rollups.
+
+    Returns:
+        list: One dict per book read, most recently read first
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT r.book_id, b.name, count(*), sum(r.read_count), min(r.first_read_at),
+                   max(r.last_read_at), (array_agg(r.chapter ORDER BY r.last_read_at DESC))[1]
+            FROM reading_rollups r
+            JOIN books b ON b.id = r.book_id
+            WHERE r.user_id = %s
+            GROUP BY r.book_id, b.name
+            ORDER BY max(r.last_read_at) DESC
+            """,
+            [str(user_id)],
+        )
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'book': book_id,
+            'book_name': book_name,
+            'chapters_read': chapters_read,
+            'reads': reads,
+            'first_read_at': first_read_at,
+            'last_read_at': last_read_at,
+            'last_chapter': last_chapter,
+        }
+        for book_id, book_name, chapters_read, reads, first_read_at, last_read_at, last_chapter in rows
+    ]
@@ -0,0 +1,225 @@
+# recent verse tracking.
+# a batch of view events is recorded with one statement: verses are resolved
+# (by id or translation + ref), collapsed to the newest view per book/chapter,
+# upserted on the (user, book, chapter) key, and anything beyond
+# RECENT_VERSES['KEEP'] chapters is deleted. ON CONFLICT makes concurrent views
+# of the same chapter safe; concurrent views of different chapters can leave
+# one extra row until the next view trims it, which reads never show because
+# they are limited anyway.
+
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from api.utils.dashboard import invalidate_dashboard
+from api.utils.verse_refs import parse_verse_ref
+
+# verses.id is a bigint
+MAX_VERSE_ID = 2 ** 63 - 1
+
+RECORD_VIEWS_SQL = """
+    WITH events AS (
+        SELECT * FROM unnest(
+            %(verse_ids)s::bigint[], %(translations)s::text[], %(refs)s::integer[],
+            %(viewed_at)s::timestamptz[]
+        ) WITH ORDINALITY AS e(verse_id, translation, ref, viewed_at, ord)
+    ),
+    viewed AS (
+        SELECT DISTINCT ON (v.book_id, v.chapter) v.id AS verse_id, v.book_id, v.chapter, e.viewed_at
+        FROM events e
+        JOIN verses v ON v.id = COALESCE(e.verse_id, (
+            SELECT rv.id FROM verses rv JOIN translations t ON t.id = rv.translation_id
+            WHERE t.code = e.translation AND rv.ref = e.ref
+        ))
+        ORDER BY v.book_id, v.chapter, e.viewed_at DESC, e.ord DESC
+    ),
+    kept AS (
+        SELECT book_id, chapter
+        FROM (
+            SELECT book_id, chapter, last_accessed FROM recent_verses WHERE user_id = %(user_id)s
+            UNION ALL
+            SELECT book_id, chapter, viewed_at FROM viewed
+        ) candidates
+        GROUP BY book_id, chapter
+        ORDER BY max(last_accessed) DESC, book_id, chapter
+        LIMIT %(keep)s
+    ),
+    upserted AS (
+        INSERT INTO recent_verses (user_id, verse_id, book_id, chapter, last_accessed)
+        SELECT %(user_id)s::uuid, viewed.verse_id, viewed.book_id, viewed.chapter, viewed.viewed_at
+        FROM viewed JOIN kept USING (book_id, chapter)
+        ON CONFLICT (user_id, book_id, chapter) DO UPDATE
+        SET verse_id = EXCLUDED.verse_id, last_accessed = EXCLUDED.last_accessed
+        WHERE recent_verses.last_accessed <= EXCLUDED.last_accessed
+        RETURNING id, verse_id, book_id, chapter, last_accessed
+    ),
+    trimmed AS (
+        DELETE FROM recent_verses rv
+        WHERE rv.user_id = %(user_id)s
+          AND NOT EXISTS (SELECT 1 FROM kept WHERE kept.book_id = rv.book_id AND kept.chapter = rv.chapter)
+    )
+    SELECT u.id, u.verse_id, v.ref, COALESCE(vt.text, v.text), b.short_name, u.chapter,
+           v.verse_num, u.last_accessed
+    FROM upserted u
+    JOIN verses v ON v.id = u.verse_id
+    LEFT JOIN verse_texts vt ON vt.id = v.text_id
+    JOIN books b ON b.id = u.book_id
+    ORDER BY u.last_accessed DESC
+"""
+
+# The user's entry for the chapter of one verse (by id or translation + ref).
+# No row means the verse is unknown; a row of NULLs means no entry.
+CHAPTER_ENTRY_SQL = """
+    WITH viewed AS (
+        SELECT book_id, chapter FROM verses
+        WHERE id = COALESCE(%(verse_id)s::bigint, (
+            SELECT rv.id FROM verses rv JOIN translations t ON t.id = rv.translation_id
+            WHERE t.code = %(translation)s::text AND rv.ref = %(ref)s::integer
+        ))
+    )
+    SELECT u.id, u.verse_id, v.ref, COALESCE(vt.text, v.text), b.short_name, u.chapter,
+           v.verse_num, u.last_accessed
+    FROM viewed
+    LEFT JOIN recent_verses u
+        ON u.user_id = %(user_id)s AND u.book_id = viewed.book_id AND u.chapter = viewed.chapter
+    LEFT JOIN verses v ON v.id = u.verse_id
+    LEFT JOIN verse_texts vt ON vt.id = v.text_id
+    LEFT JOIN books b ON b.id = u.book_id
+"""
+
+datetime_field = serializers.DateTimeField()
+
+
+class ViewEvent:
+    """
+    One verse view reported by the reader.
+
+    Args:
+        verse_id: Verse primary key, or None to look up by translation + ref
+        translation: Translation code (with ref)
+        ref: BBCCCVVV verse reference (with translation)
+        viewed_at: When the verse was viewed (defaults to now)
+    """
+
+    def __init__(self, verse_id=None, translation=None, ref=None, viewed_at=None):
+        self.verse_id = verse_id
+        self.translation = translation
+        self.ref = ref
+        self.viewed_at = viewed_at or timezone.now()
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Validate a request payload ({verse_id} or {verse_ref, translation},
+        plus an optional ISO 8601 viewed_at).
+
+        Raises:
+            ValueError: If the payload is malformed
+        """
+        if not isinstance(data, dict):
+            raise ValueError('Each event must be an object')
+
+        verse_id = data.get('verse_id')
+        verse_ref = data.get('verse_ref')
+        translation = data.get('translation')
+        if not verse_id and not (verse_ref and translation):
+            raise ValueError('verse_id or verse_ref and translation is required')
+
+        try:
+            verse_id = int(verse_id) if verse_id else None
+            verse_ref = int(verse_ref) if verse_ref and not verse_id else None
+        except (TypeError, ValueError):
+            raise ValueError('verse_id and verse_ref must be integers')
+        # Out-of-range values would fail the whole flush they're buffered in
+        if verse_id is not None and not 1 <= verse_id <= MAX_VERSE_ID:
+            raise ValueError('verse_id is out of range')
+        if verse_ref is not None:
+            try:
+                parse_verse_ref(verse_ref)
+            except ValueError:
+                raise ValueError('verse_ref must be a BBCCCVVV verse reference')
+
+        viewed_at = None
+        if data.get('viewed_at'):
+            viewed_at = parse_datetime(str(data['viewed_at']))
+            if viewed_at is None:
+                raise ValueError('viewed_at must be an ISO 8601 datetime')
+            if timezone.is_naive(viewed_at):
+                viewed_at = timezone.make_aware(viewed_at, dt_timezone.utc)
+            # Clients' clocks can run ahead; a future view would pin the entry
+            viewed_at = min(viewed_at, timezone.now())
+
+        return cls(verse_id, str(translation) if verse_ref else None, verse_ref, viewed_at)
+
+
+def record_views(user_id, events):
+    """
+    Record verse views for a user in one statement.
+
+    Unknown verses are skipped. When several events hit the same chapter the
+    newest wins, and an event older than the stored view of its chapter
+    leaves that entry alone.
+
+    Args:
+        user_id: The viewing user's id
+        events: List of ViewEvent
+
+    Returns:
+        list: Written entries, newest first, in RecentVerseSerializer's format
+    """
+    params = {
+        'user_id': str(user_id),
+        'keep': settings.RECENT_VERSES['KEEP'],
+        'verse_ids': [event.verse_id for event in events],
+        'translations': [event.translation for event in events],
+        'refs': [event.ref for event in events],
+        'viewed_at': [event.viewed_at for event in events],
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(RECORD_VIEWS_SQL, params)
+        rows = cursor.fetchall()
+
+    # Raw SQL skips the model signals that normally drop the snapshot
+    invalidate_dashboard(user_id)
+
+    return [format_entry(row) for row in rows]
+
+
+def chapter_entry(user_id, event):
+    """
+    The user's current entry for the chapter an event's verse is in, e.g.
+    after record_views() left it alone because the event was older.
+
+    Returns:
+        tuple: (whether the verse exists, entry in RecentVerseSerializer's
+            format or None if the chapter has no entry)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(CHAPTER_ENTRY_SQL, {
+            'user_id': str(user_id),
+            'verse_id': event.verse_id,
+            'translation': event.translation,
+            'ref': event.ref,
+        })
+        row = cursor.fetchone()
+    if row is None:
+        return False, None
+    return True, format_entry(row) if row[0] is not None else None
+
+
+def format_entry(row):
+    entry_id, verse_id, ref, text, book_name, chapter, verse_num, last_accessed = row
+    return {
+        'id': entry_id,
+        'verse': verse_id,
+        'verse_ref': ref,
+        'verse_text': text,
+        'verse_reference': f"{book_name} {chapter}:{verse_num}",
+        'book_name': book_name,
+        'chapter': chapter,
+        'last_accessed': datetime_field.to_representation(last_accessed),
+    }
@@ -0,0 +1,188 @@
+# refresh-token rotation based on token families.
+# each login starts a family (one refresh_token_families row); refresh tokens
+# carry the family id and a generation number. Rotating, detecting reuse of an
+# old token, and revoking are each one indexed UPDATE on that row, so refresh
+# does not touch custom_user or the outstanding/blacklisted token tables.
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.models import CustomUser, RefreshTokenFamily
+
+FAMILY_CLAIM = 'fam'
+GENERATION_CLAIM = 'gen'
+
+FAMILY_TABLE = RefreshTokenFamily._meta.db_table
+
+
+class FamilyRefreshToken(RefreshToken):
+    """
+    Refresh token tracked by its family row instead of the outstanding-token
+    table. Tokens issued before families existed (no fam claim) still go
+    through simplejwt's blacklist.
+    """
+
+    no_copy_claims = RefreshToken.no_copy_claims + (FAMILY_CLAIM, GENERATION_CLAIM)
+
+    def check_blacklist(self):
+        if FAMILY_CLAIM not in self.payload:
+            super().check_blacklist()
+
+    def lifetime_seconds(self):
+        """Seconds between issue and expiry (preserves remember-me across rotation)"""
+        return self.payload['exp'] - self.payload['iat']
+
+
+def new_token(user_id, family_id, generation, lifetime, revoke_hash=None):
+    token = FamilyRefreshToken()
+    token.set_exp(lifetime=lifetime)
+    token[api_settings.USER_ID_CLAIM] = str(user_id)
+    token[FAMILY_CLAIM] = str(family_id)
+    token[GENERATION_CLAIM] = generation
+    if revoke_hash is not None:
+        token[api_settings.REVOKE_TOKEN_CLAIM] = revoke_hash
+    return token
+
+
+def issue_refresh_token(user, lifetime=None):
+    """
+    Start a new token family for a login.
+
+    Args:
+        user: The authenticated user
+        lifetime: Refresh token lifetime (defaults to REFRESH_TOKEN_LIFETIME)
+
+    Returns:
+        FamilyRefreshToken: Generation-0 refresh token
+    """
+    lifetime = lifetime or api_settings.REFRESH_TOKEN_LIFETIME
+    family = RefreshTokenFamily.objects.create(user=user, expires_at=timezone.now() + lifetime)
+    revoke_hash = get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None
+    return new_token(user.pk, family.id, 0, lifetime, revoke_hash)
+
+
+def rotate_refresh_token(raw_token):
+    """
+    Exchange a refresh token for the next one in its family.
+
+    The current generation advances in a single conditional UPDATE. If the
+    token's generation is stale (and outside the grace window), the family
+    is revoked so whoever holds the newer token has to log in again.
+
+    Args:
+        raw_token: Encoded refresh token from the cookie
+
+    Returns:
+        FamilyRefreshToken: The new refresh token
+
+    Raises:
+        TokenError: If the token is invalid, expired, revoked or reused
+    """
+    token = FamilyRefreshToken(raw_token)
+    lifetime = timedelta(seconds=token.lifetime_seconds())
+
+    if FAMILY_CLAIM not in token.payload:
+        return upgrade_legacy_token(token, lifetime)
+
+    family_id = token[FAMILY_CLAIM]
+    generation = token[GENERATION_CLAIM]
+    now = timezone.now()
+    grace = timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+
+    with connection.cursor() as cursor:
+        # SET expressions see the pre-update row, so both CASEs test the old generation.
+        # A token one generation behind, within the grace window, gets the current
+        # generation back without advancing it.
+        cursor.execute(
+            f"""
+            UPDATE {FAMILY_TABLE}
+            SET generation = CASE WHEN generation = %(gen)s THEN generation + 1 ELSE generation END,
+                rotated_at = CASE WHEN generation = %(gen)s THEN %(now)s ELSE rotated_at END,
+                expires_at = CASE WHEN generation = %(gen)s THEN %(expires)s ELSE expires_at END
+            WHERE id = %(family)s
+              AND revoked_at IS NULL
+              AND expires_at > %(now)s
+              AND (generation = %(gen)s OR (generation = %(gen)s + 1 AND rotated_at > %(grace_start)s))
+            RETURNING user_id, generation
+            """,
+            {
+                'family': family_id,
+                'gen': generation,
+                'now': now,
+                'expires': now + lifetime,
+                'grace_start': now - grace,
+            },
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        revoke_family(family_id)
+        raise TokenError('Refresh token has been revoked or reused')
+
+    user_id, current_generation = row
+    return new_token(
+        user_id, family_id, current_generation, lifetime,
+        token.payload.get(api_settings.REVOKE_TOKEN_CLAIM)
+    )
+
+
+def upgrade_legacy_token(token, lifetime):
+    """Blacklist a pre-family refresh token and start a family in its place"""
+    try:
+        user = CustomUser.objects.get(pk=token[api_settings.USER_ID_CLAIM])
+    except CustomUser.DoesNotExist:
+        raise TokenError('User not found')
+
+    token.blacklist()
+    return issue_refresh_token(user, lifetime)
+
+
+def revoke_family(family_id):
+    """
+    Revoke every token in a family.
+
+    Returns:
+        bool: True if the family was active
+    """
+    return RefreshTokenFamily.objects.filter(
+        id=family_id, revoked_at__isnull=True
+    ).update(revoked_at=timezone.now()) > 0
+
+
+def revoke_refresh_token(raw_token):
+    """Revoke the family of a refresh token (logout)"""
+    token = FamilyRefreshToken(raw_token)
+    if FAMILY_CLAIM in token.payload:
+        revoke_family(token[FAMILY_CLAIM])
+    else:
+        token.blacklist()
+
+
+def prune_expired_families(batch_size=1000, now=None):
+    """
+    Delete one batch of expired token families.
+
+    Args:
+        batch_size: Maximum number of families to delete
+        now: Expiry cutoff (defaults to the current time)
+
+    Returns:
+        int: Number of families deleted
+    """
+    now = now or timezone.now()
+    ids = list(
+        RefreshTokenFamily.objects.filter(expires_at__lt=now)
+        .order_by('expires_at')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    deleted, _ = RefreshTokenFamily.objects.filter(id__in=ids).delete()
+    return deleted
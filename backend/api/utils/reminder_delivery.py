@@ -0,0 +1,283 @@
+# reminder delivery.
+# the deliver_reminders worker (its own process, never a web worker) claims
+# due reminder_jobs in batches and sends each batch concurrently: sends run on
+# an asyncio loop limited by a semaphore to REMINDER_DELIVERY['CONCURRENCY'],
+# with synchronous transports on a thread pool of the same size. Database work
+# (claiming, recording results) stays outside the loop on the worker's single
+# connection. Failed sends are retried with exponential backoff until
+# MAX_ATTEMPTS; reminders older than STALE_SECONDS are dropped rather than
+# sent late. When most of a batch fails the worker pauses before claiming
+# more, so a struggling transport isn't hammered.
+
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.html import format_html
+from django.utils.module_loading import import_string
+
+from api.models import ReminderJob, ReminderSchedule
+from api.utils.email import get_email_provider
+from api.utils.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+
+class EmailReminderTransport:
+    """Sends reminders as email through the configured EMAIL_PROVIDER."""
+
+    def send(self, user, message):
+        return get_email_provider().send(user.email, message['subject'], message['html'], message['text'])
+
+
+class SinkTransport:
+    """
+    In-memory stand-in transport (REMINDER_DELIVERY['TRANSPORT'] = 'sink').
+
+    Delivered reminders are appended to `sent`; set `failures` to make the
+    next N sends raise and `latency` to simulate a slow transport.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.failures = 0
+        self.latency = 0.0
+
+    def send(self, user, message):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Sink failure")
+        self.sent.append({'to': user.email, **message})
+        return f"sink-{len(self.sent)}"
+
+    def reset(self):
+        self.sent = []
+        self.failures = 0
+        self.latency = 0.0
+
+
+reminder_sink = SinkTransport()
+
+
+def get_reminder_transport():
+    """
+    The transport selected by REMINDER_DELIVERY['TRANSPORT']: 'email', 'sink',
+    or the dotted path of a class with a send(user, message) method (which
+    may be a coroutine function).
+    """
+    name = settings.REMINDER_DELIVERY['TRANSPORT']
+    if name == 'sink':
+        return reminder_sink
+    if name == 'email':
+        return EmailReminderTransport()
+    return import_string(name)()
+
+
+def build_reminder(job):
+    """
+    Message for a reminder job (schedule and habit must be loaded).
+
+    Returns:
+        dict: subject, text, html and the url the reminder opens
+    """
+    url = f"{settings.FRONTEND_URL}/dashboard"
+    habit = job.schedule.habit if job.kind == ReminderSchedule.Kind.HABIT else None
+    if habit is not None:
+        subject = f"Reminder: {habit.habit}"
+        text = f"It's time for {habit.habit}."
+        if habit.purpose:
+            text += f" {habit.purpose}"
+    else:
+        subject = "Time for today's reading"
+        text = "Your daily reading is waiting. Pick up where you left off."
+    # Habit names and purposes are user-entered
+    html = format_html('<p>{}</p><p><a href="{}">Open</a></p>', text, url)
+    return {'subject': subject, 'text': text, 'html': html, 'url': url}
+
+
+def backoff_seconds(attempts):
+    """Delay before retry number `attempts` (1-based): base * 2^(n-1), capped"""
+    options = settings.REMINDER_DELIVERY
+    return min(options['BACKOFF_SECONDS'] * 2 ** (attempts - 1), options['MAX_BACKOFF_SECONDS'])
+
+
+def claim_batch(batch_size, now=None):
+    """
+    Claim up to batch_size due jobs, pushing their due_at out by the lease so
+    other workers skip them (and retry them if this worker dies).
+
+    Returns:
+        list: Claimed ReminderJob rows with user, schedule and habit loaded
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            ReminderJob.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('user', 'schedule__habit')
+            .filter(status=ReminderJob.Status.PENDING, due_at__lte=now)
+            .order_by('due_at')[:batch_size]
+        )
+        if jobs:
+            ReminderJob.objects.filter(id__in=[job.id for job in jobs]).update(
+                due_at=now + timedelta(seconds=settings.REMINDER_DELIVERY['LEASE_SECONDS'])
+            )
+    return jobs
+
+
+async def send_all(deliveries, transport, concurrency):
+    """
+    Send (job, message) pairs with at most `concurrency` in flight.
+
+    Returns:
+        list: None for each success, or the exception raised, in order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    is_async = inspect.iscoroutinefunction(transport.send)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='reminder-send') as executor:
+        async def send_one(job, message):
+            async with semaphore:
+                try:
+                    if is_async:
+                        await transport.send(job.user, message)
+                    else:
+                        await loop.run_in_executor(executor, transport.send, job.user, message)
+                except Exception as e:
+                    return e
+                return None
+
+        return await asyncio.gather(*(send_one(job, message) for job, message in deliveries))
+
+
+def record_results(jobs, errors, now):
+    """Mark sent jobs and reschedule or dead-letter failed ones (two queries)"""
+    sent_ids = [job.id for job, error in zip(jobs, errors) if error is None]
+    if sent_ids:
+        ReminderJob.objects.filter(id__in=sent_ids).update(
+            status=ReminderJob.Status.SENT, sent_at=now, attempts=F('attempts') + 1, last_error=''
+        )
+
+    failed = []
+    for job, error in zip(jobs, errors):
+        if error is None:
+            continue
+        job.attempts += 1
+        job.last_error = str(error)
+        if job.attempts >= settings.REMINDER_DELIVERY['MAX_ATTEMPTS']:
+            job.status = ReminderJob.Status.DEAD
+            logger.error(f"Giving up on reminder {job.id} to {job.user.email}: {str(error)}")
+        else:
+            job.due_at = now + timedelta(seconds=backoff_seconds(job.attempts))
+        failed.append(job)
+    if failed:
+        ReminderJob.objects.bulk_update(failed, ['attempts', 'last_error', 'status', 'due_at'])
+
+
+def expire_stale(jobs, now):
+    """
+    Dead-letter claimed jobs whose reminder time passed too long ago.
+
+    Returns:
+        list: The jobs still worth sending
+    """
+    cutoff = now - timedelta(seconds=settings.REMINDER_DELIVERY['STALE_SECONDS'])
+    stale = [job for job in jobs if job.scheduled_for < cutoff]
+    if stale:
+        ReminderJob.objects.filter(id__in=[job.id for job in stale]).update(
+            status=ReminderJob.Status.DEAD, last_error='Expired before delivery'
+        )
+    return [job for job in jobs if job.scheduled_for >= cutoff]
+
+
+def queue_depth(now=None):
+    """Pending jobs already due (the backlog) and scheduled for later"""
+    now = now or timezone.now()
+    pending = ReminderJob.objects.filter(status=ReminderJob.Status.PENDING)
+    return {
+        'due': pending.filter(due_at__lte=now).count(),
+        'later': pending.filter(due_at__gt=now).count(),
+    }
+
+
+register_collector('reminder_queue', queue_depth)
+
+
+class ReminderDeliveryWorker:
+    """
+    Claims and sends batches, tracking throughput and backing off while the
+    transport is failing.
+
+    Args:
+        transport: Reminder transport (defaults to REMINDER_DELIVERY['TRANSPORT'])
+        batch_size: Jobs claimed per batch
+        concurrency: Sends in flight at once
+    """
+
+    def __init__(self, transport=None, batch_size=None, concurrency=None):
+        options = settings.REMINDER_DELIVERY
+        self.transport = transport or get_reminder_transport()
+        self.batch_size = batch_size or options['BATCH_SIZE']
+        self.concurrency = concurrency or options['CONCURRENCY']
+        self.pause_seconds = 0.0
+        self.sent = 0
+        self.failed = 0
+        self.expired = 0
+        self.send_seconds = 0.0
+
+    def run_batch(self):
+        """
+        Claim, send and record one batch.
+
+        Returns:
+            dict: Counts for the batch plus the pause to take before the next one
+        """
+        now = timezone.now()
+        claimed = claim_batch(self.batch_size, now)
+        jobs = expire_stale(claimed, now)
+
+        start = time.perf_counter()
+        deliveries = [(job, build_reminder(job)) for job in jobs]
+        errors = asyncio.run(send_all(deliveries, self.transport, self.concurrency)) if jobs else []
+        elapsed = time.perf_counter() - start
+        record_results(jobs, errors, timezone.now())
+
+        failed = sum(error is not None for error in errors)
+        self.sent += len(jobs) - failed
+        self.failed += failed
+        self.expired += len(claimed) - len(jobs)
+        self.send_seconds += elapsed
+
+        # Backpressure: pause (doubling) while most of each batch fails
+        options = settings.REMINDER_DELIVERY
+        if jobs and failed * 2 >= len(jobs):
+            self.pause_seconds = min(max(self.pause_seconds * 2, options['PAUSE_SECONDS']), options['MAX_PAUSE_SECONDS'])
+        else:
+            self.pause_seconds = 0.0
+
+        return {
+            'claimed': len(claimed),
+            'sent': len(jobs) - failed,
+            'failed': failed,
+            'expired': len(claimed) - len(jobs),
+            'per_second': round((len(jobs) - failed) / elapsed, 1) if elapsed else None,
+            'pause_seconds': self.pause_seconds,
+        }
+
+    def stats(self):
+        """Totals for this worker since it started"""
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'expired': self.expired,
+            'per_second': round(self.sent / self.send_seconds, 1) if self.send_seconds else None,
+        }
@@ -0,0 +1,253 @@
+# habit and daily reading reminder scheduling.
+# every reminder is a reminder_schedules row indexed by the UTC minute of day
+# of its next occurrence (bucket). Each minute the scheduler reads only that
+# minute's bucket, queues a reminder_jobs row per due reminder for the
+# delivery worker, and moves each schedule to its next local occurrence
+# (recomputed in its own time zone, so DST shifts move it to another bucket).
+# Jobs are due at the bucket minute plus a fixed per-reminder jitter, which
+# spreads the top-of-the-hour rush over REMINDERS['JITTER_SECONDS'].
+
+import logging
+import random
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import ReminderSchedule, ReminderSchedulerState, UserHabit, UserProfile
+from api.utils.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = 'reminders'
+ONE_MINUTE = timedelta(minutes=1)
+
+DISPATCH_SQL = """
+    WITH due AS (
+        SELECT id, user_id, kind, local_time, time_zone, jitter_seconds
+        FROM reminder_schedules
+        WHERE bucket = %(bucket)s AND next_fire_at <= %(minute)s
+    ),
+    queued AS (
+        INSERT INTO reminder_jobs
+            (schedule_id, user_id, kind, scheduled_for, due_at, status, attempts, last_error, created_at)
+        SELECT id, user_id, kind, %(minute)s, %(minute)s + make_interval(secs => jitter_seconds),
+               'pending', 0, '', now()
+        FROM due
+        ON CONFLICT (schedule_id, scheduled_for) DO NOTHING
+        RETURNING 1
+    ),
+    advanced AS (
+        UPDATE reminder_schedules s
+        SET next_fire_at = n.next_fire_at,
+            bucket = (extract(hour FROM n.next_fire_at AT TIME ZONE 'UTC') * 60
+                      + extract(minute FROM n.next_fire_at AT TIME ZONE 'UTC'))::smallint
+        FROM due CROSS JOIN LATERAL (
+            SELECT ((%(minute)s AT TIME ZONE due.time_zone)::date + 1 + due.local_time)
+                   AT TIME ZONE due.time_zone AS next_fire_at
+        ) n
+        WHERE s.id = due.id
+    )
+    SELECT count(*) FROM queued
+"""
+
+
+def is_valid_time_zone(name):
+    """
+    Whether both Python and Postgres know the zone. Schedules are computed in
+    Python and advanced with AT TIME ZONE in SQL, and the two databases
+    differ: zoneinfo also accepts files like right/UTC and posixrules that
+    Postgres rejects.
+    """
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_timezone_names WHERE name = %s", [name])
+        return cursor.fetchone() is not None
+
+
+def next_occurrence(local_time, time_zone, after):
+    """
+    First time after `after` that the wall clock in time_zone reads local_time.
+
+    Returns:
+        datetime: Aware UTC datetime
+    """
+    zone = ZoneInfo(time_zone)
+    local_after = after.astimezone(zone)
+    candidate = datetime.combine(local_after.date(), local_time, tzinfo=zone)
+    if candidate <= local_after:
+        candidate = datetime.combine(local_after.date() + timedelta(days=1), local_time, tzinfo=zone)
+    return candidate.astimezone(dt_timezone.utc)
+
+
+def minute_of_day(moment):
+    """UTC minute of day (the bucket) of an aware datetime"""
+    moment = moment.astimezone(dt_timezone.utc)
+    return moment.hour * 60 + moment.minute
+
+
+def save_schedule(lookup, user_id, kind, local_time, time_zone, now=None):
+    """Create or update a schedule to fire next at local_time in time_zone"""
+    local_time = local_time.replace(second=0, microsecond=0)
+    next_fire_at = next_occurrence(local_time, time_zone, now or timezone.now())
+    schedule = ReminderSchedule.objects.filter(**lookup).first()
+    if schedule is None:
+        schedule = ReminderSchedule(**{
+            'user_id': user_id,
+            'kind': kind,
+            'jitter_seconds': random.randrange(max(settings.REMINDERS['JITTER_SECONDS'], 1)),
+            **lookup,
+        })
+    schedule.local_time = local_time
+    schedule.time_zone = time_zone
+    schedule.next_fire_at = next_fire_at
+    schedule.bucket = minute_of_day(next_fire_at)
+    schedule.save()
+    return schedule
+
+
+def user_time_zone(user_id):
+    profile = UserProfile.objects.filter(user_id=user_id).only('time_zone').first()
+    return profile.time_zone if profile else 'UTC'
+
+
+def sync_habit_reminder(habit, time_zone=None):
+    """Schedule a habit's reminder at its time, or drop it while the habit is skipped"""
+    if habit.skipped:
+        ReminderSchedule.objects.filter(habit=habit).delete()
+        return None
+    return save_schedule(
+        {'habit': habit},
+        habit.user_id,
+        ReminderSchedule.Kind.HABIT,
+        habit.time,
+        time_zone or user_time_zone(habit.user_id),
+    )
+
+
+def sync_profile_reminders(profile):
+    """
+    Schedule the daily reading reminder at notif_hour (or drop it), and move
+    the user's habit reminders to the profile's time zone.
+    """
+    if profile.notif_hour is None:
+        ReminderSchedule.objects.filter(user_id=profile.user_id, kind=ReminderSchedule.Kind.DAILY).delete()
+    else:
+        save_schedule(
+            {'user_id': profile.user_id, 'kind': ReminderSchedule.Kind.DAILY},
+            profile.user_id,
+            ReminderSchedule.Kind.DAILY,
+            time(hour=profile.notif_hour),
+            profile.time_zone,
+        )
+
+    moved = ReminderSchedule.objects.filter(
+        user_id=profile.user_id, kind=ReminderSchedule.Kind.HABIT
+    ).exclude(time_zone=profile.time_zone).select_related('habit')
+    for schedule in moved:
+        sync_habit_reminder(schedule.habit, profile.time_zone)
+
+
+def rebuild_schedules():
+    """
+    Recreate every schedule from habits and profiles (for backfills).
+
+    Returns:
+        int: Schedules written
+    """
+    count = 0
+    for profile in UserProfile.objects.filter(notif_hour__isnull=False).iterator():
+        sync_profile_reminders(profile)
+        count += 1
+    zones = dict(UserProfile.objects.values_list('user_id', 'time_zone'))
+    for habit in UserHabit.objects.iterator():
+        count += sync_habit_reminder(habit, zones.get(habit.user_id, 'UTC')) is not None
+    return count
+
+
+def dispatch_minute(minute):
+    """
+    Queue jobs for every reminder in one minute's bucket and advance them.
+
+    Returns:
+        int: Jobs queued
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(DISPATCH_SQL, {'bucket': minute_of_day(minute), 'minute': minute})
+        return cursor.fetchone()[0]
+
+
+def run_scheduler(now=None):
+    """
+    Dispatch every bucket minute not yet processed, up to the current one.
+
+    A scheduler that fell more than REMINDERS['MAX_CATCHUP_MINUTES'] behind
+    drops the older minutes (those reminders next fire tomorrow) instead of
+    sending a burst of stale reminders. The state row is locked for the run,
+    so concurrent schedulers take turns. Each minute is dispatched in its own
+    savepoint: a minute that fails is logged and skipped rather than rolling
+    back the whole run.
+
+    Returns:
+        dict: Minutes processed, jobs queued, minutes skipped and lag
+    """
+    now = now or timezone.now()
+    current = now.replace(second=0, microsecond=0)
+    with transaction.atomic():
+        state, created = ReminderSchedulerState.objects.select_for_update().get_or_create(
+            name=STATE_NAME, defaults={'processed_through': current - ONE_MINUTE}
+        )
+        first = state.processed_through + ONE_MINUTE
+        oldest = current - (settings.REMINDERS['MAX_CATCHUP_MINUTES'] - 1) * ONE_MINUTE
+        skipped = 0
+        if first < oldest:
+            skipped = (oldest - first) // ONE_MINUTE
+            first = oldest
+
+        minutes = dispatched = 0
+        minute = first
+        while minute <= current:
+            try:
+                with transaction.atomic():
+                    dispatched += dispatch_minute(minute)
+            except Exception as e:
+                logger.error(f"Dispatching reminders for {minute.isoformat()} failed: {str(e)}")
+            minutes += 1
+            minute += ONE_MINUTE
+
+        if minutes:
+            state.processed_through = current
+            state.lag_seconds = (now - first).total_seconds()
+            state.max_lag_seconds = max(state.max_lag_seconds, state.lag_seconds)
+        state.dispatched += dispatched
+        state.skipped_minutes += skipped
+        state.save()
+
+    return {
+        'minutes': minutes,
+        'dispatched': dispatched,
+        'skipped_minutes': skipped,
+        'lag_seconds': state.lag_seconds,
+    }
+
+
+def scheduler_stats():
+    """Scheduler progress, shared by all processes (read from the state row)"""
+    state = ReminderSchedulerState.objects.filter(name=STATE_NAME).first()
+    if state is None:
+        return None
+    return {
+        'processed_through': state.processed_through.isoformat(),
+        'lag_seconds': state.lag_seconds,
+        'max_lag_seconds': state.max_lag_seconds,
+        'dispatched': state.dispatched,
+        'skipped_minutes': state.skipped_minutes,
+    }
+
+
+register_collector('reminder_scheduler', scheduler_stats)
@@ -0,0 +1,647 @@
+# study note listing and sync.
+# listings are newest first in (updated_at, id) pages: each page continues
+# below the last row of the previous one (keyset pagination), so any page is
+# one index range scan on (user, [verse | book,] -updated_at) however many
+# notes the user has.
+# a syncing device keeps an opaque cursor (the updated_at and id of the last
+# change it saw) and asks only for what changed after it: notes are read in
+# (updated_at, id) order off the (user, -updated_at) index, deletions come
+# from study_note_tombstones in (deleted_at, id) order, and the two are merged
+# into one page. A sync costs what changed since the cursor, not the user's
+# whole note history. Tombstones are kept for STUDY_NOTES['TOMBSTONE_DAYS'];
+# an older cursor can't see every deletion and gets a full resync instead.
+# devices coming back online push their queued changes with
+# apply_note_batch(): the whole batch is applied in one transaction with bulk
+# writes, each note keeping whichever version the client changed last.
+# every note carries a row version, bumped by each update. A client that
+# sends back the version its edit is based on gets a compare-and-set: the
+# edit applies only if nobody changed the note since, and update_note() does
+# the check and the write in one UPDATE. Content edits can be sent as a patch
+# (a list of splices) instead of the whole text.
+
+import base64
+import uuid
+from datetime import timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from api.models import StudyNote, StudyNoteTombstone, Verse
+from api.utils.activity import note_deleted, record_activity
+from api.utils.reminders import user_time_zone
+
+datetime_field = serializers.DateTimeField()
+
+
+class SyncCursorExpired(Exception):
+    """The cursor is older than the kept tombstones; the client must resync."""
+
+
+class NoteVersionConflict(Exception):
+    """The note changed after the client's version; `note` is the server copy."""
+
+    def __init__(self, note):
+        super().__init__(f'Note is at version {note.version}')
+        self.note = note
+
+
+def encode_cursor(moment, item_id):
+    raw = f"{moment.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        tuple: (aware datetime, uuid.UUID)
+
+    Raises:
+        ValueError: If the cursor wasn't issued by encode_cursor()
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        moment, item_id = raw.split('|')
+        moment, item_id = parse_datetime(moment), uuid.UUID(item_id)
+    except ValueError:
+        raise ValueError('Invalid cursor')
+    if moment is None or timezone.is_naive(moment):
+        raise ValueError('Invalid cursor')
+    return moment, item_id
+
+
+def after_cursor(field, cursor):
+    """
+    Rows after (moment, id) in (field, id) order. The plain field >= moment
+    bound is what lets the (user, field) index do the work.
+    """
+    moment, item_id = cursor
+    return Q(**{f'{field}__gte': moment}) & (Q(**{f'{field}__gt': moment}) | Q(id__gt=item_id))
+
+
+def before_cursor(field, cursor):
+    """Rows before (moment, id) in (field, id) order (see after_cursor)"""
+    moment, item_id = cursor
+    return Q(**{f'{field}__lte': moment}) & (Q(**{f'{field}__lt': moment}) | Q(id__lt=item_id))
+
+
+def page_size(value):
+    """
+    Parse a requested page size, capped at STUDY_NOTES['MAX_PAGE_SIZE'].
+
+    Raises:
+        ValueError: If value isn't a positive integer
+    """
+    if value in (None, ''):
+        return settings.STUDY_NOTES['PAGE_SIZE']
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        size = 0
+    if size < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(size, settings.STUDY_NOTES['MAX_PAGE_SIZE'])
+
+
+def list_notes(user_id, cursor=None, limit=None, verse_id=None, book_id=None):
+    """
+    One page of a user's notes, newest first.
+
+    Args:
+        user_id: The note owner's id
+        cursor: next_cursor from the previous page, or None for the first
+        limit: Page size (default STUDY_NOTES['PAGE_SIZE'])
+        verse_id: Only notes on this verse
+        book_id: Only notes on verses in this book
+
+    Returns:
+        tuple: (list of StudyNote, cursor for the next page or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    limit = limit or settings.STUDY_NOTES['PAGE_SIZE']
+    notes = StudyNote.objects.filter(user_id=user_id).select_related('verse')
+    if verse_id is not None:
+        notes = notes.filter(verse_id=verse_id)
+    if book_id is not None:
+        notes = notes.filter(book_id=book_id)
+    if cursor:
+        notes = notes.filter(before_cursor('updated_at', decode_cursor(cursor)))
+
+    page = list(notes.order_by('-updated_at', '-id')[:limit + 1])
+    if len(page) <= limit:
+        return page, None
+    last = page[limit - 1]
+    return page[:limit], encode_cursor(last.updated_at, last.id)
+
+
+def note_changes(user_id, cursor=None, limit=None):
+    """
+    Notes changed and deleted after a sync cursor, oldest first.
+
+    Keep calling with the returned cursor while has_more is set. Once caught
+    up, the cursor is held SETTLE_SECONDS behind now, so a note saved by a
+    transaction that commits late is picked up by the next sync (the last few
+    seconds of changes may be sent twice; applying them is idempotent).
+
+    Args:
+        user_id: The syncing user's id
+        cursor: Cursor from the previous sync, or None for everything
+        limit: Most changes to return (default STUDY_NOTES['PAGE_SIZE'])
+
+    Returns:
+        dict: notes (StudyNote list), deleted ({id, deleted_at} in API format),
+            the next cursor and has_more
+
+    Raises:
+        ValueError: If the cursor is malformed
+        SyncCursorExpired: If deletions since the cursor may have been pruned
+    """
+    limit = limit or settings.STUDY_NOTES['PAGE_SIZE']
+    now = timezone.now()
+    notes = StudyNote.objects.filter(user_id=user_id).select_related('verse')
+    tombstones = StudyNoteTombstone.objects.filter(user_id=user_id)
+
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        if after[0] < now - timedelta(days=settings.STUDY_NOTES['TOMBSTONE_DAYS']):
+            raise SyncCursorExpired()
+        notes = notes.filter(after_cursor('updated_at', after))
+        tombstones = tombstones.filter(after_cursor('deleted_at', after))
+
+    changes = sorted(
+        [(note.updated_at, note.id, note) for note in notes.order_by('updated_at', 'id')[:limit + 1]]
+        + [(tomb.deleted_at, tomb.id, tomb) for tomb in tombstones.order_by('deleted_at', 'id')[:limit + 1]],
+        key=lambda change: change[:2],
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    position = changes[-1][:2] if changes else after
+    if not has_more:
+        settled = (now - timedelta(seconds=settings.STUDY_NOTES['SETTLE_SECONDS']), uuid.UUID(int=0))
+        position = min(position, settled) if position else settled
+
+    return {
+        'notes': [item for moment, item_id, item in changes if isinstance(item, StudyNote)],
+        'deleted': [
+            {'id': str(item.id), 'deleted_at': datetime_field.to_representation(item.deleted_at)}
+            for moment, item_id, item in changes if isinstance(item, StudyNoteTombstone)
+        ],
+        'cursor': encode_cursor(*position),
+        'has_more': has_more,
+    }
+
+
+def record_tombstones(user_id, note_ids):
+    """Remember deleted notes for delta syncs (one upsert)"""
+    now = timezone.now()
+    StudyNoteTombstone.objects.bulk_create(
+        [StudyNoteTombstone(id=note_id, user_id=user_id, deleted_at=now) for note_id in note_ids],
+        update_conflicts=True,
+        unique_fields=['id'],
+        update_fields=['deleted_at'],
+    )
+
+
+def prune_tombstones():
+    """
+    Delete tombstones older than STUDY_NOTES['TOMBSTONE_DAYS'].
+
+    Returns:
+        int: Tombstones deleted
+    """
+    cutoff = timezone.now() - timedelta(days=settings.STUDY_NOTES['TOMBSTONE_DAYS'])
+    deleted, _ = StudyNoteTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
+
+
+def parse_client_time(value, name):
+    """
+    Parse an ISO 8601 timestamp from a client, clamped to now (device
+    clocks run ahead, and a future time would win every later conflict).
+
+    Raises:
+        ValueError: If value isn't an ISO 8601 datetime
+    """
+    moment = parse_datetime(str(value))
+    if moment is None:
+        raise ValueError(f'{name} must be an ISO 8601 datetime')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return min(moment, timezone.now())
+
+
+def parse_content_patch(value):
+    """
+    Validate a content patch: a list of splices {at, delete, insert} applied
+    in order, each to the text the previous one produced. A splice removes
+    `delete` characters starting at offset `at` and puts `insert` there.
+    Offsets and lengths count Unicode code points.
+
+    Returns:
+        list: (at, delete, insert) tuples
+
+    Raises:
+        ValueError: If the patch is malformed
+    """
+    max_splices = settings.STUDY_NOTES['MAX_PATCH_SPLICES']
+    if not isinstance(value, list) or not value:
+        raise ValueError('content_patch must be a non-empty list')
+    if len(value) > max_splices:
+        raise ValueError(f'content_patch may have at most {max_splices} splices')
+
+    patch = []
+    for splice in value:
+        if not isinstance(splice, dict):
+            raise ValueError('Each splice must be an object')
+        at, delete, insert = splice.get('at'), splice.get('delete', 0), splice.get('insert', '')
+        if any(type(number) is not int or number < 0 for number in (at, delete)):
+            raise ValueError('at and delete must be non-negative integers')
+        if not isinstance(insert, str):
+            raise ValueError('insert must be a string')
+        if not delete and not insert:
+            continue
+        patch.append((at, delete, insert))
+    return patch
+
+
+def apply_content_patch(content, patch):
+    """
+    Apply a parsed content patch to a note's text.
+
+    Raises:
+        ValueError: If a splice reaches past the end of the text
+    """
+    for at, delete, insert in patch:
+        if at + delete > len(content):
+            raise ValueError('content_patch does not fit the note')
+        content = content[:at] + insert + content[at + delete:]
+    return content
+
+
+def content_patch_sql(patch):
+    """
+    The SQL form of apply_content_patch(): an expression for the patched
+    content column, and the shortest stored text every splice fits.
+
+    Returns:
+        tuple: (SQL expression, params, minimum length)
+    """
+    expression, params = 'content', []
+    min_length = growth = 0
+    for at, delete, insert in patch:
+        # A splice fits if the text it sees, the stored text grown by the
+        # splices before it, reaches at + delete
+        min_length = max(min_length, at + delete - growth)
+        growth += len(insert) - delete
+        expression = f'overlay({expression} placing %s from %s for %s)'
+        params += [insert, at + 1, delete]
+    return expression, params, min_length
+
+
+def update_note(user_id, note_id, version, content=None, content_patch=None, **fields):
+    """
+    Compare-and-set update of one note: a single UPDATE that applies only if
+    the note is still at `version`, and bumps the version. A content patch is
+    applied to the stored text by the same statement, so an edit costs no
+    read beforehand. The note is read only to return it, or to report why
+    nothing was updated.
+
+    Args:
+        user_id: The note owner's id
+        note_id: The note's id
+        version: The version the client's edit is based on
+        content: Replacement text
+        content_patch: Parsed splices (see parse_content_patch), instead of content
+        **fields: verse (a Verse or None) and verse_reference
+
+    Returns:
+        StudyNote: The updated note
+
+    Raises:
+        StudyNote.DoesNotExist: If the user has no such note
+        NoteVersionConflict: If the note is no longer at `version`
+        ValueError: If the patch doesn't fit the stored text
+    """
+    now = timezone.now()
+    assignments, params, min_length = [], [], 0
+    if content_patch:
+        expression, patch_params, min_length = content_patch_sql(content_patch)
+        assignments.append(f'content = {expression}')
+        params += patch_params
+    elif content is not None:
+        assignments.append('content = %s')
+        params.append(content)
+    if 'verse' in fields:
+        verse = fields['verse']
+        assignments.append('verse_id = %s, book_id = %s')
+        params += [verse.id, verse.book_id] if verse is not None else [None, None]
+    if 'verse_reference' in fields:
+        assignments.append('verse_reference = %s')
+        params.append(fields['verse_reference'])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE study_notes
+            SET {''.join(assignment + ', ' for assignment in assignments)}
+                version = version + 1, synced_at = %s, updated_at = %s
+            WHERE id = %s AND user_id = %s AND version = %s AND char_length(content) >= %s
+            """,
+            params + [now, now, str(note_id), str(user_id), version, min_length],
+        )
+        updated = cursor.rowcount
+
+    note = StudyNote.objects.select_related('verse').get(id=note_id, user_id=user_id)
+    if not updated:
+        if note.version != version:
+            raise NoteVersionConflict(note)
+        raise ValueError('content_patch does not fit the note')
+    return note
+
+
+class NoteOperation:
+    """
+    One queued offline change to a study note.
+
+    Args:
+        note_id: Client-generated note UUID
+        op: 'upsert' (create or replace) or 'delete'
+        changed_at: When the client made the change (defaults to now)
+        content: Note text (upsert)
+        content_patch: Parsed splices to apply to the stored text, instead
+            of content (needs version)
+        version: The note version the change is based on; when given, the
+            change applies only to that version instead of by changed_at
+        verse_id: Verse primary key, or None to look up by translation + ref
+        translation: Translation code (with ref)
+        ref: BBCCCVVV verse reference (with translation)
+        verse_reference: Human-readable reference
+        created_at: When the client created the note (defaults to changed_at)
+    """
+
+    OPS = ('upsert', 'delete')
+
+    def __init__(self, note_id, op, changed_at=None, content='', verse_id=None, translation=None, ref=None,
+                 verse_reference='', created_at=None, content_patch=None, version=None):
+        self.note_id = note_id
+        self.op = op
+        self.changed_at = changed_at or timezone.now()
+        self.content = content
+        self.content_patch = content_patch
+        self.version = version
+        self.verse_id = verse_id
+        self.translation = translation
+        self.ref = ref
+        self.verse_reference = verse_reference
+        self.created_at = created_at or self.changed_at
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Validate one item of a sync batch: {id, op, updated_at, version,
+        content or content_patch, verse or verse_ref + translation,
+        verse_reference, created_at}.
+
+        Raises:
+            ValueError: If the item is malformed
+        """
+        if not isinstance(data, dict):
+            raise ValueError('Each operation must be an object')
+        try:
+            note_id = uuid.UUID(str(data.get('id')))
+        except ValueError:
+            raise ValueError('id must be a UUID')
+        op = data.get('op', 'upsert')
+        if op not in cls.OPS:
+            raise ValueError(f"op must be one of {', '.join(cls.OPS)}")
+
+        changed_at = parse_client_time(data['updated_at'], 'updated_at') if data.get('updated_at') else None
+        version = data.get('version')
+        if version is not None and (type(version) is not int or version < 1):
+            raise ValueError('version must be a positive integer')
+        if op == 'delete':
+            return cls(note_id, op, changed_at, version=version)
+
+        content, content_patch = data.get('content'), None
+        if data.get('content_patch') is not None:
+            if version is None:
+                raise ValueError('version is required with content_patch')
+            content_patch, content = parse_content_patch(data['content_patch']), ''
+        elif not isinstance(content, str) or not content.strip():
+            raise ValueError('content is required')
+        verse_reference = data.get('verse_reference') or ''
+        if not isinstance(verse_reference, str) or len(verse_reference) > 255:
+            raise ValueError('verse_reference must be a string of at most 255 characters')
+
+        verse_id, ref, translation = data.get('verse'), data.get('verse_ref'), data.get('translation')
+        try:
+            verse_id = int(verse_id) if verse_id else None
+            ref = int(ref) if ref and not verse_id else None
+        except (TypeError, ValueError):
+            raise ValueError('verse and verse_ref must be integers')
+        if ref and not translation:
+            raise ValueError('translation is required with verse_ref')
+
+        created_at = parse_client_time(data['created_at'], 'created_at') if data.get('created_at') else None
+        return cls(note_id, op, changed_at, content, verse_id, str(translation) if ref else None, ref,
+                   verse_reference, created_at, content_patch, version)
+
+
+def resolve_verses(operations):
+    """
+    Verse and book ids for every operation's verse or translation + ref
+    (one query).
+
+    Returns:
+        dict: {(verse_id, translation, ref): (verse id, book id)} for the
+            verses found
+    """
+    verse_ids = {op.verse_id for op in operations if op.verse_id}
+    refs = {(op.translation, op.ref) for op in operations if op.ref}
+    if not verse_ids and not refs:
+        return {}
+
+    found = Verse.objects.filter(
+        Q(id__in=verse_ids)
+        | Q(ref__in={ref for translation, ref in refs}, translation__code__in={translation for translation, ref in refs})
+    ).values_list('id', 'book_id', 'translation__code', 'ref')
+
+    by_id = {verse_id: (verse_id, book_id) for verse_id, book_id, translation, ref in found}
+    by_ref = {(translation, ref): (verse_id, book_id) for verse_id, book_id, translation, ref in found}
+    resolved = {}
+    for op in operations:
+        key = (op.verse_id, op.translation, op.ref)
+        if op.verse_id in by_id:
+            resolved[key] = by_id[op.verse_id]
+        elif (op.translation, op.ref) in by_ref:
+            resolved[key] = by_ref[op.translation, op.ref]
+    return resolved
+
+
+def record_activity_by_day(user_id, created):
+    """
+    Credit notes written offline to the local days they were written, oldest
+    first, so a device that was offline for a week extends the streak day by
+    day instead of crediting the sync day alone. One upsert per day.
+
+    Args:
+        user_id: The notes' owner's id
+        created: The notes' created_at times
+    """
+    zone = ZoneInfo(user_time_zone(user_id))
+    days = {}
+    for moment in created:
+        days.setdefault(moment.astimezone(zone).date(), []).append(moment)
+    for day in sorted(days):
+        record_activity(user_id, min(days[day]), notes=len(days[day]))
+
+
+def apply_note_batch(user_id, operations):
+    """
+    Apply a device's queued note changes in one transaction.
+
+    Last write wins per note: a change applies only if the client made it
+    after the stored copy was last changed (synced_at, the client time of
+    the last synced change, or updated_at for notes written otherwise) and,
+    for a note that was deleted, after the deletion. A change that carries a
+    version applies only if the note is still at that version instead. When
+    one batch changes a note several times the latest change is applied and
+    the others are superseded. Creates, updates and deletes are each one bulk
+    statement.
+
+    A change with a content_patch keeps the note's verse and reference
+    unless it sends new ones.
+
+    Args:
+        user_id: The syncing user's id
+        operations: List of NoteOperation
+
+    Returns:
+        list: One result per operation, in order: {id, status} where status
+            is created, updated, deleted, stale (the server copy is newer),
+            superseded, conflict (the id belongs to another user's note, live
+            or deleted) or invalid (with error). Created, updated and stale
+            results carry the server's note as `note`.
+    """
+    results = [None] * len(operations)
+    latest = {}
+    for index, op in enumerate(operations):
+        previous = latest.get(op.note_id)
+        if previous is not None and op.changed_at < operations[previous].changed_at:
+            results[index] = {'id': str(op.note_id), 'status': 'superseded'}
+            continue
+        if previous is not None:
+            results[previous] = {'id': str(op.note_id), 'status': 'superseded'}
+        latest[op.note_id] = index
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = StudyNote.objects.select_for_update().in_bulk(list(latest))
+        tombstones = {
+            note_id: (owner_id, deleted)
+            for note_id, owner_id, deleted in StudyNoteTombstone.objects.filter(id__in=list(latest))
+            .values_list('id', 'user_id', 'deleted_at')
+        }
+        verses = resolve_verses([operations[index] for index in latest.values()])
+
+        creates, updates, deletes = [], [], []
+        for note_id, index in latest.items():
+            op, note = operations[index], existing.get(note_id)
+            result = results[index] = {'id': str(note_id)}
+            # A tombstone is keyed by the note id alone, so another user's
+            # deleted id can't be reused either
+            owner_id = note.user_id if note is not None else tombstones.get(note_id, (user_id,))[0]
+            if owner_id != user_id:
+                result['status'] = 'conflict'
+                continue
+            last_changed = note and (note.synced_at or note.updated_at)
+            if op.version is not None and (note is None or note.version != op.version):
+                # Changed or deleted since the client's version
+                result['status'] = 'stale'
+                if note is not None:
+                    result['note'] = note
+                continue
+
+            if op.op == 'delete':
+                if note is not None and op.version is None and op.changed_at < last_changed:
+                    result.update(status='stale', note=note)
+                else:
+                    result['status'] = 'deleted'
+                    if note is not None:
+                        deletes.append(note_id)
+                continue
+
+            verse_id, book_id = verses.get((op.verse_id, op.translation, op.ref), (None, None))
+            if (op.verse_id or op.ref) and verse_id is None:
+                result.update(status='invalid', error='Verse not found')
+                continue
+            if note is None and note_id in tombstones and op.changed_at <= tombstones[note_id][1]:
+                result['status'] = 'stale'
+                continue
+            if note is not None and op.version is None and op.changed_at <= last_changed:
+                result.update(status='stale', note=note)
+                continue
+
+            content, verse_reference = op.content, op.verse_reference
+            if op.content_patch:
+                try:
+                    content = apply_content_patch(note.content, op.content_patch)
+                except ValueError as e:
+                    result.update(status='invalid', error=str(e))
+                    continue
+                if not (op.verse_id or op.ref):
+                    verse_id, book_id = note.verse_id, note.book_id
+                verse_reference = verse_reference or note.verse_reference
+
+            fields = {
+                'content': content,
+                'verse_id': verse_id,
+                'book_id': book_id,
+                'verse_reference': verse_reference,
+                'synced_at': op.changed_at,
+                'updated_at': now,
+            }
+            if note is None:
+                note = StudyNote(id=note_id, user_id=user_id, created_at=op.created_at, **fields)
+                creates.append(note)
+                result.update(status='created', note=note)
+            else:
+                for field, value in fields.items():
+                    setattr(note, field, value)
+                # The row is locked, so this is the version the update writes
+                note.version += 1
+                updates.append(note)
+                result.update(status='updated', note=note)
+
+        # Bulk writes skip the model signals, so tombstones and activity
+        # counters are kept here instead
+        if creates:
+            StudyNote.objects.bulk_create(creates)
+            StudyNoteTombstone.objects.filter(id__in=[note.id for note in creates], user_id=user_id).delete()
+            record_activity_by_day(user_id, [note.created_at for note in creates])
+        if updates:
+            StudyNote.objects.bulk_update(
+                updates, ['content', 'verse', 'book', 'verse_reference', 'synced_at', 'updated_at', 'version']
+            )
+        if deletes:
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM study_notes WHERE id = ANY(%s::uuid[])", [[str(note_id) for note_id in deletes]])
+            record_tombstones(user_id, deletes)
+            note_deleted(user_id, len(deletes))
+
+    # Serializing needs each written note's verse (one query)
+    written = StudyNote.objects.select_related('verse').in_bulk(
+        [result['note'].id for result in results if 'note' in result]
+    )
+    for result in results:
+        if 'note' in result:
+            result['note'] = written[result['note'].id]
+    return results
@@ -0,0 +1,163 @@
+# generate fake translations in the scrollmapper JSON, CSV and SQLite layouts
+# so the import pipeline can be benchmarked without hitting GitHub
+
+import csv
+import io
+import random
+import sqlite3
+
+from api.utils.transform_bible_import_data import BOOK_METADATA
+
+# Small vocabulary so generated text has realistic word lengths
+WORDS = [
+    'and', 'the', 'of', 'unto', 'he', 'that', 'in', 'shall', 'lord', 'his',
+    'they', 'be', 'is', 'him', 'not', 'them', 'it', 'with', 'all', 'thou',
+    'thy', 'was', 'god', 'which', 'my', 'me', 'said', 'but', 'ye', 'their',
+    'have', 'for', 'thee', 'will', 'from', 'as', 'are', 'when', 'this', 'out',
+    'were', 'upon', 'man', 'by', 'you', 'israel', 'king', 'son', 'up', 'there',
+]
+
+# Alternate spellings the scrollmapper sources use, to exercise normalize_book_name
+NAME_VARIANTS = {
+    '1 Samuel': 'I Samuel',
+    '2 Samuel': 'II Samuel',
+    '1 Kings': 'I Kings',
+    '2 Kings': 'II Kings',
+    '1 Chronicles': 'I Chronicles',
+    '2 Chronicles': 'II Chronicles',
+    '1 Corinthians': 'I Corinthians',
+    '2 Corinthians': 'II Corinthians',
+    '1 Thessalonians': 'I Thessalonians',
+    '2 Thessalonians': 'II Thessalonians',
+    '1 Timothy': 'I Timothy',
+    '2 Timothy': 'II Timothy',
+    '1 Peter': 'I Peter',
+    '2 Peter': 'II Peter',
+    '1 John': 'I John',
+    '2 John': 'II John',
+    '3 John': 'III John',
+    'Revelation': 'Revelation of John',
+}
+
+
+def generate_bible_json(
+    code='BENCH',
+    books=66,
+    chapters_per_book=25,
+    verses_per_chapter=30,
+    words_per_verse=25,
+    seed=0,
+):
+    """
+    Generate a synthetic translation in the scrollmapper JSON format.
+
+    Args:
+        code: Translation code used in the "translation" string
+        books: Number of books to generate (1-66, taken in canon order)
+        chapters_per_book: Chapters generated for every book
+        verses_per_chapter: Verses generated for every chapter
+        words_per_verse: Average words per verse (actual length varies +/-50%)
+        seed: Random seed so runs are reproducible
+
+    Returns:
+        dict: Same shape as fetch_bible_translation() output
+    """
+    if not 1 <= books <= len(BOOK_METADATA):
+        raise ValueError(f"books must be between 1 and {len(BOOK_METADATA)}")
+
+    rng = random.Random(seed)
+    low = max(1, words_per_verse // 2)
+    high = max(low, words_per_verse + words_per_verse // 2)
+
+    book_names = sorted(BOOK_METADATA, key=lambda name: BOOK_METADATA[name]['canon_order'])
+
+    return {
+        'translation': f'{code}: Synthetic Benchmark Translation',
+        'books': [
+            {
+                'name': NAME_VARIANTS.get(name, name),
+                'chapters': [
+                    {
+                        'chapter': chapter_num,
+                        'verses': [
+                            {
+                                'verse': verse_num,
+                                'text': ' '.join(
+                                    rng.choice(WORDS) for _ in range(rng.randint(low, high))
+                                ).capitalize() + '.',
+                            }
+                            for verse_num in range(1, verses_per_chapter + 1)
+                        ],
+                    }
+                    for chapter_num in range(1, chapters_per_book + 1)
+                ],
+            }
+            for name in book_names[:books]
+        ],
+    }
+
+
+def count_verses(bible_json):
+    """Count the verses in a scrollmapper-format translation."""
+    return sum(
+        len(chapter.get('verses', []))
+        for book in bible_json.get('books', [])
+        for chapter in book.get('chapters', [])
+    )
+
+
+def iter_json_verse_rows(bible_json):
+    """Flatten a scrollmapper-format translation into (book, chapter, verse, text) rows."""
+    for book in bible_json.get('books', []):
+        for chapter in book.get('chapters', []):
+            for verse in chapter.get('verses', []):
+                yield book['name'], chapter['chapter'], verse['verse'], verse['text']
+
+
+def to_csv_text(bible_json):
+    """Render a translation in the scrollmapper CSV layout (Book,Chapter,Verse,Text)."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['Book', 'Chapter', 'Verse', 'Text'])
+    writer.writerows(iter_json_verse_rows(bible_json))
+    return output.getvalue()
+
+
+def write_sqlite_source(bible_json, db_path):
+    """
+    Write a translation in the scrollmapper SQLite layout.
+
+    Creates "translations", "<code>_books" and "<code>_verses" tables.
+
+    Returns:
+        str: The translation code the tables are named after
+    """
+    code, title = [part.strip() for part in bible_json['translation'].split(':', 1)]
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute('CREATE TABLE translations (translation TEXT, title TEXT, license TEXT)')
+        conn.execute(f'CREATE TABLE "{code}_books" (id INTEGER PRIMARY KEY, name TEXT)')
+        conn.execute(
+            f'CREATE TABLE "{code}_verses" '
+            f'(id INTEGER PRIMARY KEY, book_id INTEGER, chapter INTEGER, verse INTEGER, text TEXT)'
+        )
+        conn.execute('INSERT INTO translations VALUES (?, ?, ?)', (code, title, 'Public Domain'))
+
+        book_ids = {}
+        for book_id, book in enumerate(bible_json.get('books', []), start=1):
+            book_ids[book['name']] = book_id
+            conn.execute(f'INSERT INTO "{code}_books" VALUES (?, ?)', (book_id, book['name']))
+
+        conn.executemany(
+            f'INSERT INTO "{code}_verses" (book_id, chapter, verse, text) VALUES (?, ?, ?, ?)',
+            (
+                (book_ids[book_name], chapter, verse, text)
+                for book_name, chapter, verse, text in iter_json_verse_rows(bible_json)
+            )
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    return code
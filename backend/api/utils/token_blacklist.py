@@ -0,0 +1,70 @@
+# expiry-aware pruning and size metrics for simplejwt's token blacklist tables.
+# every issued refresh token leaves an outstanding-token row (and a blacklist
+# row once rotated or logged out); once a token has expired neither row can
+# ever be consulted again, so they are deleted in small batches.
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from api.utils.metrics import register_collector
+
+OUTSTANDING_TABLE = OutstandingToken._meta.db_table
+BLACKLISTED_TABLE = BlacklistedToken._meta.db_table
+
+
+def prune_expired_tokens(batch_size=1000, now=None):
+    """
+    Delete one batch of expired outstanding tokens and their blacklist rows.
+
+    Each batch runs in its own short transaction so pruning never holds locks
+    that refresh requests would queue behind.
+
+    Args:
+        batch_size: Maximum number of outstanding tokens to delete
+        now: Expiry cutoff (defaults to the current time)
+
+    Returns:
+        tuple: (outstanding_deleted, blacklisted_deleted)
+    """
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        # Served by the expires_at index added in api migration 0016
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lt=now)
+            .order_by('expires_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0, 0
+
+        blacklisted, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        outstanding, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+
+    return outstanding, blacklisted
+
+
+def blacklist_table_stats():
+    """
+    Row estimates and on-disk size of the blacklist tables.
+
+    Uses planner statistics (pg_class.reltuples) instead of COUNT(*) so the
+    metric stays cheap on large tables.
+
+    Returns:
+        dict: {table: {'rows': estimated rows, 'bytes': total relation size}}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT relname, GREATEST(reltuples, 0)::bigint, pg_total_relation_size(oid)
+            FROM pg_class
+            WHERE relname IN (%s, %s) AND relkind = 'r'
+            """,
+            [OUTSTANDING_TABLE, BLACKLISTED_TABLE],
+        )
+        return {name: {'rows': rows, 'bytes': size} for name, rows, size in cursor.fetchall()}
+
+
+register_collector('token_blacklist', blacklist_table_stats)
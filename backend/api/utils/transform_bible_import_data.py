@@ -234,3 +234,72 @@ def transform_bible_data(bible_json):
         'translation': translation_data,
         'books': books_data
     }
+
+
+def transform_verse_rows(translation_string, verse_rows):
+    """
+    Transform flat verse rows (from the CSV or SQLite readers) into the same
+    structure transform_bible_data() returns.
+
+    Rows are consumed as a stream, so the reader never has to materialize the
+    whole source. Book names are normalized once per distinct source name.
+
+    Args:
+        translation_string: String in format "CODE: Name Description"
+        verse_rows: Iterable of (book_name, chapter, verse_num, text) tuples
+
+    Returns:
+        dict: Same shape as transform_bible_data()
+    """
+    code, name = parse_translation_string(translation_string)
+
+    # source book name -> book entry (None for books without metadata)
+    books_by_source_name = {}
+    # normalized name -> book entry, so variant spellings share one book
+    books_by_name = {}
+
+    for book_name, chapter_num, verse_num, text in verse_rows:
+        book_entry = books_by_source_name.get(book_name, False)
+
+        if book_entry is False:
+            normalized_name = normalize_book_name(book_name)
+
+            if normalized_name not in BOOK_METADATA:
+                print(f"Warning: No metadata found for book '{book_name}' (normalized: '{normalized_name}'), skipping...")
+                book_entry = None
+            elif normalized_name in books_by_name:
+                book_entry = books_by_name[normalized_name]
+            else:
+                metadata = BOOK_METADATA[normalized_name]
+                book_entry = {
+                    'book_data': {
+                        'name': normalized_name,
+                        'canon_order': metadata['canon_order'],
+                        'short_name': metadata['short_name'],
+                        'testament': metadata['testament']
+                    },
+                    'verses': []
+                }
+                books_by_name[normalized_name] = book_entry
+
+            books_by_source_name[book_name] = book_entry
+
+        if book_entry is None:
+            continue
+
+        text = text or ''
+        book_entry['verses'].append({
+            'chapter': int(chapter_num),
+            'verse_num': int(verse_num),
+            'text': text,
+            'text_len': len(text),
+            'tokens_json': None
+        })
+
+    return {
+        'translation': {
+            'code': code,
+            'name': name
+        },
+        'books': list(books_by_name.values())
+    }
@@ -0,0 +1,163 @@
+# bounded per-process TTL cache of authenticated users.
+# JWT authentication looks users up here before hitting custom_user.
+# saves/deletes of CustomUser invalidate the local entry and are broadcast
+# through the shared Django cache so other worker processes drop theirs
+# within AUTH_USER_CACHE['INVALIDATION_POLL_SECONDS'].
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.fields.files import FieldFile
+
+from api.utils.metrics import register_collector
+
+SEQUENCE_KEY = 'auth_user_cache:seq'
+INVALIDATION_KEY = 'auth_user_cache:inv:{}'
+# Invalidation records older than this are gone; a process that falls further
+# behind clears everything instead of replaying them
+INVALIDATION_RETENTION_SECONDS = 300
+MAX_REPLAY = 1000
+
+
+def stored_value(user, name):
+    """
+    A field's value as loaded from the database. Files are kept by name: a
+    FieldFile is bound to one instance and would be shared by every hit.
+    """
+    value = getattr(user, name)
+    return value.name if isinstance(value, FieldFile) else value
+
+
+class UserCache:
+    """
+    LRU cache of user field values keyed by user id.
+
+    Entries hold raw field values rather than model instances, so every hit
+    returns a fresh instance that views can mutate safely.
+    """
+
+    def __init__(self, max_entries, ttl, poll_interval):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.last_poll = 0.0
+        self.last_seq = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id):
+        """Return a fresh user instance for user_id, or None on a miss"""
+        self.sync_invalidations()
+        key = str(user_id)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            model, field_names, values = entry[1]
+
+        return model.from_db(None, field_names, values)
+
+    def set(self, user):
+        """Cache a user loaded from the database"""
+        fields = user._meta.concrete_fields
+        field_names = [field.attname for field in fields]
+        values = [stored_value(user, name) for name in field_names]
+        expires = time.monotonic() + self.ttl
+
+        with self.lock:
+            self.entries[str(user.pk)] = (expires, (type(user), field_names, values))
+            self.entries.move_to_end(str(user.pk))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id, broadcast=True):
+        """Drop a user locally and (by default) tell other processes to drop it too"""
+        self.discard(str(user_id))
+
+        if broadcast:
+            cache.add(SEQUENCE_KEY, 0, timeout=None)
+            # incr is not atomic on every backend (DatabaseCache reads then
+            # writes), so claim the record with add and move on if another
+            # process got the same number
+            while True:
+                seq = cache.incr(SEQUENCE_KEY)
+                if cache.add(INVALIDATION_KEY.format(seq), str(user_id), INVALIDATION_RETENTION_SECONDS):
+                    break
+
+    def discard(self, key):
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def sync_invalidations(self):
+        """Apply invalidations broadcast by other processes (at most once per poll interval)"""
+        now = time.monotonic()
+        if now - self.last_poll < self.poll_interval:
+            return
+        self.last_poll = now
+
+        seq = cache.get(SEQUENCE_KEY, 0)
+        if self.last_seq is None or seq < self.last_seq:
+            # First poll (nothing cached yet that predates it) or the shared cache was reset
+            if self.last_seq is not None:
+                self.clear()
+            self.last_seq = seq
+            return
+
+        if seq == self.last_seq:
+            return
+
+        if seq - self.last_seq > MAX_REPLAY:
+            self.clear()
+        else:
+            keys = [INVALIDATION_KEY.format(n) for n in range(self.last_seq + 1, seq + 1)]
+            found = cache.get_many(keys)
+            if len(found) < len(keys):
+                # Some records expired before we saw them
+                self.clear()
+            else:
+                for user_id in found.values():
+                    self.discard(user_id)
+
+        self.last_seq = seq
+
+    def stats(self):
+        """Hit-rate and size metrics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+user_cache = UserCache(
+    max_entries=settings.AUTH_USER_CACHE['MAX_ENTRIES'],
+    ttl=settings.AUTH_USER_CACHE['TTL_SECONDS'],
+    poll_interval=settings.AUTH_USER_CACHE['INVALIDATION_POLL_SECONDS'],
+)
+
+register_collector('auth_user_cache', user_cache.stats)
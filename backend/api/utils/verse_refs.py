@@ -0,0 +1,54 @@
+# canonical integer verse references in BBCCCVVV form
+# (book canon order, chapter, verse), e.g. John 3:16 -> 43003016.
+# they depend only on the canon, so clients can compute them offline and
+# they survive reimports that change Verse.id.
+
+BOOK_MULTIPLIER = 1_000_000
+CHAPTER_MULTIPLIER = 1_000
+
+
+def make_verse_ref(canon_order, chapter, verse_num):
+    """
+    Build the BBCCCVVV reference for a verse.
+
+    Args:
+        canon_order: Book canon order (1-66)
+        chapter: Chapter number (1-999)
+        verse_num: Verse number (1-999)
+
+    Returns:
+        int: Encoded reference
+
+    Raises:
+        ValueError: If any part is out of range
+    """
+    if not 1 <= canon_order <= 99:
+        raise ValueError(f"Book canon order out of range: {canon_order}")
+    if not 1 <= chapter <= 999:
+        raise ValueError(f"Chapter out of range: {chapter}")
+    if not 1 <= verse_num <= 999:
+        raise ValueError(f"Verse number out of range: {verse_num}")
+
+    return canon_order * BOOK_MULTIPLIER + chapter * CHAPTER_MULTIPLIER + verse_num
+
+
+def parse_verse_ref(ref):
+    """
+    Split a BBCCCVVV reference into its parts.
+
+    Args:
+        ref: Encoded reference
+
+    Returns:
+        tuple: (canon_order, chapter, verse_num)
+
+    Raises:
+        ValueError: If the reference is not a valid encoding
+    """
+    canon_order, rest = divmod(ref, BOOK_MULTIPLIER)
+    chapter, verse_num = divmod(rest, CHAPTER_MULTIPLIER)
+
+    # Round-trip through make_verse_ref to validate every part
+    make_verse_ref(canon_order, chapter, verse_num)
+
+    return canon_order, chapter, verse_num
@@ -0,0 +1,111 @@
+# content-addressed storage for verse text.
+# identical verse texts across translations are stored once in verse_texts
+# and referenced from verses.text_id instead of being repeated per row.
+
+import hashlib
+
+from django.db import connection, transaction
+
+from api.models import VerseText
+
+
+def text_digest(text):
+    """SHA-256 digest of the UTF-8 encoded text (matches Postgres sha256(convert_to(text, 'UTF8')))."""
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+def intern_texts(texts, batch_size=1000):
+    """
+    Make sure every text has a VerseText row and return their ids.
+
+    Existing texts are looked up by digest first so only new wording is sent
+    to the database; concurrent imports are tolerated via ignore_conflicts.
+
+    Args:
+        texts: Iterable of verse texts (duplicates allowed)
+        batch_size: Digests per lookup / rows per insert
+
+    Returns:
+        dict: {text: VerseText id}
+    """
+    digests = {text: text_digest(text) for text in set(texts)}
+    ids_by_digest = lookup_digests(list(digests.values()), batch_size)
+
+    missing = [
+        VerseText(digest=digest, text=text)
+        for text, digest in digests.items()
+        if digest not in ids_by_digest
+    ]
+    if missing:
+        VerseText.objects.bulk_create(missing, batch_size=batch_size, ignore_conflicts=True)
+        ids_by_digest.update(lookup_digests([vt.digest for vt in missing], batch_size))
+
+    return {text: ids_by_digest[digest] for text, digest in digests.items()}
+
+
+def lookup_digests(digests, batch_size=1000):
+    """Return {digest: id} for the digests that already exist."""
+    ids_by_digest = {}
+    for start in range(0, len(digests), batch_size):
+        rows = VerseText.objects.filter(
+            digest__in=digests[start:start + batch_size]
+        ).values_list('digest', 'id')
+        ids_by_digest.update((bytes(digest), pk) for digest, pk in rows)
+    return ids_by_digest
+
+
+def dedup_existing_verses():
+    """
+    Move inline verse text into verse_texts with set-based SQL.
+
+    Returns:
+        int: Number of verses converted
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO verse_texts (digest, text)
+            SELECT DISTINCT sha256(convert_to(text, 'UTF8')), text
+            FROM verses
+            WHERE text_id IS NULL
+            ON CONFLICT (digest) DO NOTHING
+        """)
+        cursor.execute("""
+            UPDATE verses v
+            SET text_id = vt.id, text = ''
+            FROM verse_texts vt
+            WHERE v.text_id IS NULL
+              AND vt.digest = sha256(convert_to(v.text, 'UTF8'))
+        """)
+        return cursor.rowcount
+
+
+def inline_deduped_verses():
+    """
+    Copy shared text back onto each verse row and clear text_id.
+
+    Returns:
+        int: Number of verses converted
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE verses v
+            SET text = vt.text, text_id = NULL
+            FROM verse_texts vt
+            WHERE v.text_id = vt.id
+        """)
+        return cursor.rowcount
+
+
+def prune_unreferenced_texts():
+    """
+    Delete verse_texts rows no verse points at (left behind by reimports).
+
+    Returns:
+        int: Number of rows deleted
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            DELETE FROM verse_texts vt
+            WHERE NOT EXISTS (SELECT 1 FROM verses v WHERE v.text_id = vt.id)
+        """)
+        return cursor.rowcount
@@ -7,32 +7,49 @@ from django.contrib.auth.tokens import default_token_generator
 from django.utils import timezone
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
+from django.views.decorators.cache import cache_control
 
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import RetrieveUpdateAPIView
 from rest_framework import status
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework_simplejwt.exceptions import TokenError
 
 from django.contrib.auth.password_validation import validate_password
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 
 from django_ratelimit.decorators import ratelimit
 
+from api.authentication import ClaimsJWTAuthentication
 from api.models import CustomUser
-from api.utils.email import send_verification_email
+from api.utils.dashboard import get_dashboard
+from api.utils.email_outbox import enqueue_verification_email
+from api.utils.google_certs import google_cert_cache
+from api.utils.metrics import collect_metrics
+from api.utils.note_search import search_notes
+from api.utils.password_hashing import PasswordHashingBusy
+from api.utils.reading_history import reading_events, reading_history
+from api.utils.recent_verses import ViewEvent, chapter_entry, record_views
+from api.utils.refresh_tokens import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from api.utils.study_notes import (
+    NoteOperation,
+    NoteVersionConflict,
+    SyncCursorExpired,
+    apply_note_batch,
+    list_notes,
+    note_changes,
+    page_size,
+    update_note,
+)
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
     UserSerializer,
     HabitSerializer,
     RecentVerseSerializer,
-    DashboardSerializer,
     StudyNoteSerializer,
+    StudyNotePatchSerializer,
     UserProfileSerializer,
     TranslationSerializer,
     BookSerializer,
@@ -59,6 +76,12 @@ def health_check(request):
         'database_connected': db_connected
     })
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """In-process metrics (cache hit rates, counters) for this worker."""
+    return Response(collect_metrics(), status=status.HTTP_200_OK)
+
 class GoogleLoginView(APIView):
     """Verifies Google OAuth token, creates user, and returns JWTs."""
 
@@ -68,12 +91,8 @@ class GoogleLoginView(APIView):
             return Response({'error': 'Token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # Verify token and extract user info
-            idinfo = id_token.verify_oauth2_token(
-                token,
-                google_requests.Request(),
-                settings.GOOGLE_CLIENT_ID
-            )
+            # Verify token against the cached Google certificates and extract user info
+            idinfo = google_cert_cache.verify(token, settings.GOOGLE_CLIENT_ID)
 
             email = idinfo.get('email')
             if not email:
@@ -86,7 +105,7 @@ class GoogleLoginView(APIView):
                 user.save()
 
             # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = issue_refresh_token(user)
             access = str(refresh.access_token)
 
             # Optionally set refresh token as HttpOnly cookie
@@ -108,34 +127,35 @@ class GoogleLoginView(APIView):
         except ValueError:
             return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
 
+
+def hashing_busy_response():
+    """503 for logins/signups rejected because the password hashing pool is full."""
+    response = Response({
+        'error': 'Too many sign-in attempts right now. Please try again.'
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = '1'
+    return response
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register(request):
     serializer = UserRegistrationSerializer(data=request.data)
     if serializer.is_valid():
-        user = serializer.save()
-
-        # Try to send verification email
-        email_success, email_error = send_verification_email(user)
-
-        if email_success:
-            # Update last_verification_email_sent timestamp
-            user.last_verification_email_sent = timezone.now()
-            user.save()
+        try:
+            # The verification email is queued in the same transaction as the
+            # user and sent by the deliver_emails worker
+            with transaction.atomic():
+                user = serializer.save()
+                enqueue_verification_email(user)
+        except PasswordHashingBusy:
+            return hashing_busy_response()
 
-            return Response({
-                'message': 'User registered successfully. Please check your email to verify your account.',
-                'email_sent': True,
-                'user': UserSerializer(user).data
-            }, status=status.HTTP_201_CREATED)
-        else:
-            # Account created but email failed
-            return Response({
-                'message': 'Account created, but verification email failed to send.',
-                'email_sent': False,
-                'email_error': email_error,
-                'user': UserSerializer(user).data
-            }, status=status.HTTP_201_CREATED)
+        return Response({
+            'message': 'User registered successfully. Please check your email to verify your account.',
+            'email_sent': True,
+            'user': UserSerializer(user).data
+        }, status=status.HTTP_201_CREATED)
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -145,21 +165,21 @@ def register(request):
 @permission_classes([AllowAny])
 def login_view(request):
     serializer = UserLoginSerializer(data=request.data)
-    if serializer.is_valid():
+    try:
+        is_valid = serializer.is_valid()
+    except PasswordHashingBusy:
+        return hashing_busy_response()
+    if is_valid:
         user = serializer.validated_data['user']
         remember_me = serializer.validated_data.get('remember_me', False)
         
         # Update last login
         login(request, user)
         
-        # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        # Generate tokens (refresh token lifetime based on remember_me)
+        refresh = issue_refresh_token(user, lifetime=timedelta(days=30) if remember_me else None)
         access_token = refresh.access_token
         
-        # Set refresh token lifetime based on remember_me
-        if remember_me:
-            refresh.set_exp(lifetime=timedelta(days=30))
-        
         response = Response({
             'access_token': str(access_token),
             'user': UserSerializer(user).data
@@ -188,18 +208,9 @@ def refresh_token_view(request): # Step 9 (Last) - Refresh tokens:
         return Response({'error': 'Refresh token not found'}, status=status.HTTP_401_UNAUTHORIZED)
     
     try:
-        refresh = RefreshToken(refresh_token)
-        access_token = refresh.access_token
-
-        # Get user object from the token payload
-        user_id = refresh.payload.get('user_id')
-        try:
-            user = CustomUser.objects.get(id=user_id)
-        except CustomUser.DoesNotExist:
-            return Response({'error': 'User not found'}, status=status.HTTP_401_UNAUTHORIZED)
-
-        # Rotate refresh token
-        new_refresh = RefreshToken.for_user(user)
+        # Rotate within the token family: one UPDATE, no user lookup
+        new_refresh = rotate_refresh_token(refresh_token)
+        access_token = new_refresh.access_token
         
         response = Response({
             'access_token': str(access_token)
@@ -209,7 +220,7 @@ def refresh_token_view(request): # Step 9 (Last) - Refresh tokens:
         response.set_cookie(
             'refresh_token',
             str(new_refresh),
-            max_age=7 * 24 * 60 * 60,  # 7 days default
+            max_age=new_refresh.lifetime_seconds(),  # 7 days default, 30 with remember_me
             httponly=True,
             secure=not settings.DEBUG,
             samesite='Lax'
@@ -226,8 +237,7 @@ def logout_view(request):
     try:
         refresh_token = request.COOKIES.get('refresh_token')
         if refresh_token:
-            token = RefreshToken(refresh_token)
-            token.blacklist()
+            revoke_refresh_token(refresh_token)
         
         response = Response({'message': 'Logged out successfully'}, status=status.HTTP_200_OK)
         response.delete_cookie('refresh_token')
@@ -276,7 +286,7 @@ def recent_verses_view(request):
         try:
             recent_verses = RecentVerse.objects.filter(
                 user=request.user
-            ).select_related('verse', 'book').order_by('-last_accessed')[:2]
+            ).select_related('verse__text_ref', 'book').order_by('-last_accessed')[:2]
 
             serializer = RecentVerseSerializer(recent_verses, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -289,45 +299,33 @@ def recent_verses_view(request):
 
     elif request.method == 'POST':
         try:
-            verse_id = request.data.get('verse_id')
-
-            if not verse_id:
+            try:
+                event = ViewEvent.from_data(request.data)
+            except ValueError as e:
                 return Response(
-                    {'error': 'verse_id is required'},
+                    {'error': str(e)},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            try:
-                verse = Verse.objects.select_related('book').get(id=verse_id)
-            except Verse.DoesNotExist:
+            # The list updates now so "continue reading" is current; history
+            # and rollups catch up from the event log
+            entries = record_views(request.user.pk, [event])
+            if entries:
+                reading_events.record(request.user.pk, [event])
+                return Response(entries[0], status=status.HTTP_201_CREATED)
+
+            # Nothing written: an unknown verse, or a view (with an older
+            # viewed_at) that doesn't displace the stored entries
+            found, entry = chapter_entry(request.user.pk, event)
+            if not found:
                 return Response(
                     {'error': 'Verse not found'},
                     status=status.HTTP_404_NOT_FOUND
                 )
-
-            with transaction.atomic():
-                recent_verse, created = RecentVerse.objects.update_or_create(
-                    user=request.user,
-                    book=verse.book,
-                    chapter=verse.chapter,
-                    defaults={
-                        'verse': verse
-                    }
-                )
-
-                if created:
-                    user_recent_count = RecentVerse.objects.filter(user=request.user).count()
-
-                    if user_recent_count > 2:
-                        oldest = RecentVerse.objects.filter(
-                            user=request.user
-                        ).order_by('last_accessed').first()
-
-                        if oldest and oldest.id != recent_verse.id:
-                            oldest.delete()
-
-            serializer = RecentVerseSerializer(recent_verse)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            reading_events.record(request.user.pk, [event])
+            if entry is None:
+                return Response({'received': 1}, status=status.HTTP_202_ACCEPTED)
+            return Response(entry, status=status.HTTP_200_OK)
 
         except Exception as e:
             return Response(
@@ -336,24 +334,71 @@ def recent_verses_view(request):
             )
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@ratelimit(key='user', rate='30/m', method='POST')
+def recent_verses_batch_view(request):
+    """
+    Record several verse views at once, e.g. a reader's buffered page turns or
+    views queued while offline. Body: {"events": [{verse_id | verse_ref +
+    translation, viewed_at?}, ...]}. Views are appended to the reading event
+    log; recent verses and history reflect them after the next rollup.
+    Unknown verses are dropped.
+    """
+    events = request.data.get('events')
+    max_batch = settings.RECENT_VERSES['MAX_BATCH']
+    if not isinstance(events, list) or not events:
+        return Response(
+            {'error': 'events must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(events) > max_batch:
+        return Response(
+            {'error': f'At most {max_batch} events per batch'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        events = [ViewEvent.from_data(event) for event in events]
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        reading_events.record(request.user.pk, events)
+        return Response({'received': len(events)}, status=status.HTTP_202_ACCEPTED)
+
+    except Exception as e:
+        return Response(
+            {'error': 'Server error'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 @ratelimit(key='user', rate='60/m', method='GET')
-def dashboard_view(request):
+def reading_history_view(request):
+    """Books the user has read, with chapter and read counts (from the rollups)."""
     try:
-        habit = UserHabit.objects.filter(user=request.user).first()
+        return Response(reading_history(request.user.pk), status=status.HTTP_200_OK)
 
-        recent_verses = RecentVerse.objects.filter(
-            user=request.user
-        ).select_related('verse', 'book').order_by('-last_accessed')[:2]
+    except Exception as e:
+        return Response(
+            {'error': 'Server error'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-        dashboard_data = {
-            'current_habit': habit,
-            'recent_verses': recent_verses
-        }
 
-        serializer = DashboardSerializer(dashboard_data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@ratelimit(key='user', rate='60/m', method='GET')
+def dashboard_view(request):
+    try:
+        # Cached per user; a miss is assembled in one query (api/utils/dashboard.py)
+        return Response(get_dashboard(request.user.pk), status=status.HTTP_200_OK)
 
     except Exception as e:
         return Response(
@@ -373,14 +418,174 @@ def study_notes(request):
     if request.method == 'POST':
         serializer = StudyNoteSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save()
+            # The activity counters are updated in the same transaction
+            with transaction.atomic():
+                serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'GET':
-        notes = StudyNote.objects.filter(user=request.user).order_by('-updated_at')
-        serializer = StudyNoteSerializer(notes, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Newest first, one page (?limit=) at a time; ?verse= and ?book= filter.
+        # The next page's URL is in the Link header.
+        filters = {}
+        for name in ('verse', 'book'):
+            value = request.query_params.get(name)
+            if value:
+                if not value.isdigit():
+                    return Response({'error': f'{name} must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+                filters[f'{name}_id'] = int(value)
+
+        try:
+            limit = page_size(request.query_params.get('limit'))
+            notes, next_cursor = list_notes(request.user.pk, request.query_params.get('cursor'), limit, **filters)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = Response(StudyNoteSerializer(notes, many=True).data, status=status.HTTP_200_OK)
+        if next_cursor:
+            query = request.query_params.copy()
+            query['cursor'] = next_cursor
+            response['Link'] = f'<{request.build_absolute_uri(request.path)}?{query.urlencode()}>; rel="next"'
+        return response
+
+
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+@ratelimit(key='user', rate='120/m', method='PATCH')
+def study_note_detail(request, note_id):
+    """
+    Conditionally edit a note. Body: {version, content | content_patch,
+    verse | verse_ref + translation, verse_reference}, where version is the
+    one the edit is based on and content_patch is a list of {at, delete,
+    insert} splices against that version's text. 409 means the note changed
+    since; the response carries the server copy to merge against.
+    """
+    serializer = StudyNotePatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        note = update_note(request.user.pk, note_id, **serializer.validated_data)
+        return Response(StudyNoteSerializer(note).data, status=status.HTTP_200_OK)
+
+    except StudyNote.DoesNotExist:
+        return Response({'error': 'Note not found'}, status=status.HTTP_404_NOT_FOUND)
+    except NoteVersionConflict as e:
+        return Response(
+            {'error': 'Note has changed', 'note': StudyNoteSerializer(e.note).data},
+            status=status.HTTP_409_CONFLICT
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response(
+            {'error': 'Server error'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@ratelimit(key='user', rate='30/m', method='POST')
+def study_notes_batch_view(request):
+    """
+    Apply a device's queued note changes in one request. Body: {"operations":
+    [{id, op: upsert | delete, updated_at, version?, content | content_patch,
+    verse | verse_ref + translation, verse_reference?, created_at?}, ...]}
+    with client-generated ids. The batch is applied in one transaction, last
+    write wins per note unless an operation names the version it's based on;
+    the response has one result per operation (see apply_note_batch).
+    """
+    operations = request.data.get('operations')
+    max_batch = settings.STUDY_NOTES['MAX_BATCH']
+    if not isinstance(operations, list) or not operations:
+        return Response(
+            {'error': 'operations must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(operations) > max_batch:
+        return Response(
+            {'error': f'At most {max_batch} operations per batch'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        operations = [NoteOperation.from_data(operation) for operation in operations]
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        results = apply_note_batch(request.user.pk, operations)
+        for result in results:
+            if 'note' in result:
+                result['note'] = StudyNoteSerializer(result['note']).data
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response(
+            {'error': 'Server error'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@ratelimit(key='user', rate='60/m', method='GET')
+def study_notes_search_view(request):
+    """
+    Search the user's notes (and the verses they're on). ?q= takes web-style
+    terms ("phrases", OR, -word); ?limit= caps the matches. Results are best
+    first, each with HTML snippets of the note and, if it matched, its verse.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(query) > 200:
+        return Response({'error': 'q must be at most 200 characters'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = page_size(request.query_params.get('limit'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        matches = search_notes(request.user.pk, query, limit)
+        for match in matches:
+            match['note'] = StudyNoteSerializer(match['note']).data
+        return Response({'results': matches}, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response(
+            {'error': 'Server error'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@ratelimit(key='user', rate='60/m', method='GET')
+def study_note_changes(request):
+    """
+    Delta sync: notes changed and deleted since ?cursor= (omit it for a
+    first sync), at most ?limit= per page. Repeat with the returned cursor
+    while has_more is set. 410 means the cursor is too old; sync from scratch.
+    """
+    try:
+        limit = page_size(request.query_params.get('limit'))
+        changes = note_changes(request.user.pk, request.query_params.get('cursor'), limit)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except SyncCursorExpired:
+        return Response({'error': 'Cursor expired, sync from scratch'}, status=status.HTTP_410_GONE)
+
+    return Response({
+        'notes': StudyNoteSerializer(changes['notes'], many=True).data,
+        'deleted': changes['deleted'],
+        'cursor': changes['cursor'],
+        'has_more': changes['has_more'],
+    }, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -466,24 +671,16 @@ def resend_verification(request):
                 'error': f'Verification email was recently sent. Please wait {minutes_left} more minute(s) before requesting another.'
             }, status=status.HTTP_429_TOO_MANY_REQUESTS)
 
-    # Try to send verification email
-    email_success, email_error = send_verification_email(user)
+    # Queue the verification email; the worker sends it and sets
+    # last_verification_email_sent
+    enqueue_verification_email(user)
 
-    if email_success:
-        # Update last_verification_email_sent timestamp only on success
-        user.last_verification_email_sent = timezone.now()
-        user.save()
+    return Response({
+        'message': 'Verification email sent. Please check your inbox and spam folder.',
+        'email_sent': True
+    }, status=status.HTTP_200_OK)
 
-        return Response({
-            'message': 'Verification email sent. Please check your inbox and spam folder.',
-            'email_sent': True
-        }, status=status.HTTP_200_OK)
 
-    # Don't update timestamp so user can retry immediately
-    return Response({
-        'error': 'Failed to send verification email. Please try again.',
-        'email_error': email_error
-    }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated]) # ← Requires valid JWT token
 @ratelimit(key='user', rate='60/m', method='ALL')
@@ -495,7 +692,8 @@ def habits(request): #STEP 6: Read Line 364
     elif request.method == 'POST':
         serializer = HabitSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user) # ← Links habit to authenticated user
+            with transaction.atomic():
+                serializer.save(user=request.user) # ← Links habit to authenticated user
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 #  NEXT Go to Database Model: backend/api/models.py:109-129
@@ -564,7 +762,9 @@ def upload_avatar(request):
     )
 
 
+@cache_control(private=True, max_age=settings.CONTENT_CACHE_SECONDS)
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])
 @ratelimit(key='user', rate='60/m', method='GET')
 def translations_list(request):
@@ -576,7 +776,9 @@ def translations_list(request):
     }, status=status.HTTP_200_OK)
 
 
+@cache_control(private=True, max_age=settings.CONTENT_CACHE_SECONDS)
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])
 @ratelimit(key='user', rate='60/m', method='GET')
 def books_list(request):
@@ -606,7 +808,9 @@ def books_list(request):
     }, status=status.HTTP_200_OK)
 
 
+@cache_control(private=True, max_age=settings.CONTENT_CACHE_SECONDS)
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])
 @ratelimit(key='user', rate='60/m', method='GET')
 def chapters_list(request):
@@ -659,12 +863,15 @@ def chapters_list(request):
     }, status=status.HTTP_200_OK)
 
 
+@cache_control(private=True, max_age=settings.CONTENT_CACHE_SECONDS)
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def verses_list(request):
     """
     Get verses for a selected translation, book, and chapter.
     Optionally filter to a specific verse number.
+    A BBCCCVVV ref can be passed instead of book/chapter/verse.
     """
     # Validate query parameters using serializer
     params_serializer = VerseQueryParamsSerializer(data=request.query_params)
@@ -677,9 +884,10 @@ def verses_list(request):
 
     # Extract validated data
     translation_code = params_serializer.validated_data['translation']
-    book_id = params_serializer.validated_data['book']
-    chapter = params_serializer.validated_data['chapter']
+    book_id = params_serializer.validated_data.get('book')
+    chapter = params_serializer.validated_data.get('chapter')
     verse_num = params_serializer.validated_data.get('verse')
+    verse_ref = params_serializer.validated_data.get('ref')
 
     # Validate translation exists
     try:
@@ -689,6 +897,23 @@ def verses_list(request):
             'error': f'Translation "{translation_code}" not found.'
         }, status=status.HTTP_404_NOT_FOUND)
 
+    # A ref identifies a single verse directly through the (translation, ref) index
+    if verse_ref is not None:
+        verses = list(Verse.objects.filter(
+            translation=translation,
+            ref=verse_ref
+        ).select_related('book', 'translation', 'text_ref'))
+
+        if not verses:
+            return Response({
+                'error': f'Verse {verse_ref} not found in {translation_code}.'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = VerseSerializer(verses, many=True)
+        return Response({
+            'verses': serializer.data
+        }, status=status.HTTP_200_OK)
+
     # Validate book exists
     try:
         book = Book.objects.get(id=book_id)
@@ -702,7 +927,7 @@ def verses_list(request):
         translation=translation,
         book=book,
         chapter=chapter
-    ).select_related('book', 'translation').order_by('verse_num')
+    ).select_related('book', 'translation', 'text_ref').order_by('verse_num')
 
     # If specific verse is requested, filter to just that verse
     if verse_num is not None:
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'api',
 ]
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'api.utils.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -109,6 +111,29 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing (see api/utils/password_hashing.py). ALGORITHM picks the
+# hasher for new hashes: 'pbkdf2_sha256' or the memory-hard 'scrypt'. Existing
+# hashes are upgraded on login whenever the algorithm or cost changes. Run
+# manage.py tune_password_hashing to pick costs for a latency target.
+PASSWORD_HASHING = {
+    'ALGORITHM': os.environ.get('PASSWORD_HASH_ALGORITHM', 'pbkdf2_sha256'),
+    'PBKDF2_ITERATIONS': int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', '870000')),
+    'SCRYPT_WORK_FACTOR': int(os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', str(2 ** 14))),
+    # Per process: hashes running at once, and hashes allowed to queue behind them
+    'MAX_CONCURRENT': int(os.environ.get('PASSWORD_HASH_MAX_CONCURRENT', '2')),
+    'MAX_PENDING': int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '16')),
+}
+
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2_sha256': 'api.utils.password_hashing.TunedPBKDF2PasswordHasher',
+    'scrypt': 'api.utils.password_hashing.TunedScryptPasswordHasher',
+}
+# The first hasher is used for new hashes; the others still verify old ones
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHING['ALGORITHM']]] + [
+    path for algorithm, path in PASSWORD_HASHER_CLASSES.items()
+    if algorithm != PASSWORD_HASHING['ALGORITHM']
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -140,6 +165,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom user model
 AUTH_USER_MODEL = 'api.CustomUser'
 
+# Store verse text once per distinct wording in verse_texts (see api/utils/verse_text_store.py)
+VERSE_TEXT_DEDUP = os.environ.get('VERSE_TEXT_DEDUP', 'False') == 'True'
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -148,10 +176,13 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Paginated listings put the next page's URL in the Link header
+CORS_EXPOSE_HEADERS = ['Link']
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',  # default; you can restrict per-view later
@@ -159,9 +190,125 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
     ),
+    # JSON bodies may be sent gzipped (see api/utils/compression.py)
+    'DEFAULT_PARSER_CLASSES': (
+        'api.utils.compression.DecompressingJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Counts rate-limit rejections per endpoint before the default handling
+    'EXCEPTION_HANDLER': 'api.utils.rate_limits.exception_handler',
+}
+
+# Rate limiting (see api/utils/rate_limits.py). 'database' shares the
+# @ratelimit counters between worker processes; 'local' keeps them in each
+# process's memory (fine for tests and a single dev server).
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', 'database')
+
+# The default cache holds dashboard snapshots, compressed responses and
+# auth-cache invalidations. It must be shared by the web and worker processes
+# (reading_worker invalidates dashboards), so it defaults to a database table
+# (django_cache, created by migration). CACHE_BACKEND/CACHE_LOCATION can point
+# it at e.g. django.core.cache.backends.redis.RedisCache instead.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'django_cache'),
+        # DatabaseCache culls a third of the table past this many rows
+        'OPTIONS': (
+            {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 10000))}
+            if CACHE_BACKEND.endswith('.DatabaseCache') else {}
+        ),
+    },
+    'ratelimit': {
+        'BACKEND': (
+            'api.utils.rate_limits.DatabaseRateLimitCache' if RATE_LIMIT_STORE == 'database'
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': 'rate_limit_counters',
+    },
+}
+
+RATELIMIT_USE_CACHE = 'ratelimit'
+
+# Response compression and gzipped request bodies (api/utils/compression.py).
+# Compressed copies of responses with a Cache-Control max-age are cached for
+# up to CACHE_SECONDS; auth responses are never compressed (BREACH).
+COMPRESSION = {
+    'MIN_SIZE': 512,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'CACHE_SECONDS': 60 * 60,
+    'MAX_CACHED_BYTES': 2 * 1024 * 1024,
+    'EXCLUDE_PATHS': ['/api/auth/'],
+    'MAX_REQUEST_BYTES': 10 * 1024 * 1024,  # inflated size of a gzipped request body
+}
+
+# How long clients may reuse Bible content responses (translations, books,
+# chapters, verses), which only change on reimport
+CONTENT_CACHE_SECONDS = int(os.environ.get('CONTENT_CACHE_SECONDS', '3600'))
+
+# Per-user dashboard snapshot lifetime (writes invalidate it sooner)
+DASHBOARD_CACHE_SECONDS = int(os.environ.get('DASHBOARD_CACHE_SECONDS', '30'))
+
+# Recent verse list length and the most events one beacon batch may carry
+RECENT_VERSES = {
+    'KEEP': 2,
+    'MAX_BATCH': 100,
+}
+
+# Reading event log: per-process insert batching and events folded per rollup run
+READING_HISTORY = {
+    'FLUSH_EVERY': 200,
+    'FLUSH_SECONDS': 5,
+    'ROLLUP_BATCH': 50000,
+}
+
+# Study note listing and sync: page sizes, the most changes one offline sync
+# batch may carry, how long deletions are kept for syncing devices, and how far
+# behind now a caught-up sync cursor is held (so notes still being committed
+# aren't skipped), and the most splices one content patch may carry
+STUDY_NOTES = {
+    'PAGE_SIZE': 100,
+    'MAX_PAGE_SIZE': 500,
+    'MAX_BATCH': 500,
+    'TOMBSTONE_DAYS': 90,
+    'SETTLE_SECONDS': 5,
+    'MAX_PATCH_SPLICES': 100,
+}
+
+# Reminder scheduling: spread of each reminder's delivery after its minute, and
+# how many missed minutes a lagging scheduler still dispatches
+REMINDERS = {
+    'JITTER_SECONDS': 300,
+    'MAX_CATCHUP_MINUTES': 60,
+}
+
+# Reminder delivery worker (manage.py deliver_reminders, see api/utils/reminder_delivery.py)
+REMINDER_DELIVERY = {
+    'TRANSPORT': os.environ.get('REMINDER_TRANSPORT', 'email'),  # 'email', 'sink' or a class path
+    'BATCH_SIZE': 200,
+    'CONCURRENCY': 20,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 60,  # doubled after each failed attempt
+    'MAX_BACKOFF_SECONDS': 30 * 60,
+    'LEASE_SECONDS': 5 * 60,
+    'STALE_SECONDS': 2 * 60 * 60,  # a reminder this late is dropped, not sent
+    'PAUSE_SECONDS': 5,  # worker pause while most of a batch fails, doubled up to MAX_PAUSE_SECONDS
+    'MAX_PAUSE_SECONDS': 5 * 60,
+}
+
+# Rejected-request counters are flushed to the database in batches
+RATE_LIMIT_HITS = {
+    'FLUSH_EVERY': 50,
+    'FLUSH_SECONDS': 10,
 }
 
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
+# Certificates used to verify Google ID tokens (cached, see api/utils/google_certs.py)
+GOOGLE_CERTS_URL = os.environ.get("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
 
 # Simple JWT settings
 from datetime import timedelta
@@ -181,6 +328,18 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Refresh-token rotation (see api/utils/refresh_tokens.py). A token from the
+# previous generation is still accepted this many seconds after rotation, so
+# concurrent refreshes from several tabs don't look like token reuse.
+REFRESH_TOKEN_REUSE_GRACE_SECONDS = 10
+
+# Per-process cache of authenticated users (see api/utils/user_cache.py)
+AUTH_USER_CACHE = {
+    'MAX_ENTRIES': int(os.environ.get('AUTH_USER_CACHE_MAX_ENTRIES', '10000')),
+    'TTL_SECONDS': int(os.environ.get('AUTH_USER_CACHE_TTL_SECONDS', '60')),
+    'INVALIDATION_POLL_SECONDS': 1,
+}
+
 # Email verification settings
 PASSWORD_RESET_TIMEOUT = 60 * 60 * 24  # 24 hours in seconds
 
@@ -188,3 +347,15 @@ PASSWORD_RESET_TIMEOUT = 60 * 60 * 24  # 24 hours in seconds
 RESEND_API_KEY = os.environ.get('RESEND_API_KEY')
 RESEND_FROM_EMAIL = os.environ.get('RESEND_FROM_EMAIL', 'onboarding@resend.dev')
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
+
+# 'resend' sends through Resend; 'fake' keeps messages in memory (tests, local dev)
+EMAIL_PROVIDER = os.environ.get('EMAIL_PROVIDER', 'resend')
+
+# Email outbox worker (manage.py deliver_emails, see api/utils/email_outbox.py)
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 8,
+    'BACKOFF_SECONDS': 30,  # doubled after each failed attempt
+    'MAX_BACKOFF_SECONDS': 60 * 60,
+    'LEASE_SECONDS': 5 * 60,  # a claimed email is retried after this if the worker dies
+}